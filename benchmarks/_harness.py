@@ -0,0 +1,65 @@
+"""
+Plumbing shared by the benchmarks that run the app (and the stub LLM) as subprocesses:
+a benchmark module started with --serve PORT builds its app and serves it, the parent
+spawns it, waits until it answers and stops it afterwards.
+"""
+import os
+import sys
+import time
+import tempfile
+import subprocess
+from contextlib import contextmanager
+
+import httpx
+
+HOST = "127.0.0.1"
+
+
+def add_serve_argument(parser):
+    parser.add_argument("--serve", type=int, metavar="PORT", help="run the benchmark app on PORT (used internally)")
+
+
+def temp_transcripts():
+    """Points TRANSCRIPTS_DIR at a fresh temp folder, so the benchmark leaves ./transcripts alone."""
+    from server import config
+
+    config.TRANSCRIPTS_DIR = tempfile.mkdtemp(prefix="lifehelper-bench-")
+    return config.TRANSCRIPTS_DIR
+
+
+def serve(app, port):
+    import uvicorn
+
+    uvicorn.run(app, host=HOST, port=port, log_level="warning")
+
+
+def stub_env(stub_port):
+    """Environment that points the app's OpenAI client at benchmarks/stub_openai on `stub_port`."""
+    return dict(os.environ, OPENAI_BASE_URL=f"http://{HOST}:{stub_port}/v1", OPENAI_API_KEY="stub")
+
+
+def spawn(module, *args, env=None):
+    return subprocess.Popen([sys.executable, "-m", module, *(str(a) for a in args)], env=env)
+
+
+@contextmanager
+def running(*procs):
+    """Terminates (and reaps) the spawned servers when the block ends, however it ends."""
+    try:
+        yield procs
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.wait()
+
+
+def wait_ready(url, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url)
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} did not start")
@@ -0,0 +1,113 @@
+"""
+Session audio on disk: the full 16-bit WAV recording versus the speech-only archive
+(FLAC and Opus blocks per segment with a seek index), and how fast one segment's clip
+comes back from each.
+
+    python -m benchmarks.bench_archive [--minutes 10] [--clips 200] [--pause 8]
+
+Synthetic speech-like audio (bursts separated by pauses of up to --pause seconds) is cut
+by the live Segmenter (energy VAD, same settings as transcribe_worker) and every segment
+is archived as if it had been committed. "clip ms"
+is the median time to get one random segment's audio as an encoded file: from the
+archive one index lookup and one read; from a single FLAC of the whole session the
+segment has to be decoded (by seeking) and encoded again.
+"""
+import io
+import os
+import time
+import random
+import argparse
+import tempfile
+import numpy as np
+import soundfile as sf
+
+from server import config
+from server.audio import archive
+from server.audio.vad import create_vad
+from server.audio.segmenter import Segmenter
+from server.audio.sources import SyntheticSource
+from server.audio.recorder import WavAppender
+
+RATE = 16000
+
+
+def capture(minutes, pause):
+    source = SyntheticSource(sample_rate=RATE, channels=1, speed=0, duration=minutes * 60, pause=(0.6, pause))
+    source.open()
+    chunks = []
+    while (chunk := source.read()) is not None:
+        chunks.append(chunk.reshape(-1).astype(np.float32))
+    return np.concatenate(chunks)
+
+
+def segments_of(audio):
+    """(start sample, samples) of each segment the live segmenter cuts."""
+    segmenter = Segmenter(RATE, vad=create_vad("energy", RATE), min_length=1.8, max_length=7.0, preroll=config.VAD_PREROLL)
+    out = []
+    for i in range(0, len(audio), 1024):
+        for start, segment in segmenter.push_timed(audio[i:i + 1024, None]):
+            out.append((start, segment.reshape(-1)))
+    return out
+
+
+def size_mb(*paths):
+    return sum(os.path.getsize(p) for p in paths) / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=float, default=10)
+    parser.add_argument("--clips", type=int, default=200)
+    parser.add_argument("--pause", type=float, default=8.0, help="longest gap between bursts of speech, seconds")
+    args = parser.parse_args()
+
+    audio = capture(args.minutes, args.pause)
+    segments = segments_of(audio)
+    speech = sum(len(s) for _, s in segments) / RATE
+    hours = len(audio) / RATE / 3600
+    print(f"{len(audio) / RATE:.0f} s of audio, {len(segments)} segments, {speech:.0f} s of speech")
+
+    folder = tempfile.mkdtemp(prefix="lifehelper-archive-")
+    config.TRANSCRIPTS_DIR = folder
+    wav = WavAppender(os.path.join(folder, "full.wav"), RATE)
+    wav.write(np.clip(audio, -1, 1) * 32767.0)
+    wav.close()
+    sf.write(os.path.join(folder, "full.flac"), audio, RATE, subtype="PCM_16")
+
+    rng = random.Random(0)
+    picks = [rng.randrange(len(segments)) for _ in range(args.clips)]
+    print(f"{'storage':<18} {'MB/hour':>8} {'encode ms/seg':>14} {'clip ms':>8}")
+    print(f"{'wav (full)':<18} {size_mb(wav.path) / hours:>8.0f} {'':>14} {'':>8}")
+
+    times = []
+    with sf.SoundFile(os.path.join(folder, "full.flac")) as f:
+        for i in picks:
+            start, segment = segments[i]
+            began = time.perf_counter()
+            f.seek(start)
+            out = io.BytesIO()
+            sf.write(out, f.read(len(segment), dtype="float32"), RATE, format="FLAC", subtype="PCM_16")
+            times.append(time.perf_counter() - began)
+    print(f"{'flac (full)':<18} {size_mb(os.path.join(folder, 'full.flac')) / hours:>8.0f} {'':>14} "
+          f"{np.median(times) * 1000:>8.2f}")
+
+    for fmt in archive.FORMATS:
+        name = f"session_2000-01-01T00-00-0{list(archive.FORMATS).index(fmt)}"
+        writer = archive.SpeechArchive(os.path.join(folder, name), RATE, fmt, max_pending=len(segments)).start()
+        began = time.perf_counter()
+        for i, (start, segment) in enumerate(segments):
+            writer.add({"id": i + 1, "ts": int(start * 1000 / RATE)}, segment)
+        writer.close()
+        encode = (time.perf_counter() - began) / len(segments)
+
+        times = []
+        for i in picks:
+            began = time.perf_counter()
+            archive.read_clip(name, segment_id=i + 1)
+            times.append(time.perf_counter() - began)
+        print(f"{'speech ' + fmt:<18} {size_mb(writer.data_path, writer.index_path) / hours:>8.0f} "
+              f"{encode * 1000:>14.2f} {np.median(times) * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Concurrent /api/ask throughput against the local stub LLM (benchmarks/stub_openai.py):
+the async pooled client versus the old sync client iterated in Starlette's threadpool.
+
+    python -m benchmarks.bench_ask [--concurrency 1,16,64,128] [--llm-concurrency 64]
+
+Both servers run as subprocesses; --llm-concurrency overrides LLM_MAX_CONCURRENCY in the
+app (asks above it wait for a slot, up to LLM_QUEUE_TIMEOUT). Reported per run: wall time, completed asks/s,
+time to first byte p50/p95, and server threads in use at the end.
+"""
+import time
+import asyncio
+import argparse
+import threading
+
+import httpx
+
+from benchmarks._harness import add_serve_argument, temp_transcripts, serve as serve_app, stub_env, spawn, running, wait_ready
+
+STUB_PORT = 8766
+APP_PORT = 8767
+
+
+def serve(port, llm_concurrency):
+    from fastapi import FastAPI, Request
+    from fastapi.responses import StreamingResponse
+    from openai import OpenAI
+    from server import config
+    from server.routes import ask
+    from server.utils.conversation import conversations
+
+    temp_transcripts()
+    config.LLM_MAX_CONCURRENCY = llm_concurrency
+    app = FastAPI()
+    app.include_router(ask.router)
+    sync_client = OpenAI()
+
+    legacy_history = []
+
+    # the previous /api/ask: sync client, generator iterated in Starlette's threadpool
+    @app.post("/legacy/ask")
+    async def legacy_ask(request: Request):
+        data = await request.json()
+        legacy_history.append({"role": "user", "content": data.get("question", "")})
+
+        def stream():
+            partial = ""
+            for chunk in sync_client.chat.completions.create(model=config.LLM_MODEL, messages=legacy_history, stream=True):
+                delta = chunk.choices[0].delta if chunk.choices else None
+                if delta and delta.content:
+                    partial += delta.content
+                    yield delta.content
+            legacy_history.append({"role": "assistant", "content": partial})
+
+        return StreamingResponse(stream(), media_type="text/plain")
+
+    @app.post("/bench/reset")
+    def reset():
+        # every run starts from an empty conversation, like a fresh session
+        legacy_history.clear()
+        conversations.clear()
+
+    @app.get("/bench/threads")
+    def threads():
+        return {"threads": threading.active_count()}
+
+    serve_app(app, port)
+
+
+async def one_ask(client, url, n):
+    start = time.perf_counter()
+    first = None
+    async with client.stream("POST", url, json={"question": f"question {n}"}) as res:
+        async for _ in res.aiter_bytes():
+            if first is None:
+                first = time.perf_counter() - start
+    return first or (time.perf_counter() - start)
+
+
+async def run(path, concurrency):
+    base = f"http://127.0.0.1:{APP_PORT}"
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+        await client.post(base + "/bench/reset")
+        start = time.perf_counter()
+        ttfb = await asyncio.gather(*[one_ask(client, base + path, i) for i in range(concurrency)])
+        wall = time.perf_counter() - start
+        threads = (await client.get(base + "/bench/threads")).json()["threads"]
+    ttfb.sort()
+    p = lambda q: ttfb[min(int(q * len(ttfb)), len(ttfb) - 1)] * 1000
+    return wall, concurrency / wall, p(0.5), p(0.95), threads
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    add_serve_argument(parser)
+    parser.add_argument("--concurrency", default="1,16,64,128")
+    parser.add_argument("--llm-concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.llm_concurrency)
+        return
+
+    env = stub_env(STUB_PORT)
+    with running(
+        spawn("benchmarks.stub_openai", "--port", STUB_PORT, env=env),
+        spawn("benchmarks.bench_ask", "--serve", APP_PORT, "--llm-concurrency", args.llm_concurrency, env=env),
+    ):
+        wait_ready(f"http://127.0.0.1:{STUB_PORT}/stats")
+        wait_ready(f"http://127.0.0.1:{APP_PORT}/bench/threads")
+        print(f"{'client':>7} {'conc':>5} {'wall s':>7} {'asks/s':>7} {'ttfb p50':>9} {'ttfb p95':>9} {'threads':>8}")
+        # async first, so its thread count is not inflated by the threadpool the sync runs spin up
+        for name, path in (("async", "/api/ask"), ("sync", "/legacy/ask")):
+            for concurrency in [int(c) for c in args.concurrency.split(",")]:
+                wall, rate, p50, p95, threads = asyncio.run(run(path, concurrency))
+                print(f"{name:>7} {concurrency:>5} {wall:>7.2f} {rate:>7.1f} {p50:>7.0f}ms {p95:>7.0f}ms {threads:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Prompt size of /api/ask over a long session: the old global history (every turn resent)
+versus the token-budgeted per-session conversation with transcript context.
+
+    python -m benchmarks.bench_context [--turns 300]
+
+Simulates sequential questions with ~60-token answers while the transcript grows by a
+segment every 3 s; no LLM is called (evicted turns are not summarized here).
+"""
+import time
+import argparse
+
+from server import config
+from server.utils.conversation import Conversation, build_messages, message_tokens
+from server.utils.transcript_store import TranscriptStore
+
+WORDS = "the meeting moved the release to friday because the build server was down again".split()
+
+
+def sentence(i, n):
+    return " ".join(WORDS[(i + k) % len(WORDS)] for k in range(n))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=300)
+    args = parser.parse_args()
+
+    store = TranscriptStore()
+    legacy = []
+    conversation = Conversation("bench")
+    elapsed = 0.0
+
+    print(f"{'turn':>5} {'legacy tokens':>14} {'budgeted tokens':>16} {'build ms':>9}")
+    for turn in range(1, args.turns + 1):
+        for k in range(20):  # a minute of speech between questions
+            store.append({"text": sentence(turn * 20 + k, 12)})
+        question = f"what did they say about the release {turn}?"
+        answer = sentence(turn, 45)
+
+        legacy.append({"role": "user", "content": question})
+        legacy_tokens = sum(message_tokens(m) for m in legacy)
+        legacy.append({"role": "assistant", "content": answer})
+
+        # the store stamps entries with wall time, so take the window by count instead
+        window = store.tail(int(config.LLM_TRANSCRIPT_SECONDS / 3))
+        start = time.perf_counter()
+        messages = build_messages(conversation, question, window)
+        elapsed = time.perf_counter() - start
+        conversation.add_turn(question, answer)
+        conversation.take_evicted()
+
+        if turn in (1, 10, 50, 100, 200, 300) or turn == args.turns:
+            budgeted = sum(message_tokens(m) for m in messages)
+            print(f"{turn:>5} {legacy_tokens:>14} {budgeted:>16} {elapsed * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Per-segment cost of handing audio to whisper: the old temp WAV/TXT round-trip
+versus the in-memory handoff used by the engines now.
+
+    python -m benchmarks.bench_handoff
+
+Only the handoff is measured (whisper itself is not run), so the numbers are the
+overhead each path adds on top of inference.
+"""
+import io
+import os
+import time
+import tempfile
+import numpy as np
+import soundfile as sf
+
+from server.utils.whisper_cpp import pcm_to_wav_bytes
+
+ROUNDS = 200
+
+
+def legacy_handoff(segment, sample_rate):
+    # transcribe_segment: WAV encode into BytesIO + NamedTemporaryFile(delete=False)
+    wav_buf = io.BytesIO()
+    sf.write(wav_buf, segment, sample_rate, format="WAV")
+    data = wav_buf.getvalue()
+    with tempfile.NamedTemporaryFile(delete=False) as tmp:
+        tmpname = tmp.name
+
+    # transcribe_with_whisper_cpp: write .wav, whisper reads it and writes .txt, read + delete
+    tmp_wav = tmpname + ".wav"
+    txt_path = tmpname + ".txt"
+    with open(tmp_wav, "wb") as f:
+        f.write(data)
+    decoded, _ = sf.read(tmp_wav, dtype="float32")
+    with open(txt_path, "w", encoding="utf-8") as f:
+        f.write(" hello world")
+    with open(txt_path, "r", encoding="utf-8") as f:
+        text = f.read().strip()
+    for path in (tmp_wav, txt_path, tmpname):
+        os.remove(path)
+    return text, decoded
+
+
+def memory_handoff(segment, sample_rate):
+    # Engines: WAV bytes built in memory and piped to stdin / posted to whisper-server
+    data = pcm_to_wav_bytes(segment, sample_rate)
+    text = b" hello world\n".decode("utf-8").strip()
+    return text, data
+
+
+def run(fn, segment, sample_rate):
+    fn(segment, sample_rate)
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn(segment, sample_rate)
+    return (time.perf_counter() - start) / ROUNDS * 1000
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'rate':>6} {'secs':>5} {'legacy ms':>10} {'memory ms':>10} {'saved ms':>9}")
+    for sample_rate in (16000, 48000):
+        for seconds in (2, 5, 7):
+            segment = (rng.standard_normal(sample_rate * seconds) * 0.1).astype(np.float32)
+            legacy = run(legacy_handoff, segment, sample_rate)
+            memory = run(memory_handoff, segment, sample_rate)
+            print(f"{sample_rate:>6} {seconds:>5} {legacy:>10.3f} {memory:>10.3f} {legacy - memory:>9.3f}")
+    print("filesystem ops per segment: legacy 3 creates, 2 writes, 2 reads, 2 deletes (+1 leaked temp file); memory 0")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Load test for live transcript delivery: server CPU per connected client for the
+SSE push feed (/api/live/stream) versus 1 s polling of /api/live?since=.
+
+    python -m benchmarks.bench_live_stream [--clients 1,10,50,100] [--duration 10]
+
+The server runs in a subprocess with only the live router mounted, a transcript
+preloaded with PRELOAD segments (a few hours of talk) and PUBLISH_RATE new
+segments per second. Its own process CPU time is sampled before and after each run.
+"""
+import time
+import asyncio
+import argparse
+import threading
+from datetime import datetime
+
+import httpx
+
+from benchmarks._harness import add_serve_argument, temp_transcripts, serve as serve_app, spawn, running, wait_ready
+
+PRELOAD = 3000
+PUBLISH_RATE = 2
+
+
+def serve(port):
+    from fastapi import FastAPI
+    from server.routes import live
+    from server.utils.state import add_to_transcript
+
+    temp_transcripts()
+
+    app = FastAPI()
+    app.include_router(live.router)
+
+    @app.get("/bench/cpu")
+    def cpu():
+        return {"cpu": time.process_time()}
+
+    for i in range(PRELOAD):
+        add_to_transcript({"timestamp": "2025-01-01T00:00:00", "text": f"preloaded segment {i}"})
+
+    def publisher():
+        i = 0
+        while True:
+            time.sleep(1 / PUBLISH_RATE)
+            ts = datetime.now().isoformat(timespec="seconds")
+            add_to_transcript({"timestamp": ts, "text": f"live segment {i} " + "word " * 12})
+            i += 1
+
+    threading.Thread(target=publisher, daemon=True).start()
+    serve_app(app, port)
+
+
+async def sse_client(base, stop, received):
+    async with httpx.AsyncClient(timeout=None) as client:
+        async with client.stream("GET", f"{base}/api/live/stream") as res:
+            async for line in res.aiter_lines():
+                if line.startswith("data:"):
+                    received[0] += 1
+                if stop.is_set():
+                    break
+
+
+async def poll_client(base, stop, received):
+    since = datetime.now().isoformat(timespec="seconds")
+    async with httpx.AsyncClient(timeout=None) as client:
+        while not stop.is_set():
+            res = await client.get(f"{base}/api/live", params={"since": since})
+            segments = res.json().get("segments", [])
+            if segments:
+                received[0] += len(segments)
+                since = segments[-1]["timestamp"]
+            await asyncio.sleep(1)
+
+
+async def measure(base, mode, clients, duration):
+    stop = asyncio.Event()
+    received = [0]
+    client_fn = sse_client if mode == "sse" else poll_client
+
+    async with httpx.AsyncClient() as control:
+        tasks = [asyncio.create_task(client_fn(base, stop, received)) for _ in range(clients)]
+        await asyncio.sleep(1)
+        cpu_start = (await control.get(f"{base}/bench/cpu")).json()["cpu"]
+        received[0] = 0
+        await asyncio.sleep(duration)
+        cpu_end = (await control.get(f"{base}/bench/cpu")).json()["cpu"]
+        stop.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    cpu_ms_per_s = (cpu_end - cpu_start) / duration * 1000
+    return cpu_ms_per_s, received[0] / duration
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    add_serve_argument(parser)
+    parser.add_argument("--clients", default="1,10,50,100")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve)
+        return
+
+    base = f"http://127.0.0.1:{args.port}"
+    print(f"{'mode':>5} {'clients':>8} {'cpu ms/s':>9} {'ms/s/client':>12} {'msgs/s':>8}")
+    for mode in ("poll", "sse"):
+        for clients in [int(c) for c in args.clients.split(",")]:
+            with running(spawn("benchmarks.bench_live_stream", "--serve", args.port)):
+                wait_ready(f"{base}/bench/cpu")
+                cpu, msgs = asyncio.run(measure(base, mode, clients, args.duration))
+                print(f"{mode:>5} {clients:>8} {cpu:>9.1f} {cpu / clients:>12.2f} {msgs:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+"""
+End-to-end benchmark of the live pipeline: reference audio is fed through
+capture._put_data_to_queue, transcribe_worker, the inference workers and the transcript
+store exactly as capture_loop feeds them, and every committed segment is timed.
+
+    python -m benchmarks.bench_pipeline [--wav file.wav] [--duration 60] [--speed 1]
+        [--engine stub|real] [--decode-rtf 0.15] [--workers 2] [--streams 1] [--out results.json]
+
+Without --wav the synthetic speech-like source is used, whose burst boundaries are known.
+With --streams N, N pipelines (synthetic sources with different seeds, or the same WAV)
+run at once on the shared workers, and latency is also reported per stream.
+With --governor the quality governor drives the stub engine, whose cost per level is
+MODEL_COST x 2 for beam search times --decode-rtf (the cost of base.en, greedy); its
+decisions are included in the results.
+"latency" runs from the end of the utterance (the end of the last speech burst inside the
+segment, or the segment's own end for a WAV file or a segment cut at max length) to the
+moment add_to_transcript returns, i.e. when /api/live and the push feed can serve it.
+"cut latency" starts when the segmenter hands the segment to segment_q instead.
+
+The stub engine sleeps --decode-rtf seconds per second of audio; --engine real uses
+the configured TRANSCRIBE_ENGINE. "rtf" is decode time over audio time, summed over
+workers; "throughput" is audio seconds per wall second (meaningful with --speed 0).
+Results are printed, or written with --out, as JSON so runs can be compared.
+"""
+import os
+import sys
+import json
+import time
+import queue
+import bisect
+import tempfile
+import argparse
+import platform
+import threading
+import tracemalloc
+
+import numpy as np
+
+from server import config
+from server.audio import capture, transcribe
+from server.audio.pipeline import AudioPipeline
+from server.audio.pool import SegmentQueue, OrderedCommitter
+from server.audio.resample import StreamingResampler
+from server.audio.segmenter import Segmenter
+from server.audio.sources import SyntheticSource, WavFileSource
+from server.utils import engine
+from server.utils.governor import get_governor
+from server.utils.state import add_to_transcript
+
+SAMPLE_INTERVAL = 0.05
+DRAIN_TIMEOUT = 60
+
+
+# decode cost relative to base.en, roughly as whisper.cpp's model sizes scale on a CPU
+MODEL_COST = {"tiny": 0.4, "base": 1.0, "small": 3.0, "medium": 8.0}
+
+
+class StubEngine(engine.TranscriptionEngine):
+    """Spends `rtf` seconds per second of audio, as if decoding it."""
+
+    name = "stub"
+
+    def __init__(self, rtf):
+        self.base_rtf = rtf
+        self.rtf = rtf
+
+    def configure(self, model, threads, beam):
+        size = os.path.basename(model).split("-")[1].split(".")[0]
+        self.rtf = self.base_rtf * MODEL_COST[size] * (2 if beam > 1 else 1)
+
+    def transcribe(self, samples, sample_rate):
+        time.sleep(len(samples) / sample_rate * self.rtf)
+        return f"segment of {len(samples) / sample_rate:.2f} s"
+
+
+class TimedQueue(queue.Queue):
+    """audio_q that remembers when each resampled sample entered the pipeline."""
+
+    def __init__(self):
+        super().__init__()
+        self.samples = 0
+        self.ends = []
+        self.times = []
+
+    def put(self, item, block=True, timeout=None):
+        self.samples += len(item)
+        self.ends.append(self.samples)
+        self.times.append(time.perf_counter())
+        super().put(item, block, timeout)
+
+    def time_of(self, sample):
+        i = bisect.bisect_left(self.ends, sample)
+        return self.times[min(i, len(self.times) - 1)]
+
+
+class Trace:
+    """Per-segment timestamps, keyed by (stream, seq), filled in by the instrumented pipeline stages below."""
+
+    def __init__(self):
+        self.ends = {}
+        self.segments = {}
+        self.committed = {}
+        self.decode_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def instrument(self):
+        trace = self
+
+        class TracedSegmenter(Segmenter):
+            def push(self, data):
+                segments = []
+                for start, segment in self.push_timed(data):
+                    trace.ends[id(segment)] = (start, start + len(segment))
+                    segments.append(segment)
+                return segments
+
+        class TracedQueue(SegmentQueue):
+            def put(self, stream, seq, segment, should_stop=lambda: False):
+                trace.segments[stream.name, seq] = (*trace.ends.pop(id(segment)), time.perf_counter())
+                return super().put(stream, seq, segment, should_stop)
+
+        original_transcribe = transcribe.transcribe_segment
+
+        def transcribe_segment(segment, slot=0, queued=0.0):
+            started = time.perf_counter()
+            try:
+                return original_transcribe(segment, slot, queued)
+            finally:
+                with self._lock:
+                    self.decode_seconds += time.perf_counter() - started
+
+        transcribe.Segmenter = TracedSegmenter
+        transcribe.transcribe_segment = transcribe_segment
+        transcribe.segment_q = TracedQueue(config.SEGMENT_QUEUE_SIZE, config.SEGMENT_BACKPRESSURE)
+
+    def pipeline(self, name, source, index):
+        """A pipeline fed by hand (no capture thread) whose audio_q and commits are timed."""
+        trace = self
+
+        class TracedCommitter(OrderedCommitter):
+            def commit(self, seq, result):
+                super().commit(seq, (seq, result) if result else None)
+
+        def commit(item):
+            seq, (text, _) = item
+            add_to_transcript({"text": text, "source": name})
+            trace.committed[name, seq] = time.perf_counter()
+
+        pipeline = AudioPipeline(name, source, index=index)
+        pipeline.audio_q = TimedQueue()
+        pipeline.committer = TracedCommitter(commit)
+        pipeline.resampler = StreamingResampler(source.sample_rate, config.SAMPLE_RATE)
+        transcribe.segment_q.add_stream(pipeline, on_drop=pipeline.committer.skip)
+        return pipeline
+
+
+def utterance_end(start, end, speech_ends):
+    """Pipeline sample at which the utterance in [start, end) ended: its last burst end, else the cut."""
+    i = bisect.bisect_right(speech_ends, end) - 1
+    if i >= 0 and speech_ends[i] > start:
+        return speech_ends[i]
+    return end
+
+
+def percentiles(values) -> dict:
+    if not values:
+        return {"count": 0}
+    values = np.asarray(values)
+    return {
+        "count": len(values),
+        "mean": round(float(values.mean()), 1),
+        "p50": round(float(np.percentile(values, 50)), 1),
+        "p95": round(float(np.percentile(values, 95)), 1),
+        "p99": round(float(np.percentile(values, 99)), 1),
+        "max": round(float(values.max()), 1),
+    }
+
+
+def depth_stats(samples) -> dict:
+    values = np.asarray(samples or [0])
+    return {"mean": round(float(values.mean()), 2), "p95": float(np.percentile(values, 95)), "max": int(values.max())}
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process, or None where the resource module is missing (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def latencies_of(trace, pipeline, speech_ends):
+    latencies, cut_latencies = [], []
+    for (name, seq), committed_at in trace.committed.items():
+        if name != pipeline.name:
+            continue
+        start, end, cut_at = trace.segments[name, seq]
+        reference = utterance_end(start, end, speech_ends)
+        latencies.append((committed_at - pipeline.audio_q.time_of(reference)) * 1000)
+        cut_latencies.append((committed_at - cut_at) * 1000)
+    return latencies, cut_latencies
+
+
+def run(args) -> dict:
+    config.TRANSCRIPTS_DIR = tempfile.mkdtemp(prefix="lifehelper-bench-")
+    config.LOW_LATENCY = False
+    config.TRANSCRIBE_WORKERS = args.workers
+    if args.engine == "stub":
+        engine.create_engine = lambda name, slot=0: StubEngine(args.decode_rtf)
+    if args.governor:
+        config.GOVERNOR = True
+        config.GOVERNOR_COOLDOWN = args.governor_cooldown
+        config.GOVERNOR_TARGET_LATENCY = args.target_latency
+        if args.engine == "stub":
+            # the stub only needs the model files to exist
+            for level in config.GOVERNOR_LEVELS:
+                level["model"] = os.path.join(config.TRANSCRIPTS_DIR, os.path.basename(level["model"]))
+                open(level["model"], "a").close()
+            config.WHISPER_MODEL = os.path.join(config.TRANSCRIPTS_DIR, os.path.basename(config.WHISPER_MODEL))
+
+    trace = Trace()
+    trace.instrument()
+    pipelines = []
+    for i in range(args.streams):
+        if args.wav:
+            source = WavFileSource(args.wav, speed=args.speed)
+        else:
+            source = SyntheticSource(speed=args.speed, duration=args.duration, seed=args.seed + i)
+        source.open()
+        pipelines.append(trace.pipeline(f"stream{i}" if args.streams > 1 else "bench", source, i))
+
+    stop = threading.Event()
+    threads = [threading.Thread(target=transcribe.transcribe_worker, args=(p,), daemon=True) for p in pipelines]
+    threads += [threading.Thread(target=transcribe.inference_worker, args=(slot, stop), daemon=True)
+                for slot in range(args.workers)]
+    for thread in threads:
+        thread.start()
+    # engines load in the workers; wait so model start-up is not counted as latency
+    for slot in range(args.workers):
+        engine.get_engine(slot)
+
+    depths = {"audio_q": [], "segment_q": [], "in_flight": []}
+    sampling = threading.Event()
+
+    def sample():
+        while not sampling.is_set():
+            depths["audio_q"].append(sum(p.audio_q.qsize() for p in pipelines))
+            depths["segment_q"].append(transcribe.segment_q.qsize())
+            depths["in_flight"].append(sum(p.in_flight for p in pipelines))
+            time.sleep(SAMPLE_INTERVAL)
+
+    rss_before = peak_rss_mb()
+    if args.tracemalloc:
+        tracemalloc.start()
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+
+    started = time.perf_counter()
+    started_at = time.time()
+    source_frames = 0
+    feeding = list(pipelines)
+    while feeding:
+        # one chunk of each stream in turn, as their capture threads would deliver them
+        for pipeline in list(feeding):
+            source = pipeline.source
+            frames = source.read()
+            if frames is None or (args.wav and source.frames_read > args.duration * source.sample_rate):
+                feeding.remove(pipeline)
+                continue
+            source_frames += len(frames)
+            capture._put_data_to_queue(pipeline, frames)
+    fed = time.perf_counter()
+    audio_seconds = source_frames / pipelines[0].source.sample_rate
+
+    # the live pipeline never flushes the last partial segment, so wait for what was cut
+    deadline = fed + DRAIN_TIMEOUT
+    while time.perf_counter() < deadline:
+        done = len(trace.committed) + transcribe.segment_q.dropped
+        if all(p.audio_q.empty() and p.in_flight == 0 for p in pipelines) \
+                and transcribe.segment_q.qsize() == 0 and done >= len(trace.segments):
+            break
+        time.sleep(SAMPLE_INTERVAL)
+    finished = max([fed, *trace.committed.values()])
+
+    sampling.set()
+    for pipeline in pipelines:
+        pipeline.stopped = True
+    stop.set()
+    for thread in threads:
+        thread.join(timeout=2)
+    traced_peak = tracemalloc.get_traced_memory()[1] if args.tracemalloc else None
+    if args.tracemalloc:
+        tracemalloc.stop()
+    for pipeline in pipelines:
+        pipeline.source.close()
+    engine.close_engine()
+
+    latencies, cut_latencies, streams = [], [], {}
+    for pipeline in pipelines:
+        source = pipeline.source
+        speech_ends = []
+        if isinstance(source, SyntheticSource):
+            speech_ends = [int(end * config.SAMPLE_RATE) for _, end in source.speech_intervals]
+        stream_latencies, stream_cut_latencies = latencies_of(trace, pipeline, speech_ends)
+        latencies += stream_latencies
+        cut_latencies += stream_cut_latencies
+        streams[pipeline.name] = {
+            "committed": sum(1 for name, _ in trace.committed if name == pipeline.name),
+            "dropped": transcribe.segment_q.dropped_from(pipeline),
+            "latency_ms": percentiles(stream_latencies),
+        }
+
+    results = {
+        "benchmark": "pipeline",
+        "config": {
+            "source": pipelines[0].source.describe(),
+            "streams": args.streams,
+            "engine": args.engine if args.engine == "real" else f"stub (decode rtf {args.decode_rtf})",
+            "transcribe_engine": config.TRANSCRIBE_ENGINE if args.engine == "real" else None,
+            "workers": args.workers,
+            "speed": args.speed,
+            "vad": config.VAD_ENGINE,
+            "segment_queue": [config.SEGMENT_QUEUE_SIZE, config.SEGMENT_BACKPRESSURE],
+            "python": platform.python_version(),
+        },
+        "audio_seconds": round(audio_seconds, 3),
+        "wall_seconds": round(finished - started, 3),
+        "rtf": round(trace.decode_seconds / audio_seconds, 4) if audio_seconds else None,
+        "throughput": round(audio_seconds / (finished - started), 2) if finished > started else None,
+        "segments": {
+            "cut": len(trace.segments),
+            "committed": len(trace.committed),
+            "dropped": transcribe.segment_q.dropped,
+            "empty": len(trace.segments) - len(trace.committed) - transcribe.segment_q.dropped,
+        },
+        "latency_ms": percentiles(latencies),
+        "cut_latency_ms": percentiles(cut_latencies),
+        "queue_depth": {name: depth_stats(values) for name, values in depths.items()},
+        "memory_mb": {
+            "rss_peak_before": rss_before,
+            "rss_peak": peak_rss_mb(),
+            "traced_peak": round(traced_peak / 2 ** 20, 1) if traced_peak is not None else None,
+        },
+    }
+    if args.streams > 1:
+        results["streams"] = streams
+    if args.governor:
+        status = get_governor().status()
+        results["governor"] = {
+            "final": get_governor().describe(),
+            "levels": [f"{l['model']} beam {l['beam']}" for l in status["levels"]],
+            "decisions": [
+                {key: d[key] for key in ("from", "to", "reason", "latency", "rtf", "backlog")}
+                | {"at_s": round(d["time"] - started_at, 1)}
+                for d in status["decisions"]
+            ],
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--wav", help="reference recording (default: synthetic speech-like bursts)")
+    parser.add_argument("--duration", type=float, default=60, help="seconds of audio to replay")
+    parser.add_argument("--speed", type=float, default=1.0, help="times real time, 0 = as fast as possible")
+    parser.add_argument("--engine", choices=("stub", "real"), default="stub")
+    parser.add_argument("--decode-rtf", type=float, default=0.15, help="stub engine cost per second of audio")
+    parser.add_argument("--workers", type=int, default=config.TRANSCRIBE_WORKERS)
+    parser.add_argument("--streams", type=int, default=1, help="pipelines running at once")
+    parser.add_argument("--governor", action="store_true", help="let the quality governor pick model and beam")
+    parser.add_argument("--target-latency", type=float, default=config.GOVERNOR_TARGET_LATENCY)
+    parser.add_argument("--governor-cooldown", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tracemalloc", action="store_true", help="also trace Python allocations (slower)")
+    parser.add_argument("--out", help="write the JSON results here instead of printing them")
+    args = parser.parse_args()
+
+    results = run(args)
+    if not args.out:
+        print(json.dumps(results, indent=2))
+        return
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    latency = results["latency_ms"]
+    print(f"{results['audio_seconds']:.0f} s of audio, {results['segments']['committed']} segments, "
+          f"rtf {results['rtf']}, throughput {results['throughput']}x")
+    if latency["count"]:
+        print(f"latency ms: p50 {latency['p50']}  p95 {latency['p95']}  p99 {latency['p99']}  max {latency['max']}")
+    if "governor" in results:
+        for d in results["governor"]["decisions"]:
+            print(f"  {d['at_s']:>6.1f} s  level {d['from']} -> {d['to']} ({d['reason']}, latency {d['latency']} s)")
+        print(f"  governor ended on {results['governor']['final']}")
+    for name, stream in results.get("streams", {}).items():
+        latency = stream["latency_ms"]
+        if latency["count"]:
+            print(f"  {name}: p50 {latency['p50']}  p95 {latency['p95']}  ({stream['committed']} segments)")
+    print(f"results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Speculative answers (PREFETCH) against the local stub LLM: time to first byte of /api/ask
+when the user highlights a term from a segment committed a few seconds earlier, with
+prefetching off and on, and how many completions the LLM served in each case.
+
+    python -m benchmarks.bench_prefetch [--segments 12] [--interval 1.5] [--lag 2] [--ttft 0.5]
+
+Segments (each naming a technology) are committed every --interval seconds; after each,
+the term from --lag segments back is asked about, as if highlighted after reading it.
+The app and the stub run as subprocesses; --per-minute overrides PREFETCH_PER_MINUTE.
+"""
+import time
+import argparse
+
+import httpx
+
+from benchmarks._harness import add_serve_argument, temp_transcripts, serve as serve_app, stub_env, spawn, running, wait_ready
+
+STUB_PORT = 8766
+APP_PORT = 8768
+
+TERMS = [
+    "Kafka", "RabbitMQ", "AWS Lambda", "Kubernetes", "PostgreSQL", "GraphQL", "Redis", "Terraform",
+    "WebAssembly", "OAuth", "Prometheus", "Grafana", "Elasticsearch", "Docker Compose", "Nginx", "SQLite",
+]
+
+
+def serve(port, prefetch, per_minute):
+    from contextlib import asynccontextmanager
+    from fastapi import FastAPI, Request
+    from server import config
+    from server.routes import ask
+    from server.utils.state import add_to_transcript
+    from server.utils.prefetch import start_prefetch, stop_prefetch
+
+    temp_transcripts()
+    config.PREFETCH = prefetch
+    config.PREFETCH_PER_MINUTE = per_minute
+
+    @asynccontextmanager
+    async def lifespan(app):
+        start_prefetch()
+        yield
+        await stop_prefetch()
+
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(ask.router)
+
+    @app.post("/bench/commit")
+    async def commit(request: Request):
+        add_to_transcript({"text": (await request.json())["text"]})
+
+    serve_app(app, port)
+
+
+def ttfb(client, question):
+    start = time.perf_counter()
+    with client.stream("POST", "/api/ask", json={"question": question, "session_id": "bench"}) as res:
+        for _ in res.iter_bytes():
+            return time.perf_counter() - start
+    return time.perf_counter() - start
+
+
+def run(args, prefetch):
+    env = stub_env(STUB_PORT)
+    with running(
+        spawn("benchmarks.stub_openai", "--port", STUB_PORT, "--ttft", args.ttft, env=env),
+        spawn("benchmarks.bench_prefetch", "--serve", APP_PORT, "--per-minute", args.per_minute,
+              *(["--prefetch"] if prefetch else []), env=env),
+    ):
+        wait_ready(f"http://127.0.0.1:{STUB_PORT}/stats")
+        wait_ready(f"http://127.0.0.1:{APP_PORT}/api/ask/stats")
+        times = []
+        with httpx.Client(base_url=f"http://127.0.0.1:{APP_PORT}", timeout=60) as client:
+            for i in range(args.segments):
+                term = TERMS[i % len(TERMS)]
+                client.post("/bench/commit", json={"text": f"Then we looked at how {term} fits in and why the team picked it."})
+                time.sleep(args.interval)
+                if i >= args.lag:
+                    times.append(ttfb(client, TERMS[(i - args.lag) % len(TERMS)]))
+            stats = client.get("/api/ask/stats").json()
+        requests = httpx.get(f"http://127.0.0.1:{STUB_PORT}/stats").json()["requests"]
+
+    times.sort()
+    p = lambda q: times[min(int(q * len(times)), len(times) - 1)] * 1000
+    return p(0.5), p(0.95), len(times), requests, stats["prefetch"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    add_serve_argument(parser)
+    parser.add_argument("--prefetch", action="store_true")
+    parser.add_argument("--segments", type=int, default=12)
+    parser.add_argument("--interval", type=float, default=1.5)
+    parser.add_argument("--lag", type=int, default=2)
+    parser.add_argument("--ttft", type=float, default=0.5)
+    parser.add_argument("--per-minute", type=int, default=30)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.prefetch, args.per_minute)
+        return
+
+    print(f"{'prefetch':>8} {'asks':>5} {'ttfb p50':>9} {'ttfb p95':>9} {'llm calls':>10} {'hits':>5} {'stored':>7}")
+    for prefetch in (False, True):
+        p50, p95, asks, requests, stats = run(args, prefetch)
+        print(f"{'on' if prefetch else 'off':>8} {asks:>5} {p50:>7.0f}ms {p95:>7.0f}ms {requests:>10} "
+              f"{stats['hits']:>5} {stats['stored']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Build time, memory and query latency of the transcript search index at archive scale.
+
+    python -m benchmarks.bench_search [--segments 1000000] [--queries 500]
+
+Segments are synthetic 6-20 word sentences drawn from a Zipf-distributed 30k-word
+vocabulary (a common word like "the" is in most segments), spread over 120 sessions.
+Queries mix 1-3 words of varying frequency; a linear scan over the texts is shown for
+reference on a sample of them.
+"""
+import sys
+import time
+import argparse
+
+import numpy as np
+
+from server.utils.search import TranscriptSearch
+
+VOCAB = 30000
+SESSIONS = 120
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--segments", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    words = [f"w{i}" for i in range(VOCAB)]
+    ranks = np.minimum(rng.zipf(1.2, size=args.segments * 20), VOCAB) - 1
+    lengths = rng.integers(6, 21, size=args.segments)
+
+    index = TranscriptSearch()
+    start = time.perf_counter()
+    pos = 0
+    base_ms = 1_700_000_000_000
+    for i, n in enumerate(lengths):
+        text = " ".join(words[r] for r in ranks[pos:pos + n])
+        pos += n
+        index.add(f"session_{i * SESSIONS // args.segments:03d}", {"id": i + 1, "ts": base_ms + i * 3000, "text": text})
+    build = time.perf_counter() - start
+    text = index.text
+    arrays = sum(c._data.nbytes for p in text._postings.values() for c in p)
+    arrays += sum(c._data.nbytes for c in (text._ts, text._session, text._entry_id))
+    strings = sum(sys.getsizeof(t) for t in text._texts)
+    print(f"indexed {args.segments} segments in {build:.1f} s ({args.segments / build:.0f}/s), "
+          f"{len(text._postings)} terms, postings+columns {arrays / 2**20:.0f} MiB, texts {strings / 2**20:.0f} MiB")
+
+    queries = []
+    for _ in range(args.queries):
+        k = int(rng.integers(1, 4))
+        queries.append(" ".join(words[int(r)] for r in rng.choice([0, 3, 50, 400, 5000, 20000], size=k)))
+
+    for label, kwargs in (("all sessions", {}), ("one session", {"session": "session_042"}),
+                          ("last day", {"since_ms": base_ms + (args.segments - 28800) * 3000})):
+        times = []
+        for q in queries:
+            start = time.perf_counter()
+            index.search(q, limit=20, **kwargs)
+            times.append(time.perf_counter() - start)
+        times = np.array(times) * 1000
+        print(f"{label:>13}: p50 {np.percentile(times, 50):.2f} ms  p95 {np.percentile(times, 95):.2f} ms  max {times.max():.2f} ms")
+
+    texts = index.text._texts
+    start = time.perf_counter()
+    for q in queries[:5]:
+        terms = q.split()
+        [t for t in texts if all(term in t for term in terms)]
+    print(f" linear scan: {(time.perf_counter() - start) / 5 * 1000:.0f} ms per query")
+
+
+if __name__ == "__main__":
+    main()
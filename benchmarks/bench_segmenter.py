@@ -0,0 +1,110 @@
+"""
+Replays a WAV file through the segmentation stage of transcribe_worker, in the same
+1024-frame chunks capture_loop produces, and compares it with the old
+np.concatenate accumulation.
+
+    python -m benchmarks.bench_segmenter [file.wav]
+
+Without a file, 60 s of synthetic speech-like bursts at 48 kHz are used.
+"alloc MB/s" is the transient memory allocated per second of replayed audio (sum of
+per-chunk tracemalloc peaks), which is where the O(n^2) copying shows up.
+"""
+import sys
+import time
+import tracemalloc
+import numpy as np
+import soundfile as sf
+
+from server.audio.segmenter import Segmenter
+
+CHUNK = 1024
+
+
+class LegacySegmenter:
+    """The pre-ring-buffer transcribe_worker loop, minus the transcription call."""
+
+    def __init__(self, sample_rate):
+        self.buffer = np.zeros((0, 1), dtype=np.float32)
+        self.silence_threshold = 0.005
+        self.silence_window = int(sample_rate * 0.2)
+        self.silence_limit = int(0.8 / 0.2)
+        self.silence_counter = 0
+        self.speech_detected = False
+        self.max_samples = sample_rate * 7
+        self.min_sentence_length = 1.8
+        self.sample_rate = sample_rate
+
+    def push(self, data):
+        segments = []
+        self.buffer = np.concatenate((self.buffer, data))
+        if len(self.buffer) >= self.silence_window:
+            recent = self.buffer[-self.silence_window:]
+            rms = (recent**2).mean()**0.5
+            if rms > self.silence_threshold:
+                self.silence_counter = 0
+                self.speech_detected = True
+            elif self.speech_detected:
+                self.silence_counter += 1
+            total_duration = len(self.buffer) / self.sample_rate
+            if self.speech_detected and self.silence_counter >= self.silence_limit and total_duration >= self.min_sentence_length:
+                segments.append(self.buffer.copy().flatten())
+                self.buffer = np.zeros((0, 1), dtype=np.float32)
+                self.silence_counter = 0
+                self.speech_detected = False
+            elif len(self.buffer) >= self.max_samples:
+                segments.append(self.buffer[:self.max_samples].flatten())
+                self.buffer = self.buffer[self.max_samples:]
+                self.silence_counter = 0
+                self.speech_detected = False
+        return segments
+
+
+def load_audio(path):
+    if path:
+        audio, rate = sf.read(path, dtype="float32", always_2d=True)
+        return audio.mean(axis=1, keepdims=True).astype(np.float32), rate
+
+    rate = 48000
+    rng = np.random.default_rng(0)
+    t = np.arange(rate * 60) / rate
+    envelope = (np.sin(2 * np.pi * 0.15 * t) > -0.2).astype(np.float32)
+    audio = 0.1 * envelope * np.sin(2 * np.pi * 220 * t) + 0.001 * rng.standard_normal(len(t))
+    return audio.astype(np.float32).reshape(-1, 1), rate
+
+
+def replay(segmenter, chunks):
+    segments = 0
+    start = time.perf_counter()
+    for chunk in chunks:
+        segments += len(segmenter.push(chunk))
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    allocated = 0
+    for chunk in chunks:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        segmenter.push(chunk)
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += peak - before
+    tracemalloc.stop()
+
+    return segments, elapsed, allocated
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else None
+    audio, rate = load_audio(path)
+    chunks = [audio[i:i + CHUNK] for i in range(0, len(audio), CHUNK)]
+    seconds = len(audio) / rate
+    print(f"{len(chunks)} chunks, {seconds:.1f} s of audio at {rate} Hz")
+
+    print(f"{'segmenter':>10} {'segments':>9} {'chunks/s':>12} {'x realtime':>11} {'alloc MB/s':>11} {'KB/chunk':>9}")
+    for name, segmenter in (("legacy", LegacySegmenter(rate)), ("ring", Segmenter(rate))):
+        segments, elapsed, allocated = replay(segmenter, chunks)
+        print(f"{name:>10} {segments:>9} {len(chunks) / elapsed:>12.0f} {seconds / elapsed:>11.0f} "
+              f"{allocated / seconds / 1e6:>11.2f} {allocated / len(chunks) / 1e3:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
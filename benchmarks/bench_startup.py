@@ -0,0 +1,135 @@
+"""
+Backend cold start: what importing server.main costs (from `python -X importtime`), and how
+long a fresh server takes to accept HTTP requests and to open its audio source.
+
+    python -m benchmarks.bench_startup [--runs 5] [--budget-ms 800] [--json]
+
+"import ms" is the median over --runs fresh interpreters, broken down by top-level package
+(self time). Modules that should only load on first use (LLM client, tokenizer, scipy,
+audio drivers, models) are listed if anything imports them eagerly. The server is started
+with the synthetic audio source and writes its session to a temporary folder; engines may
+never report ready without whisper binaries.
+With --budget-ms the exit code is 1 when the import median goes over it.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+import httpx
+
+# imported on first use only; any of these in the import-time report is a regression
+LAZY_MODULES = (
+    "openai", "tiktoken", "scipy", "torch", "whisper", "numba", "fastembed", "onnxruntime",
+    "pyaudiowpatch", "sounddevice", "soundfile", "pywhispercpp", "uvicorn",
+)
+
+
+def import_report(module):
+    """(total microseconds, self microseconds by top-level package) of importing `module`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    total = 0
+    by_package = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        package = name.split(".")[0]
+        by_package[package] = by_package.get(package, 0) + int(own)
+        if name == module:
+            total = int(cumulative)
+    return total, by_package
+
+
+def server_startup(port, timeout):
+    """Seconds until the server answers HTTP, and until its audio source is open (None if never)."""
+    # the server starts a session; keep its transcript and recordings out of ./transcripts
+    transcripts = tempfile.mkdtemp(prefix="lifehelper-startup-")
+    env = dict(os.environ, LIFEHELPER_AUDIO_SOURCE="synthetic", LIFEHELPER_TRANSCRIPTS_DIR=transcripts)
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    accepting = audio = None
+    try:
+        deadline = started + timeout
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1) as client:
+            while time.perf_counter() < deadline and audio is None:
+                try:
+                    status = client.get("/api/status").json()
+                except httpx.TransportError:
+                    time.sleep(0.01)
+                    continue
+                if accepting is None:
+                    accepting = time.perf_counter() - started
+                if status.get("audio"):
+                    audio = time.perf_counter() - started
+                else:
+                    time.sleep(0.01)
+    finally:
+        proc.terminate()
+        proc.wait()
+    return accepting, audio
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="server.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--budget-ms", type=float, help="fail if the import median is above this")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    totals, packages = [], {}
+    for _ in range(args.runs):
+        total, by_package = import_report(args.module)
+        totals.append(total)
+        for package, us in by_package.items():
+            packages.setdefault(package, []).append(us)
+    import_ms = statistics.median(totals) / 1000
+    package_ms = sorted(
+        ((package, statistics.median(values) / 1000) for package, values in packages.items()),
+        key=lambda item: -item[1],
+    )
+    eager = sorted(p for p in packages if p in LAZY_MODULES)
+
+    accepting, audio = server_startup(args.port, args.timeout)
+
+    results = {
+        "benchmark": "startup",
+        "module": args.module,
+        "import_ms": round(import_ms, 1),
+        "import_ms_runs": [round(t / 1000, 1) for t in totals],
+        "packages_ms": {package: round(ms, 1) for package, ms in package_ms[:15]},
+        "eager_lazy_modules": eager,
+        "accepting_ms": round(accepting * 1000) if accepting is not None else None,
+        "audio_ready_ms": round(audio * 1000) if audio is not None else None,
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"import {args.module}: {import_ms:.0f} ms (median of {args.runs})")
+        print(f"{'package':<24} {'self ms':>8}")
+        for package, ms in package_ms[:15]:
+            print(f"{package:<24} {ms:>8.1f}")
+        print(f"loaded eagerly but meant to be lazy: {', '.join(eager) or 'none'}")
+        print(f"server accepting requests after {results['accepting_ms']} ms, audio open after {results['audio_ready_ms']} ms")
+
+    if args.budget_ms is not None and import_ms > args.budget_ms:
+        print(f"❌ import time {import_ms:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Frontend serving throughput: the in-memory, precompressed static bundle versus the old
+StaticFiles mounts with a FileResponse(index.html) catch-all, on a synthetic vite build.
+
+    python -m benchmarks.bench_static [--connections 32] [--duration 5] [--asset-kb 600]
+
+Each server runs in a subprocess (one uvicorn worker). The load generator keeps
+--connections HTTP/1.1 keep-alive connections busy for --duration seconds per case and
+reports requests/s and bytes per response. Cases: a client-side route (index.html
+fallback), the main JS bundle with Accept-Encoding gzip/br, and a revalidation of it
+with If-None-Match.
+"""
+import os
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+
+import httpx
+
+from benchmarks._harness import add_serve_argument, serve as serve_app, spawn, running, wait_ready
+
+APP_PORT = 8769
+ASSET = "assets/index-Bx7kQ2aZ.js"
+
+
+def make_build(root, asset_kb):
+    """A dist folder shaped like vite's: index.html plus hashed JS and CSS in assets/."""
+    rng = random.Random(0)
+    words = ["const", "function", "return", "useState", "props", "children", "=>", "{", "}", "(", ")", ";"]
+    os.makedirs(os.path.join(root, "assets"), exist_ok=True)
+    with open(os.path.join(root, "index.html"), "w") as f:
+        f.write('<!doctype html><html><head><script type="module" src="./' + ASSET + '"></script>'
+                '<link rel="stylesheet" href="./assets/index-D4nP9sLq.css"></head><body><div id="root"></div></body></html>')
+    with open(os.path.join(root, ASSET), "w") as f:
+        size = 0
+        while size < asset_kb * 1024:
+            line = " ".join(rng.choice(words) for _ in range(12)) + f" v{rng.randrange(5000)};\n"
+            f.write(line)
+            size += len(line)
+    with open(os.path.join(root, "assets", "index-D4nP9sLq.css"), "w") as f:
+        f.write("".join(f".c{i}{{margin:{i % 7}px;color:#{i % 4096:03x}}}\n" for i in range(3000)))
+
+
+def serve(port, mode, root):
+    from fastapi import FastAPI
+    from server.routes import static
+
+    app = FastAPI()
+    if mode == "legacy":
+        from fastapi.responses import FileResponse
+        from fastapi.staticfiles import StaticFiles
+
+        # the previous setup from server/main.py
+        app.mount("/assets", StaticFiles(directory=os.path.join(root, "assets")), name="assets")
+        app.mount("/", StaticFiles(directory=root, html=True), name="root")
+
+        @app.get("/{full_path:path}")
+        async def serve_react(full_path: str):
+            return FileResponse(os.path.join(root, "index.html"))
+    else:
+        static.bundle = static.StaticBundle(root)
+        static.bundle.files()
+        app.include_router(static.router)
+
+    serve_app(app, port)
+
+
+async def connection(path, headers, deadline, counts):
+    reader, writer = await asyncio.open_connection("127.0.0.1", APP_PORT)
+    request = f"GET /{path} HTTP/1.1\r\nHost: localhost\r\n{headers}\r\n".encode()
+    try:
+        while time.perf_counter() < deadline:
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            status = int(head.split(b" ", 2)[1])
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            if length:
+                await reader.readexactly(length)
+            counts["requests"] += 1
+            counts["bytes"] += length
+            counts["status"].add(status)
+    finally:
+        writer.close()
+
+
+async def load(path, headers, connections, duration):
+    counts = {"requests": 0, "bytes": 0, "status": set()}
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*[connection(path, headers, deadline, counts) for _ in range(connections)])
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    add_serve_argument(parser)
+    parser.add_argument("--mode", default="bundle")
+    parser.add_argument("--root")
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--asset-kb", type=int, default=600)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.mode, args.root)
+        return
+
+    root = tempfile.mkdtemp(prefix="lifehelper-dist-")
+    make_build(root, args.asset_kb)
+    print(f"{'server':>7} {'case':<22} {'req/s':>8} {'bytes/resp':>11} {'status':>7}")
+    for mode in ("legacy", "bundle"):
+        with running(spawn("benchmarks.bench_static", "--serve", APP_PORT, "--mode", mode, "--root", root)):
+            wait_ready(f"http://127.0.0.1:{APP_PORT}/index.html")
+            etag = httpx.get(f"http://127.0.0.1:{APP_PORT}/{ASSET}", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+            cases = (
+                ("route (index.html)", "sessions/today", ""),
+                ("asset, gzip/br", ASSET, "Accept-Encoding: gzip, br\r\n"),
+                ("asset, If-None-Match", ASSET, f"Accept-Encoding: gzip, br\r\nIf-None-Match: {etag}\r\n"),
+            )
+            for name, path, headers in cases:
+                counts = asyncio.run(load(path, headers, args.connections, args.duration))
+                rate = counts["requests"] / args.duration
+                size = counts["bytes"] / max(counts["requests"], 1)
+                status = ",".join(str(s) for s in sorted(counts["status"]))
+                print(f"{mode:>7} {name:<22} {rate:>8.0f} {size:>11.0f} {status:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Offline VAD evaluation: how much audio each detector forwards to whisper.
+
+    python -m benchmarks.eval_vad [file.wav ...]
+
+Each file is resampled to 16 kHz and run through the Segmenter exactly as
+transcribe_worker does. Without files, a synthetic 2-minute mix is used: speech-like
+bursts (voiced harmonics with syllable-rate modulation) over continuous background
+music, where the fraction of real speech is known and speech recall is reported.
+"""
+import sys
+import numpy as np
+import soundfile as sf
+
+from server import config
+from server.audio.resample import StreamingResampler
+from server.audio.segmenter import Segmenter
+from server.audio.vad import create_vad
+from server.routes.static import resource_path
+
+RATE = 16000
+CHUNK = 341  # one 1024-frame device chunk at 48 kHz
+
+
+def synthetic(seconds=120, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(RATE * seconds) / RATE
+
+    # background music: a slowly changing chord, about 25 dB below speech
+    chords = [(220, 277, 330), (196, 247, 294), (175, 220, 262)]
+    music = np.zeros_like(t)
+    for i, chord in enumerate(chords):
+        active = ((t // 4) % len(chords)) == i
+        music += active * sum(np.sin(2 * np.pi * f * t) for f in chord)
+    music *= 0.01
+
+    # utterances of 1-5 s separated by 1-6 s pauses
+    speech = np.zeros_like(t)
+    labels = np.zeros(len(t), dtype=bool)
+    pos = RATE * 2
+    while pos < len(t) - RATE * 5:
+        length = int(RATE * rng.uniform(1, 5))
+        seg_t = t[pos:pos + length]
+        f0 = rng.uniform(100, 200)
+        voiced = sum(np.sin(2 * np.pi * f0 * k * seg_t) / k for k in range(1, 8))
+        syllables = np.clip(np.sin(2 * np.pi * rng.uniform(3, 5) * seg_t), 0, None)
+        speech[pos:pos + length] = 0.1 * voiced * syllables
+        labels[pos:pos + length] = True
+        pos += length + int(RATE * rng.uniform(1, 6))
+
+    audio = speech + music + 0.0005 * rng.standard_normal(len(t))
+    return audio.astype(np.float32), labels
+
+
+def load(path):
+    audio, rate = sf.read(path, dtype="float32", always_2d=True)
+    audio = audio.mean(axis=1)
+    return StreamingResampler(rate, RATE).process(audio), None
+
+
+def evaluate(audio, labels, name):
+    vad = create_vad(name, RATE, resource_path(config.VAD_MODEL_PATH))
+    segmenter = Segmenter(RATE, vad=vad, preroll=None if vad.name == "rms" else config.VAD_PREROLL)
+
+    forwarded = np.zeros(len(audio), dtype=bool)
+    segments = 0
+    for i in range(0, len(audio), CHUNK):
+        for segment in segmenter.push(audio[i:i + CHUNK]):
+            # a segment ends where the still-buffered audio begins
+            segments += 1
+            end = segmenter._pos - len(segmenter._ring)
+            forwarded[max(end - len(segment), 0):end] = True
+
+    total = len(audio) / RATE
+    sent = segmenter.forwarded_samples / RATE
+    recall = forwarded[labels].mean() * 100 if labels is not None else float("nan")
+    return vad.name, segments, sent, sent / total * 100, recall
+
+
+def main():
+    inputs = [(p, *load(p)) for p in sys.argv[1:]] or [("synthetic", *synthetic())]
+    for label, audio, labels in inputs:
+        print(f"{label}: {len(audio) / RATE:.0f} s" +
+              (f", {labels.mean() * 100:.0f}% speech" if labels is not None else ""))
+        print(f"{'vad':>8} {'segments':>9} {'sent s':>8} {'sent %':>7} {'speech recall %':>16}")
+        for name in ("rms", "energy", "silero"):
+            vad, segments, sent, pct, recall = evaluate(audio, labels, name)
+            if vad != name:
+                continue
+            print(f"{vad:>8} {segments:>9} {sent:>8.1f} {pct:>7.1f} {recall:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
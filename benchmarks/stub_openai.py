@@ -0,0 +1,88 @@
+"""
+Local OpenAI-compatible stub for benchmarks: POST /v1/chat/completions, streaming or not,
+with a fixed time to first token and a fixed delay between tokens.
+
+    python -m benchmarks.stub_openai [--port 8766] [--ttft 0.3] [--tokens 40] [--interval 0.02]
+
+Point the backend at it with OPENAI_BASE_URL=http://127.0.0.1:8766/v1 OPENAI_API_KEY=stub.
+"""
+import json
+import time
+import asyncio
+import argparse
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+settings = {"ttft": 0.3, "tokens": 40, "interval": 0.02}
+stats = {"requests": 0, "completed": 0, "cancelled": 0}
+
+app = FastAPI()
+
+
+def _chunk(content, finish=None):
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": "stub",
+        "choices": [{"index": 0, "delta": {"content": content} if content else {}, "finish_reason": finish}],
+    }
+
+
+@app.post("/v1/chat/completions")
+async def completions(request: Request):
+    body = await request.json()
+    stats["requests"] += 1
+    question = body["messages"][-1]["content"] if body.get("messages") else ""
+    words = [f"w{i}" for i in range(settings["tokens"])]
+
+    if not body.get("stream"):
+        await asyncio.sleep(settings["ttft"] + settings["interval"] * len(words))
+        stats["completed"] += 1
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "stub",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": f"Answer to {question[:40]}: " + " ".join(words)}}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": len(words), "total_tokens": len(words)},
+        }
+
+    async def stream():
+        try:
+            await asyncio.sleep(settings["ttft"])
+            for word in words:
+                yield f"data: {json.dumps(_chunk(word + ' '))}\n\n"
+                await asyncio.sleep(settings["interval"])
+            yield f"data: {json.dumps(_chunk(None, 'stop'))}\n\n"
+            yield "data: [DONE]\n\n"
+            stats["completed"] += 1
+        except asyncio.CancelledError:
+            stats["cancelled"] += 1
+            raise
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+@app.get("/stats")
+def get_stats():
+    return stats
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--ttft", type=float, default=settings["ttft"])
+    parser.add_argument("--tokens", type=int, default=settings["tokens"])
+    parser.add_argument("--interval", type=float, default=settings["interval"])
+    args = parser.parse_args()
+    settings.update(ttft=args.ttft, tokens=args.tokens, interval=args.interval)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
 from server.main import app
 
 if __name__ == "__main__":
+    import multiprocessing
     import uvicorn
+
+    # batch transcription workers are spawned processes; in the frozen app they re-enter here
+    multiprocessing.freeze_support()
     print("🚀 Starting LifeHelper backend...")
     uvicorn.run(
         "server.main:app",
@@ -1,11 +1,17 @@
 # -*- mode: python ; coding: utf-8 -*-
+import os
+
+binaries = [
+    ('whisper/whisper-cli.exe', 'whisper'),              # drop into dist/lifehelper/whisper/
+]
+# persistent engine (config.TRANSCRIBE_ENGINE = "server"); only bundled when the binary is present
+if os.path.exists('whisper/whisper-server.exe'):
+    binaries.append(('whisper/whisper-server.exe', 'whisper'))
 
 a = Analysis(
     ['lifehelper.py'],
     pathex=[],
-    binaries=[
-        ('whisper/whisper-cli.exe', 'whisper'),          # drop into dist/lifehelper/whisper/
-    ],
+    binaries=binaries,
     datas=[
         ('whisper/models/ggml-base.en.bin', 'whisper/models'),  # drop into dist/lifehelper/whisper/models/
         ('dist', 'dist')                                        # dist folder → dist/lifehelper/dist
@@ -14,7 +20,8 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    # not used at runtime; keeps them out of the bundle if they are installed in the build env
+    excludes=['torch', 'torchaudio', 'whisper', 'numba', 'llvmlite', 'sympy', 'networkx', 'tkinter', 'matplotlib', 'IPython'],
     noarchive=False,
     optimize=0,
 )
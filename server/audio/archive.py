@@ -0,0 +1,191 @@
+import io
+import os
+import time
+import queue
+import threading
+import numpy as np
+
+from .. import config as config
+from ..utils.journal import SESSION_NAME_RE
+
+MAX_PENDING_SEGMENTS = 64
+FLUSH_INTERVAL = 2.0
+FORMATS = {"flac": ("FLAC", "PCM_16"), "opus": ("OGG", "OPUS")}
+# one index record per archived segment: transcript id, transcript ts (epoch ms), byte offset
+# and length of its block in the data file, and its length in samples
+INDEX_DTYPE = np.dtype([("id", "<i8"), ("ts", "<i8"), ("offset", "<i8"), ("length", "<u4"), ("samples", "<u4")])
+
+_archive = None
+_index_cache = {}
+
+
+def archive_paths(base):
+    """(data file, index file) of the speech archive for a session path without extension."""
+    return base + ".clips", base + ".clips.idx"
+
+
+def encode_block(audio: np.ndarray, sample_rate, fmt="flac") -> bytes:
+    import soundfile as sf
+
+    container, subtype = FORMATS[fmt]
+    out = io.BytesIO()
+    sf.write(out, np.clip(audio.reshape(-1), -1.0, 1.0), sample_rate, format=container, subtype=subtype)
+    return out.getvalue()
+
+
+class SpeechArchive:
+    """
+    Speech-only session audio: every transcribed segment is encoded on its own (a complete
+    FLAC or Ogg Opus file) and appended to one data file, with a fixed-size index record
+    pointing at it. A clip is then one seek and one read, with nothing decoded.
+
+    Encoding runs on a background thread; segments are dropped rather than ever blocking
+    the commit path.
+    """
+
+    def __init__(self, base, sample_rate, fmt="flac", flush_interval=FLUSH_INTERVAL, max_pending=MAX_PENDING_SEGMENTS):
+        self.data_path, self.index_path = archive_paths(base)
+        self.sample_rate = sample_rate
+        self.fmt = fmt
+        self.flush_interval = flush_interval
+        self.segments = 0
+        self.samples = 0
+        self.dropped_segments = 0
+        self._q = queue.Queue(maxsize=max_pending)
+        self._stop = threading.Event()
+        self._data = open(self.data_path, "ab")
+        self._index = open(self.index_path, "ab")
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def add(self, entry: dict, audio: np.ndarray):
+        """Called when a segment is committed; never blocks."""
+        try:
+            self._q.put_nowait((entry["id"], entry["ts"], audio))
+        except queue.Full:
+            self.dropped_segments += 1
+
+    def _run(self):
+        last_sync = time.monotonic()
+        while not self._stop.is_set() or not self._q.empty():
+            try:
+                self._write_block(*self._q.get(timeout=self.flush_interval))
+            except queue.Empty:
+                pass
+            except Exception as e:
+                print(f"⚠️ Could not archive a segment: {e}")
+            if time.monotonic() - last_sync >= self.flush_interval:
+                self._sync()
+                last_sync = time.monotonic()
+        # the files belong to this thread, so a slow final encode is never cut off mid-write
+        self._sync()
+        self._data.close()
+        self._index.close()
+
+    def _write_block(self, entry_id, ts, audio):
+        block = encode_block(audio, self.sample_rate, self.fmt)
+        offset = self._data.tell()
+        self._data.write(block)
+        self._data.flush()
+        # the data goes out first, so an index record never points past the end of the data
+        record = np.array([(entry_id, ts, offset, len(block), len(audio))], dtype=INDEX_DTYPE)
+        self._index.write(record.tobytes())
+        self._index.flush()
+        self.segments += 1
+        self.samples += len(audio)
+
+    def _sync(self):
+        for f in (self._data, self._index):
+            os.fsync(f.fileno())
+
+    def close(self, timeout=30):
+        self._stop.set()
+        self._thread.join(timeout=timeout)
+        if self._thread.is_alive():
+            print(f"⚠️ Speech archive still has {self._q.qsize()} segments to encode, giving up on them")
+        if self.dropped_segments:
+            print(f"⚠️ Speech archive dropped {self.dropped_segments} segments (encoding too slow)")
+
+    @property
+    def seconds(self):
+        return self.samples / self.sample_rate
+
+
+def start_speech_archive(base, sample_rate, fmt=None):
+    global _archive
+
+    fmt = fmt or config.SPEECH_ARCHIVE_FORMAT
+    if fmt not in FORMATS:
+        print(f"⚠️ Unknown SPEECH_ARCHIVE_FORMAT '{fmt}', using flac")
+        fmt = "flac"
+    os.makedirs(os.path.dirname(base) or ".", exist_ok=True)
+    _archive = SpeechArchive(base, sample_rate, fmt).start()
+    return _archive
+
+
+def archive_segment(entry: dict, audio: np.ndarray):
+    if _archive is not None:
+        _archive.add(entry, audio)
+
+
+def stop_speech_archive():
+    """Flushes the archive; returns (data path, seconds of speech) or None if there was none."""
+    global _archive
+
+    if _archive is None:
+        return None
+    archive, _archive = _archive, None
+    archive.close()
+    return archive.data_path, archive.seconds
+
+
+# --- Reading clips back ---
+
+def _read_index(path):
+    """Index records, cached by (size, mtime); a torn last record (crash mid-write) is ignored."""
+    st = os.stat(path)
+    key = (st.st_size, st.st_mtime_ns)
+    cached = _index_cache.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+    count = st.st_size // INDEX_DTYPE.itemsize
+    index = np.fromfile(path, dtype=INDEX_DTYPE, count=count)
+    _index_cache[path] = (key, index)
+    return index
+
+
+def read_clip(name, segment_id=None, ts=None):
+    """
+    The encoded audio of one segment of a session, as (bytes, media type, record), or None.
+    By transcript id, or by timestamp (epoch ms): segments are committed after they are
+    spoken, so `ts` selects the first segment committed at or after it.
+    """
+    if not SESSION_NAME_RE.match(name):
+        return None
+    data_path, index_path = archive_paths(os.path.join(config.TRANSCRIPTS_DIR, name))
+    if not os.path.exists(index_path):
+        return None
+    index = _read_index(index_path)
+    if segment_id is not None:
+        # ids and timestamps only grow, so both columns can be bisected
+        i = int(np.searchsorted(index["id"], segment_id))
+        if i == len(index) or index["id"][i] != segment_id:
+            return None
+    elif ts is not None:
+        i = int(np.searchsorted(index["ts"], ts))
+        if i == len(index):
+            return None
+    else:
+        return None
+
+    record = index[i]
+    with open(data_path, "rb") as f:
+        f.seek(int(record["offset"]))
+        block = f.read(int(record["length"]))
+    media_type = "audio/ogg" if block[:4] == b"OggS" else "audio/flac"
+    return block, media_type, {
+        "id": int(record["id"]), "ts": int(record["ts"]), "samples": int(record["samples"])
+    }
@@ -0,0 +1,230 @@
+"""
+Offline re-transcription of recorded session WAVs through the live segmenter and engine.
+
+    python -m server.audio.batch [file.wav ...] [--model whisper/models/ggml-medium.en.bin] [--workers 2]
+
+Without files, every session_*.wav in TRANSCRIPTS_DIR is processed. Each file gets a
+JSONL transcript in BATCH_DIR, written segment by segment; an interrupted run resumes
+after the last written segment, and finished files (ending in a "done" line) are skipped.
+"""
+import os
+import re
+import json
+import argparse
+import multiprocessing
+import multiprocessing.util
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+from .. import config as config
+from ..utils.engine import get_engine, close_engine
+from ..utils.whisper_cpp import valid_text
+from ..routes.static import resource_path
+from .segmenter import Segmenter
+from .resample import StreamingResampler
+from .vad import create_vad
+from .sources import open_wav, to_float
+
+CHUNK_SECONDS = 30
+SESSION_TIME_RE = re.compile(r"session_(\d{4}-\d{2}-\d{2}T\d{2}-\d{2}-\d{2})")
+
+_slot = 0
+
+
+def output_path(wav_path, out_dir, model):
+    stem = os.path.splitext(os.path.basename(wav_path))[0]
+    model_stem = os.path.splitext(os.path.basename(model))[0]
+    return os.path.join(out_dir, f"{stem}.{model_stem}.jsonl")
+
+
+def read_progress(out_path, repair=False):
+    """(seconds already transcribed, segments written, done). With `repair`, a torn last line is cut off."""
+    if not os.path.exists(out_path):
+        return 0.0, 0, False
+
+    end, count, done = 0.0, 0, False
+    valid_bytes = 0
+    with open(out_path, "rb") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            if not line.endswith(b"\n"):
+                break
+            valid_bytes += len(line)
+            if record.get("done"):
+                done = True
+            else:
+                end = record["end"]
+                count += 1
+
+    if repair and valid_bytes < os.path.getsize(out_path):
+        with open(out_path, "r+b") as f:
+            f.truncate(valid_bytes)
+    return end, count, done
+
+
+def session_start(path):
+    match = SESSION_TIME_RE.search(os.path.basename(path))
+    if not match:
+        return None
+    return datetime.strptime(match.group(1), "%Y-%m-%dT%H-%M-%S")
+
+
+def transcribe_file(path, out_path, restart=False) -> dict:
+    """Transcribes one WAV into out_path, resuming unless `restart`. Runs in a pool worker."""
+    rate, data = open_wav(path)
+    duration = data.shape[0] / rate
+    if restart and os.path.exists(out_path):
+        os.remove(out_path)
+    resume_at, count, done = read_progress(out_path, repair=True)
+    if done:
+        return {"file": path, "output": out_path, "segments": count, "duration": duration, "skipped": True}
+
+    vad = create_vad(config.VAD_ENGINE, config.SAMPLE_RATE, resource_path(config.VAD_MODEL_PATH))
+    segmenter = Segmenter(
+        config.SAMPLE_RATE,
+        vad=vad,
+        min_length=1.8,
+        max_length=7.0,
+        preroll=None if vad.name == "rms" else config.VAD_PREROLL,
+    )
+    resampler = StreamingResampler(rate, config.SAMPLE_RATE)
+    engine = get_engine(_slot)
+    started = session_start(path)
+
+    def write(out, start, segment):
+        nonlocal count
+        text = engine.transcribe(segment, config.SAMPLE_RATE)
+        if not valid_text(text):
+            return
+        count += 1
+        begin = resume_at + start / config.SAMPLE_RATE
+        record = {"id": count, "start": round(begin, 3), "end": round(begin + len(segment) / config.SAMPLE_RATE, 3)}
+        if started is not None:
+            record["timestamp"] = (started + timedelta(seconds=begin)).isoformat(timespec="seconds")
+        record["text"] = text.strip()
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    chunk = int(rate * CHUNK_SECONDS)
+    with open(out_path, "a", encoding="utf-8") as out:
+        for pos in range(int(resume_at * rate), data.shape[0], chunk):
+            # slicing the memmap pages in just this chunk
+            samples = to_float(data[pos:pos + chunk])
+            samples = resampler.process(samples.mean(axis=1) if samples.ndim > 1 else samples)
+            for start, segment in segmenter.push_timed(samples):
+                write(out, start, segment)
+
+        tail_start = segmenter.buffered_start
+        tail = segmenter.flush()
+        if len(tail) >= config.SAMPLE_RATE // 2:
+            write(out, tail_start, tail)
+        out.write(json.dumps({"done": True, "duration": round(duration, 3), "segments": count}) + "\n")
+
+    return {"file": path, "output": out_path, "segments": count, "duration": duration, "skipped": False}
+
+
+def file_progress(path, out_path) -> dict:
+    try:
+        rate, data = open_wav(path)
+        duration = data.shape[0] / rate
+    except Exception:
+        duration = None
+    position, count, done = read_progress(out_path)
+    return {"file": os.path.basename(path), "duration": duration, "position": position, "segments": count, "done": done}
+
+
+def session_of(path):
+    """Session name of a recording: <session>.wav, or <session>.<stream>.wav for extra streams."""
+    return os.path.basename(path).split(".")[0]
+
+
+def session_wavs(exclude=None):
+    """Recorded session WAVs; `exclude` is a session still being recorded (its files are incomplete)."""
+    if not os.path.isdir(config.TRANSCRIPTS_DIR):
+        return []
+    return sorted(
+        os.path.join(config.TRANSCRIPTS_DIR, f) for f in os.listdir(config.TRANSCRIPTS_DIR)
+        if f.startswith("session_") and f.endswith(".wav") and session_of(f) != exclude
+    )
+
+
+def _init_worker(slot_counter, overrides):
+    global _slot
+
+    # each worker gets its own engine slot (and whisper-server port), after the live pipeline's
+    with slot_counter.get_lock():
+        _slot = slot_counter.value
+        slot_counter.value += 1
+    for name, value in overrides.items():
+        setattr(config, name, value)
+    # pool workers leave through os._exit, which skips atexit; Finalize still runs
+    multiprocessing.util.Finalize(None, close_engine, exitpriority=10)
+
+
+def run_batch(paths, out_dir=None, workers=None, overrides=None, restart=False, on_result=None) -> list:
+    """Transcribes files in parallel worker processes, one file per worker at a time."""
+    overrides = dict(overrides or {})
+    model = overrides.get("WHISPER_MODEL", config.WHISPER_MODEL)
+    out_dir = out_dir or config.BATCH_DIR
+    workers = max(1, min(workers or config.BATCH_WORKERS, len(paths)))
+
+    # spawn, not fork: the server process has capture and engine threads that must not be copied
+    context = multiprocessing.get_context("spawn")
+    slot_counter = context.Value("i", config.TRANSCRIBE_WORKERS)
+    results = []
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                             initargs=(slot_counter, overrides)) as pool:
+        futures = {pool.submit(transcribe_file, path, output_path(path, out_dir, model), restart): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"file": futures[future], "error": str(e)}
+            results.append(result)
+            if on_result:
+                on_result(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-transcribe recorded session WAVs.")
+    parser.add_argument("files", nargs="*", help="WAV files (default: every session_*.wav in TRANSCRIPTS_DIR)")
+    parser.add_argument("--model", help="whisper model, e.g. whisper/models/ggml-medium.en.bin")
+    parser.add_argument("--engine", choices=("server", "bindings", "cli"))
+    parser.add_argument("--threads", type=int, help="whisper threads per worker")
+    parser.add_argument("--workers", type=int, default=config.BATCH_WORKERS)
+    parser.add_argument("--out", default=config.BATCH_DIR)
+    parser.add_argument("--restart", action="store_true", help="ignore earlier progress")
+    args = parser.parse_args()
+
+    overrides = {}
+    if args.model:
+        overrides["WHISPER_MODEL"] = args.model
+    if args.engine:
+        overrides["TRANSCRIBE_ENGINE"] = args.engine
+    if args.threads:
+        overrides["WHISPER_THREADS"] = args.threads
+
+    paths = args.files or session_wavs()
+    if not paths:
+        print("No WAV files to transcribe.")
+        return
+
+    def report(result):
+        if "error" in result:
+            print(f"❌ {result['file']}: {result['error']}")
+        elif result["skipped"]:
+            print(f"⏭️ {result['file']}: already done")
+        else:
+            print(f"✅ {result['file']}: {result['segments']} segments, {result['duration'] / 60:.1f} min -> {result['output']}")
+
+    print(f"Transcribing {len(paths)} file(s) with {args.workers} worker(s)")
+    run_batch(paths, args.out, args.workers, overrides, args.restart, on_result=report)
+
+
+if __name__ == "__main__":
+    main()
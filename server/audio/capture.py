@@ -1,69 +1,69 @@
 import numpy as np
-import pyaudiowpatch as pyaudio 
 
-from .transcribe import transcribe_segment 
 from .. import config as config 
-from ..audio import thread_starter as thread_starter
+from .resample import StreamingResampler
+from ..utils.metrics import registry
 
+AUDIO_CHUNKS = registry.counter("lifehelper_audio_chunks_total", "Chunks read from the audio source", labels=("source",))
+AUDIO_SECONDS = registry.counter(
+    "lifehelper_audio_seconds_total", "Seconds of audio read from the audio source", labels=("source",)
+)
+AUDIO_OVERFLOWS = registry.counter(
+    "lifehelper_audio_overflows_total", "Reads where the device buffer had overflowed and audio was lost", labels=("source",)
+)
+CAPTURE_ERRORS = registry.counter("lifehelper_capture_errors_total", "Errors that ended the capture loop", labels=("source",))
 
-AUDIO_BUFFER = []
+def capture_loop(pipeline):
+    source = pipeline.source
 
-def capture_loop():
-    chunkSize = 1024  
-    if not thread_starter._LOOPBACK_DEVICE_INDEX or not thread_starter._pyaudio_instance:
-        print("Error: Loopback device not initialized. Stopping capture loop.")
-        return
-    print(f"Starting capture stream at {config.SAMPLE_RATE}Hz")
+    print(f"Starting capture of {pipeline.name} at {source.sample_rate}Hz, resampling to {config.SAMPLE_RATE}Hz mono")
+    pipeline.resampler = StreamingResampler(source.sample_rate, config.SAMPLE_RATE)
+    overflows = source.overflows
 
     try:
-        stream = thread_starter._pyaudio_instance.open(format= pyaudio.paInt16,
-                                        channels=thread_starter._CHANNELS,
-                                        rate=config.SAMPLE_RATE,
-                                        input=True,
-                                        frames_per_buffer=chunkSize,
-                                        input_device_index=thread_starter._LOOPBACK_DEVICE_INDEX)
-
-        while not thread_starter._stop:
+        while not pipeline.stopped:
             try:
                 # This is a blocking read call
-                data = stream.read(chunkSize, exception_on_overflow=False) 
-                _put_data_to_queue(data)
-                
+                data = source.read()
+                if data is None:
+                    print(f"Audio source {pipeline.name} finished.")
+                    break
+                AUDIO_CHUNKS.inc(source=pipeline.name)
+                AUDIO_SECONDS.inc(len(data) / source.sample_rate, source=pipeline.name)
+                if source.overflows != overflows:
+                    AUDIO_OVERFLOWS.inc(source.overflows - overflows, source=pipeline.name)
+                    overflows = source.overflows
+                _put_data_to_queue(pipeline, data)
+
             except IOError as e:
                 # Handle stream I/O errors
-                if e.errno == -9981: 
-                    print(f"Stream error in capture loop: {e}")
-                else:
-                    raise e
+                print(f"Stream error in capture loop of {pipeline.name}: {e}")
+                CAPTURE_ERRORS.inc(source=pipeline.name)
                 break
             except Exception as e:
-                print(f"Unexpected error in capture loop: {e}")
+                print(f"Unexpected error in capture loop of {pipeline.name}: {e}")
+                CAPTURE_ERRORS.inc(source=pipeline.name)
                 break
-
-    except Exception as e:
-        print(f"Failed to open PyAudio stream: {e}")
     finally:
-        if 'stream' in locals() and stream.is_active():
-            stream.stop_stream()
-            stream.close()
-        print("Capture loop finished. ")
+        source.close()
+        print(f"Capture loop of {pipeline.name} finished. ")
 
-def _put_data_to_queue(indata):
-    """Converts raw bytes to mono float32 numpy array and puts it into the queue."""
-    
-    # 1. Convert raw bytes (paInt16) to numpy int16 array
-    np_data_int16 = np.frombuffer(indata, dtype=np.int16)
-    
-    # 2. Convert to float32 (-1.0 to 1.0)
-    np_data_float32 = np_data_int16.astype(np.float32) / 32768.0 
-    
-    # 3. Handle Stereo -> Mono (Mean across channels)
-    if thread_starter._CHANNELS > 1:
-        # Reshape to (M, thread_starter._CHANNELS) and take the mean across channels (axis=1)
-        np_data_float32 = np_data_float32.reshape(-1, thread_starter._CHANNELS).mean(axis=1, keepdims=True)
-    elif thread_starter._CHANNELS == 1:
-         np_data_float32 = np_data_float32.reshape(-1, 1)
-        
-    thread_starter.audio_q.put(np_data_float32)
-    AUDIO_BUFFER.append(np_data_float32)
+def _put_data_to_queue(pipeline, frames):
+    """Turns a (frames, channels) float32 chunk into mono at config.SAMPLE_RATE and puts it into the pipeline's queue."""
+
+    # 1. Handle Stereo -> Mono (Mean across channels)
+    if frames.shape[1] > 1:
+        np_data_float32 = frames.mean(axis=1, keepdims=True, dtype=np.float32)
+    else:
+        np_data_float32 = frames
 
+    # 2. Resample from the device rate to the pipeline rate (chunk-continuous)
+    resampler = pipeline.resampler
+    if resampler is not None and not resampler.passthrough:
+        np_data_float32 = resampler.process(np_data_float32).reshape(-1, 1)
+        if not len(np_data_float32):
+            return
+        
+    pipeline.audio_q.put(np_data_float32)
+    if pipeline.recorder is not None:
+        pipeline.recorder.write(np_data_float32)
@@ -0,0 +1,80 @@
+import queue
+import itertools
+import threading
+
+from .. import config as config
+from .capture import capture_loop
+from . import transcribe
+from .transcribe import transcribe_worker, commit_text
+from .pool import OrderedCommitter
+
+
+class AudioPipeline:
+    """
+    One captured stream (e.g. the loopback of what others say, or our microphone): its
+    source, its capture and segmentation threads and the queue between them, and the
+    committer that puts its segments into the transcript in order, tagged with `name`.
+    Decoding is done by the inference workers shared by all pipelines (see SegmentQueue).
+    """
+
+    def __init__(self, name, source, index=0, recorder=None):
+        self.name = name
+        self.source = source
+        self.index = index
+        self.recorder = recorder
+        self.audio_q = queue.Queue()
+        self.resampler = None
+        self.segments = 0
+        self.stopped = False
+        self._seq = itertools.count()
+        # results are (text, segment audio)
+        self.committer = OrderedCommitter(lambda result: commit_text(*result, source=self.name))
+        self._threads = []
+
+    def __str__(self):
+        return self.name
+
+    def next_seq(self):
+        self.segments += 1
+        return next(self._seq)
+
+    def start(self):
+        transcribe.segment_q.add_stream(self, on_drop=self.committer.skip)
+        self._threads = [
+            threading.Thread(target=capture_loop, args=(self,), daemon=True),
+            threading.Thread(target=transcribe_worker, args=(self,), daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self.stopped = True
+        transcribe.segment_q.remove_stream(self)
+
+    @property
+    def in_flight(self):
+        """Segments cut but not committed yet (queued, decoding or reordering)."""
+        return self.segments - self.committer.released
+
+    def describe(self):
+        return f"{self.name}: {self.source.describe()}"
+
+
+def parse_streams(spec=None):
+    """
+    [(name, source kind)] from AUDIO_STREAMS ("them=wasapi,me=sounddevice"); a bare kind
+    is named after itself. Empty means the single AUDIO_SOURCE stream.
+    """
+    spec = config.AUDIO_STREAMS if spec is None else spec
+    streams = []
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, kind = part.rpartition("=")
+        name, kind = name.strip() or kind.strip(), kind.strip()
+        if any(name == other for other, _ in streams):
+            raise ValueError(f"Two audio streams are named '{name}'")
+        streams.append((name, kind))
+    return streams or [(config.AUDIO_SOURCE, config.AUDIO_SOURCE)]
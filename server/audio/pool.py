@@ -0,0 +1,127 @@
+import time
+import queue
+import threading
+from collections import deque
+
+
+class _Stream:
+    def __init__(self, on_drop):
+        self.items = deque()
+        self.on_drop = on_drop
+        # samples handed to workers so far: the stream's position in the fair order
+        self.served = 0
+        self.dropped = 0
+
+
+class SegmentQueue:
+    """
+    Bounded hand-off between segmentation and transcription, shared by every audio stream.
+
+    Each stream has its own `maxsize` slots. Policy "block" makes a stream's segmentation
+    wait for a free slot (audio then queues up in its audio_q), "drop_oldest" discards its
+    oldest waiting segment to keep latency bounded. Workers take from the waiting stream
+    that has had the fewest seconds of audio decoded (start-time fair queuing), so a
+    talkative stream cannot starve a quiet one; a stream that was idle gets no credit for it.
+    """
+
+    def __init__(self, maxsize, policy="drop_oldest"):
+        if policy not in ("block", "drop_oldest"):
+            raise ValueError(f"Unknown backpressure policy: {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+        self._streams = {}
+        # fair-order position of the last segment handed out
+        self._clock = 0
+        self._cond = threading.Condition()
+
+    def add_stream(self, stream, on_drop=None):
+        with self._cond:
+            self._streams[stream] = _Stream(on_drop)
+
+    def remove_stream(self, stream):
+        with self._cond:
+            self._streams.pop(stream, None)
+
+    def put(self, stream, seq, segment, should_stop=lambda: False):
+        dropped = []
+        with self._cond:
+            s = self._streams[stream]
+            while len(s.items) >= self.maxsize and not should_stop():
+                if self.policy == "drop_oldest":
+                    dropped.append(s.items.popleft()[0])
+                    s.dropped += 1
+                    self.dropped += 1
+                else:
+                    self._cond.wait(0.2)
+            if should_stop():
+                return False
+            if not s.items:
+                # waking up: no credit for the idle time
+                s.served = max(s.served, self._clock)
+            s.items.append((seq, segment, time.monotonic()))
+            self._cond.notify_all()
+
+        for seq in dropped:
+            print(f"⚠️ Transcription backlog full, dropped segment #{seq} of {stream}")
+            if s.on_drop:
+                s.on_drop(seq)
+        return True
+
+    def get(self, timeout=None):
+        """(stream, seq, segment, seconds it waited) of the next segment to decode; raises queue.Empty after `timeout`."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                waiting = [(stream, s) for stream, s in self._streams.items() if s.items]
+                if waiting:
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise queue.Empty
+                self._cond.wait(remaining)
+
+            stream, s = min(waiting, key=lambda item: item[1].served)
+            seq, segment, queued_at = s.items.popleft()
+            self._clock = s.served
+            s.served += len(segment)
+            # a producer may be blocked on this stream's slots
+            self._cond.notify_all()
+            return stream, seq, segment, time.monotonic() - queued_at
+
+    def dropped_from(self, stream):
+        with self._cond:
+            return self._streams[stream].dropped if stream in self._streams else 0
+
+    def qsize(self, stream=None):
+        with self._cond:
+            if stream is not None:
+                return len(self._streams[stream].items) if stream in self._streams else 0
+            return sum(len(s.items) for s in self._streams.values())
+
+
+class OrderedCommitter:
+    """Releases results in segment sequence order, whichever worker finishes first."""
+
+    def __init__(self, commit_fn):
+        self.commit_fn = commit_fn
+        self._next = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def commit(self, seq, result):
+        with self._lock:
+            self._pending[seq] = result
+            while self._next in self._pending:
+                result = self._pending.pop(self._next)
+                self._next += 1
+                if result:
+                    self.commit_fn(result)
+
+    def skip(self, seq):
+        self.commit(seq, None)
+
+    @property
+    def released(self):
+        """Sequence numbers handed to commit_fn (or skipped) so far."""
+        return self._next
@@ -0,0 +1,128 @@
+import os
+import time
+import queue
+import struct
+import threading
+import numpy as np
+
+# ~10 s of 1024-frame chunks at 48 kHz; when full, new chunks are dropped rather than blocking capture
+MAX_PENDING_CHUNKS = 500
+FLUSH_INTERVAL = 2.0
+
+_recorders = []
+
+
+class WavAppender:
+    """16-bit PCM WAV file that is appended to and whose header is patched on every flush."""
+
+    def __init__(self, path, sample_rate, channels=1):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.data_bytes = 0
+        self._f = open(path, "wb")
+        self._f.write(self._header())
+
+    def _header(self):
+        block_align = self.channels * 2
+        return struct.pack(
+            "<4sI4s4sIHHIIHH4sI",
+            b"RIFF", 36 + self.data_bytes, b"WAVE",
+            b"fmt ", 16, 1, self.channels, self.sample_rate,
+            self.sample_rate * block_align, block_align, 16,
+            b"data", self.data_bytes,
+        )
+
+    def write(self, pcm: np.ndarray):
+        data = pcm.astype("<i2", copy=False).tobytes()
+        self._f.write(data)
+        self.data_bytes += len(data)
+
+    def flush(self):
+        """Rewrites the sizes in the header and syncs to disk, so the file is playable if we crash."""
+        pos = self._f.tell()
+        self._f.seek(0)
+        self._f.write(self._header())
+        self._f.seek(pos)
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+    def close(self):
+        if self._f.closed:
+            return
+        self.flush()
+        self._f.close()
+
+
+class SessionRecorder:
+    """Streams session audio to disk as int16 on a background thread with bounded memory."""
+
+    def __init__(self, path, sample_rate, flush_interval=FLUSH_INTERVAL, max_pending=MAX_PENDING_CHUNKS):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.flush_interval = flush_interval
+        self.dropped_chunks = 0
+        self._q = queue.Queue(maxsize=max_pending)
+        self._stop = threading.Event()
+        self._wav = WavAppender(path, sample_rate)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def write(self, chunk: np.ndarray):
+        """Called from the capture thread; never blocks."""
+        try:
+            self._q.put_nowait(chunk)
+        except queue.Full:
+            self.dropped_chunks += 1
+
+    def _run(self):
+        last_flush = time.monotonic()
+        while not self._stop.is_set() or not self._q.empty():
+            try:
+                self._write_chunk(self._q.get(timeout=self.flush_interval))
+            except queue.Empty:
+                pass
+            if time.monotonic() - last_flush >= self.flush_interval:
+                self._wav.flush()
+                last_flush = time.monotonic()
+
+    def _write_chunk(self, chunk):
+        pcm = np.clip(chunk.reshape(-1), -1.0, 1.0) * 32767.0
+        self._wav.write(pcm)
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(timeout=10)
+        self._wav.close()
+        if self.dropped_chunks:
+            print(f"⚠️ Recorder dropped {self.dropped_chunks} chunks (disk too slow)")
+
+    @property
+    def seconds(self):
+        return self._wav.data_bytes / 2 / self.sample_rate
+
+
+def start_session_recording(path, sample_rate):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    recorder = SessionRecorder(path, sample_rate).start()
+    _recorders.append(recorder)
+    print(f"🎙️ Recording session audio to {path}")
+    return recorder
+
+
+def dropped_chunks():
+    return sum(recorder.dropped_chunks for recorder in _recorders)
+
+
+def stop_session_recording():
+    """Finalizes the WAV headers; returns [(path, seconds)] of every recording (one per audio stream)."""
+    recorders = list(_recorders)
+    _recorders.clear()
+    recorded = []
+    for recorder in recorders:
+        recorder.close()
+        recorded.append((recorder.path, recorder.seconds))
+    return recorded
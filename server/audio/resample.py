@@ -0,0 +1,83 @@
+from math import gcd
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class StreamingResampler:
+    """
+    Chunk-continuous polyphase resampler (same filter design as scipy's resample_poly).
+
+    Keeps the last few input samples between calls, so feeding a signal in chunks gives
+    the same output as feeding it in one piece. Output lags the input by the filter's
+    group delay, `delay` output samples: half_len_factor x max(up, down) / down, so 10
+    when downsampling (44.1/48 kHz to 16 kHz) and more when upsampling (20 for 8 to 16 kHz).
+    """
+
+    def __init__(self, in_rate: int, out_rate: int, half_len_factor: int = 10):
+        from scipy.signal import firwin
+
+        g = gcd(int(in_rate), int(out_rate))
+        self.up = int(out_rate) // g
+        self.down = int(in_rate) // g
+        self.in_rate = int(in_rate)
+        self.out_rate = int(out_rate)
+        self.delay = 0
+        if self.passthrough:
+            return
+
+        max_rate = max(self.up, self.down)
+        half_len = half_len_factor * max_rate
+        h = firwin(2 * half_len + 1, 1.0 / max_rate, window=("kaiser", 5.0)) * self.up
+        # the filter is centred half_len samples in, at the upsampled rate
+        self.delay = half_len / self.down
+
+        # polyphase taps: phase p uses h[p], h[p + up], h[p + 2*up], ...
+        self.taps = -(-len(h) // self.up)
+        h = np.concatenate([h, np.zeros(self.taps * self.up - len(h))])
+        phases = h.reshape(self.taps, self.up).T
+        # reversed so each row lines up with a forward sliding window of the input
+        self._phases = np.ascontiguousarray(phases[:, ::-1], dtype=np.float32)
+
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._consumed = 0
+        self._produced = 0
+
+    @property
+    def passthrough(self):
+        return self.up == self.down
+
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        """Resamples a 1-D float32 chunk; returns however many output samples are now complete."""
+        chunk = np.asarray(chunk, dtype=np.float32).reshape(-1)
+        if self.passthrough:
+            return chunk
+
+        before = self._consumed
+        total = before + len(chunk)
+        ext = np.concatenate([self._history, chunk])
+
+        # outputs n whose newest input sample floor(n * down / up) has arrived
+        n_end = (total * self.up + self.down - 1) // self.down
+        n = np.arange(self._produced, n_end, dtype=np.int64)
+        t = n * self.down
+        newest = t // self.up - before + (self.taps - 1)
+        phase = t % self.up
+
+        windows = sliding_window_view(ext, self.taps)[newest - (self.taps - 1)]
+        if self.up == 1:
+            out = windows @ self._phases[0]
+        else:
+            out = np.einsum("ij,ij->i", windows, self._phases[phase])
+
+        self._history = ext[-(self.taps - 1):].copy() if self.taps > 1 else self._history
+        self._consumed = total
+        self._produced = n_end
+        return out.astype(np.float32, copy=False)
+
+    def reset(self):
+        if self.passthrough:
+            return
+        self._history[:] = 0
+        self._consumed = 0
+        self._produced = 0
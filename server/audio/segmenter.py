@@ -0,0 +1,155 @@
+import numpy as np
+
+from .vad import RmsVAD
+
+
+class RingBuffer:
+    """Preallocated circular float32 buffer. Writes copy into place, reads return one contiguous copy."""
+
+    def __init__(self, capacity: int):
+        self._buf = np.zeros(capacity, dtype=np.float32)
+        self._start = 0
+        self._len = 0
+
+    @property
+    def capacity(self):
+        return len(self._buf)
+
+    def __len__(self):
+        return self._len
+
+    def write(self, data: np.ndarray):
+        n = len(data)
+        if n > self.capacity - self._len:
+            raise OverflowError("ring buffer full")
+        end = (self._start + self._len) % self.capacity
+        first = min(n, self.capacity - end)
+        self._buf[end:end + first] = data[:first]
+        if first < n:
+            self._buf[:n - first] = data[first:]
+        self._len += n
+
+    def read(self, n: int = None) -> np.ndarray:
+        """Removes and returns the oldest n samples (all by default)."""
+        n = self._len if n is None else min(n, self._len)
+        out = np.empty(n, dtype=np.float32)
+        first = min(n, self.capacity - self._start)
+        out[:first] = self._buf[self._start:self._start + first]
+        if first < n:
+            out[first:] = self._buf[:n - first]
+        self._start = (self._start + n) % self.capacity
+        self._len -= n
+        return out
+
+    def peek(self) -> np.ndarray:
+        """Returns a contiguous copy of everything buffered without consuming it."""
+        out = np.empty(self._len, dtype=np.float32)
+        first = min(self._len, self.capacity - self._start)
+        out[:first] = self._buf[self._start:self._start + first]
+        if first < self._len:
+            out[first:] = self._buf[:self._len - first]
+        return out
+
+    def skip(self, n: int):
+        """Drops the oldest n samples without copying them."""
+        n = min(n, self._len)
+        self._start = (self._start + n) % self.capacity
+        self._len -= n
+
+    def clear(self):
+        self._start = 0
+        self._len = 0
+
+
+class Segmenter:
+    """
+    Splits a mono float32 stream into utterances, driven by VAD start/end events.
+
+    A segment is emitted once speech has ended and at least `min_length` seconds are
+    buffered, or cut at `max_length`. With `preroll` set, audio outside speech is
+    discarded except for the last `preroll` seconds before speech starts; without
+    it everything is kept (the original behaviour).
+    """
+
+    def __init__(self, sample_rate, vad=None, min_length=1.8, max_length=7.0, preroll=None):
+        self.sample_rate = sample_rate
+        self.vad = vad if vad is not None else RmsVAD(sample_rate)
+        self.min_samples = int(sample_rate * min_length)
+        self.max_samples = int(sample_rate * max_length)
+        self.preroll = None if preroll is None else int(sample_rate * preroll)
+
+        self._ring = RingBuffer(self.max_samples)
+        self._pos = 0
+        self._end = 0
+        self._in_speech = False
+        self._end_pending = False
+        self.pushed_samples = 0
+        self.forwarded_samples = 0
+
+    def push(self, data: np.ndarray) -> list:
+        """Feeds a chunk, returns the segments it completed (usually none)."""
+        return [segment for _, segment in self.push_timed(data)]
+
+    def push_timed(self, data: np.ndarray) -> list:
+        """Like push, but returns (start sample, segment) pairs; positions count from the first pushed sample."""
+        data = np.asarray(data, dtype=np.float32).reshape(-1)
+        segments = []
+        base = self._pos
+        written = 0
+
+        for kind, at in self.vad.process(data) + [(None, base + len(data))]:
+            # a start event can point back into audio that is already buffered
+            upto = max(at - base, written)
+            self._end = base + written
+            self._write(data[written:upto], segments)
+            written = upto
+
+            if kind == "start":
+                self._in_speech = True
+                self._end_pending = False
+            elif kind == "end":
+                self._in_speech = False
+                self._end_pending = True
+            self._maybe_finish(segments)
+
+        self._pos = base + len(data)
+        self.pushed_samples += len(data)
+        return segments
+
+    def _write(self, piece, segments):
+        pos = 0
+        while pos < len(piece):
+            take = min(len(piece) - pos, self.max_samples - len(self._ring))
+            self._ring.write(piece[pos:pos + take])
+            pos += take
+            self._end += take
+            if len(self._ring) >= self.max_samples:
+                self._emit(segments)
+            self._maybe_finish(segments)
+
+        if self.preroll is not None and not self._in_speech and not self._end_pending:
+            excess = len(self._ring) - self.preroll
+            if excess > 0:
+                self._ring.skip(excess)
+
+    def _maybe_finish(self, segments):
+        if self._end_pending and len(self._ring) >= self.min_samples:
+            self._emit(segments)
+
+    def _emit(self, segments):
+        segment = self._ring.read()
+        self._end_pending = False
+        self.forwarded_samples += len(segment)
+        segments.append((self._end - len(segment), segment))
+
+    @property
+    def buffered_start(self) -> int:
+        """Position of the oldest sample still buffered (everything before it was emitted or discarded)."""
+        return self._end - len(self._ring)
+
+    def flush(self) -> np.ndarray:
+        """Returns whatever is buffered and resets the state."""
+        segment = self._ring.read()
+        self._in_speech = False
+        self._end_pending = False
+        return segment
@@ -1,33 +1,17 @@
-import os
-import json
-import numpy as np
-from datetime import datetime
-from scipy.io.wavfile import write as write_wav
-
-from .capture import AUDIO_BUFFER
-from ..utils.state import get_live_transcript
-from ..config import TRANSCRIPTS_DIR
-from .. import config as config
+from .recorder import stop_session_recording
+from .archive import stop_speech_archive
+from ..utils.journal import close_journal
 
 
 def save_transcript_and_audio_on_shutdown():
-    print(f"Saving transcript and audio on shutdown... {config.SAMPLE_RATE}")
-    transcript = get_live_transcript()
-    if not transcript and not AUDIO_BUFFER:
-        return
-
-    timestamp = datetime.now().isoformat(timespec='seconds').replace(":", "-")
-    base = os.path.join(TRANSCRIPTS_DIR, f"session_{timestamp}")
-
-    os.makedirs(TRANSCRIPTS_DIR, exist_ok=True)
-
-    # save transcript
-    if transcript:
-        with open(base + ".json", "w", encoding="utf-8") as f:
-            json.dump(transcript, f, ensure_ascii=False, indent=2)
-        print(f"💾 Transcript saved to {base}.json")
+    # audio and transcript are already on disk, only the files need finalizing
+    for path, seconds in stop_session_recording():
+        print(f"🎧 Audio saved to {path} ({seconds:.0f} s)")
+    archived = stop_speech_archive()
+    if archived:
+        path, seconds = archived
+        print(f"🎧 Speech archived to {path} ({seconds:.0f} s)")
 
-    if AUDIO_BUFFER:
-        audio = np.concatenate(AUDIO_BUFFER, axis=0)
-        write_wav(base + ".wav", config.SAMPLE_RATE, audio)
-        print(f"🎧 Audio saved to {base}.wav")
+    journal_path = close_journal()
+    if journal_path:
+        print(f"💾 Transcript saved to {journal_path}")
@@ -0,0 +1,299 @@
+import time
+import queue
+
+import numpy as np
+
+from .. import config as config
+
+CHUNK_FRAMES = 1024
+
+
+class AudioSource:
+    """
+    Where capture audio comes from. Nothing touches hardware or files until open(), which
+    also settles `sample_rate` and `channels`. read() blocks for the next chunk and returns
+    float32 frames shaped (frames, channels), or None once the source is exhausted.
+    `overflows` counts reads after which the device reported lost input.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self.sample_rate = None
+        self.channels = None
+        self.overflows = 0
+
+    def open(self):
+        pass
+
+    def read(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def describe(self) -> str:
+        return f"{self.name} ({self.sample_rate} Hz, {self.channels} ch)"
+
+
+class WasapiLoopbackSource(AudioSource):
+    """
+    What the default output device plays, through PyAudioWPatch's WASAPI loopback (Windows
+    only). The stream runs in callback mode: PortAudio hands over every chunk with its
+    status flags, so overflows are counted without reading (and losing) anything extra.
+    """
+
+    name = "wasapi"
+
+    def __init__(self, chunk=CHUNK_FRAMES):
+        super().__init__()
+        self.chunk = chunk
+        self._pyaudio = None
+        self._stream = None
+        self._device_name = None
+        self._chunks = queue.Queue()
+        self._overflow_flag = 0
+        self._continue = 0
+
+    def open(self):
+        import pyaudiowpatch as pyaudio
+
+        self._overflow_flag = pyaudio.paInputOverflow
+        self._continue = pyaudio.paContinue
+        self._pyaudio = pyaudio.PyAudio()
+        try:
+            default_device_index = self._pyaudio.get_default_output_device_info()["index"]
+            loopback_info = self._pyaudio.get_wasapi_loopback_analogue_by_index(default_device_index)
+            self.sample_rate = int(loopback_info["defaultSampleRate"])
+            self.channels = int(loopback_info.get("maxInputChannels", 2))
+            self._device_name = f"{loopback_info['name']} (index {loopback_info['index']})"
+            self._stream = self._pyaudio.open(
+                format=pyaudio.paInt16,
+                channels=self.channels,
+                rate=self.sample_rate,
+                input=True,
+                frames_per_buffer=self.chunk,
+                input_device_index=loopback_info["index"],
+                stream_callback=self._callback,
+            )
+        except Exception:
+            self.close()
+            raise
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        # PortAudio's thread: hand the chunk over and return at once
+        if status & self._overflow_flag:
+            self.overflows += 1
+        self._chunks.put(in_data)
+        return None, self._continue
+
+    def read(self):
+        while True:
+            try:
+                data = self._chunks.get(timeout=1)
+                break
+            except queue.Empty:
+                # loopback delivers nothing while nothing plays; only a stopped stream is an error
+                if self._stream is None or not self._stream.is_active():
+                    raise IOError("WASAPI loopback stream stopped")
+        return (np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0).reshape(-1, self.channels)
+
+    def close(self):
+        if self._stream is not None:
+            if self._stream.is_active():
+                self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        if self._pyaudio is not None:
+            self._pyaudio.terminate()
+            self._pyaudio = None
+
+    def describe(self):
+        return f"WASAPI loopback {self._device_name}, {self.sample_rate} Hz, {self.channels} ch"
+
+
+class SoundDeviceSource(AudioSource):
+    """Any PortAudio input (microphone, line in, a monitor device on Linux) through sounddevice."""
+
+    name = "sounddevice"
+
+    def __init__(self, device=None, chunk=CHUNK_FRAMES):
+        super().__init__()
+        self.device = device
+        self.chunk = chunk
+        self._stream = None
+
+    def open(self):
+        import sounddevice
+
+        info = sounddevice.query_devices(self.device, "input")
+        self.sample_rate = int(info["default_samplerate"])
+        self.channels = min(int(info["max_input_channels"]), 2)
+        self._stream = sounddevice.InputStream(
+            device=self.device, channels=self.channels, samplerate=self.sample_rate,
+            blocksize=self.chunk, dtype="float32",
+        )
+        self._stream.start()
+
+    def read(self):
+        data, overflowed = self._stream.read(self.chunk)
+        if overflowed:
+            self.overflows += 1
+        return data
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+
+class _PacedSource(AudioSource):
+    """Releases chunks at `speed` times real time (0 = as fast as they can be consumed)."""
+
+    def __init__(self, speed=1.0, chunk=CHUNK_FRAMES):
+        super().__init__()
+        self.speed = speed
+        self.chunk = chunk
+        self.frames_read = 0
+        self._t0 = None
+
+    def _pace(self, frames):
+        if self._t0 is None:
+            self._t0 = time.monotonic()
+        self.frames_read += frames
+        if self.speed > 0:
+            # sleep until the end of this chunk is "due", so the average rate never drifts
+            delay = self._t0 + self.frames_read / self.sample_rate / self.speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+
+class WavFileSource(_PacedSource):
+    """Replays a WAV file (memory-mapped, so hours of audio are never loaded whole)."""
+
+    name = "wav"
+
+    def __init__(self, path, speed=1.0, loop=False, chunk=CHUNK_FRAMES):
+        super().__init__(speed, chunk)
+        self.path = path
+        self.loop = loop
+        self._data = None
+        self._pos = 0
+
+    def open(self):
+        self.sample_rate, self._data = open_wav(self.path)
+        self.channels = 1 if self._data.ndim == 1 else self._data.shape[1]
+
+    def read(self):
+        if self._pos >= len(self._data):
+            if not self.loop or not len(self._data):
+                return None
+            self._pos = 0
+        chunk = to_float(self._data[self._pos:self._pos + self.chunk])
+        self._pos += len(chunk)
+        self._pace(len(chunk))
+        return chunk.reshape(len(chunk), -1)
+
+    def close(self):
+        self._data = None
+
+    def describe(self):
+        return f"WAV replay {self.path} at {self.speed or 'max'}x ({self.sample_rate} Hz, {self.channels} ch)"
+
+
+class SyntheticSource(_PacedSource):
+    """
+    Deterministic speech-like test signal: voiced bursts (a gliding harmonic tone at syllable-rate
+    amplitude modulation) separated by pauses over a low noise floor. `speech` and `pause`
+    are (min, max) seconds; `duration` None runs forever.
+    """
+
+    name = "synthetic"
+
+    def __init__(self, sample_rate=48000, channels=2, speed=1.0, duration=None,
+                 speech=(1.5, 6.0), pause=(0.6, 2.0), seed=0, chunk=CHUNK_FRAMES):
+        super().__init__(speed, chunk)
+        self._rate = sample_rate
+        self._channels = channels
+        self.duration = duration
+        self.speech = speech
+        self.pause = pause
+        self._rng = np.random.default_rng(seed)
+        self._plan = []
+        self._phase = 0.0
+        self.speech_intervals = []
+
+    def open(self):
+        self.sample_rate = self._rate
+        self.channels = self._channels
+
+    def _next_burst(self):
+        start = self._plan[-1][1] if self._plan else 0
+        pause = int(self._rng.uniform(*self.pause) * self.sample_rate)
+        speech = int(self._rng.uniform(*self.speech) * self.sample_rate)
+        f0 = self._rng.uniform(110, 230)
+        self._plan.append((start + pause, start + pause + speech, f0))
+        self.speech_intervals.append(((start + pause) / self.sample_rate, (start + pause + speech) / self.sample_rate))
+
+    def read(self):
+        if self.duration is not None and self.frames_read >= self.duration * self.sample_rate:
+            return None
+        n = self.chunk
+        if self.duration is not None:
+            n = min(n, int(self.duration * self.sample_rate) - self.frames_read)
+        start = self.frames_read
+        t = (start + np.arange(n)) / self.sample_rate
+        signal = self._rng.normal(0.0, 0.002, n).astype(np.float32)
+
+        while not self._plan or self._plan[-1][1] < start + n:
+            self._next_burst()
+        for burst_start, burst_end, f0 in self._plan:
+            lo, hi = max(burst_start, start), min(burst_end, start + n)
+            if lo >= hi:
+                continue
+            tt = t[lo - start:hi - start]
+            glide = f0 * (1 + 0.08 * np.sin(2 * np.pi * 0.7 * tt))
+            phase = 2 * np.pi * np.cumsum(glide) / self.sample_rate + self._phase
+            voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+            envelope = 0.5 * (1 - np.cos(2 * np.pi * 4.0 * tt)) * 0.15
+            signal[lo - start:hi - start] += (voiced * envelope).astype(np.float32)
+            self._phase = float(phase[-1])
+        self._plan = [b for b in self._plan if b[1] > start + n] or self._plan[-1:]
+
+        self._pace(n)
+        return np.repeat(signal[:, None], self.channels, axis=1)
+
+
+def open_wav(path):
+    """(sample rate, memory-mapped samples); pages are read from disk only as they are sliced."""
+    from scipy.io import wavfile
+
+    return wavfile.read(path, mmap=True)
+
+
+def to_float(chunk: np.ndarray) -> np.ndarray:
+    """PCM samples of any WAV sample format as float32 in [-1, 1]."""
+    if chunk.dtype == np.int16:
+        return chunk.astype(np.float32) / 32768.0
+    if chunk.dtype == np.int32:
+        return chunk.astype(np.float32) / 2147483648.0
+    if chunk.dtype == np.uint8:
+        return (chunk.astype(np.float32) - 128.0) / 128.0
+    return chunk.astype(np.float32)
+
+
+def create_source(name=None) -> AudioSource:
+    name = name or config.AUDIO_SOURCE
+    if name == "wasapi":
+        return WasapiLoopbackSource()
+    if name == "sounddevice":
+        device = config.AUDIO_DEVICE
+        return SoundDeviceSource(int(device) if device and device.isdigit() else device)
+    if name == "wav":
+        if not config.AUDIO_SOURCE_FILE:
+            raise ValueError("AUDIO_SOURCE_FILE is not set")
+        return WavFileSource(config.AUDIO_SOURCE_FILE, speed=config.AUDIO_SOURCE_SPEED)
+    if name == "synthetic":
+        return SyntheticSource(speed=config.AUDIO_SOURCE_SPEED)
+    raise ValueError(f"Unknown audio source: {name}")
@@ -0,0 +1,157 @@
+import re
+import numpy as np
+
+from .segmenter import RingBuffer
+
+_WORD_RE = re.compile(r"[^\w']+")
+
+
+def _norm(word):
+    return _WORD_RE.sub("", word.lower())
+
+
+def _common_prefix(a, b):
+    n = 0
+    for x, y in zip(a, b):
+        if _norm(x) != _norm(y):
+            break
+        n += 1
+    return n
+
+
+def _overlap(context, words):
+    """Length of the longest suffix of `context` that `words` starts with."""
+    for k in range(min(len(context), len(words)), 0, -1):
+        if _common_prefix(context[-k:], words[:k]) == k:
+            return k
+    return 0
+
+
+class LocalAgreement:
+    """
+    Confirms the words two consecutive hypotheses of the same (growing) audio agree on.
+
+    Each hypothesis re-reads the whole window, so the already confirmed words are stripped
+    from its front first; of the remainder, the prefix it shares with the previous
+    remainder becomes confirmed.
+    """
+
+    def __init__(self):
+        self.confirmed = []
+        self.unconfirmed = []
+        self.context = []
+
+    def insert(self, words: list) -> list:
+        if self.context:
+            # window restarted on overlapping audio: drop words that repeat what was finalized
+            words = words[_overlap(self.context, words):]
+
+        # if the decoder revised an already confirmed word we keep ours; either way align by position
+        tail = words[len(self.confirmed):]
+
+        n = _common_prefix(tail, self.unconfirmed)
+        new = tail[:n]
+        self.confirmed += new
+        self.unconfirmed = tail[n:]
+        return new
+
+    @property
+    def text(self):
+        return " ".join(self.confirmed + self.unconfirmed)
+
+    def reset(self, context=None):
+        self.confirmed = []
+        self.unconfirmed = []
+        self.context = list(context or [])
+
+
+class StreamingTranscriber:
+    """
+    Low-latency captions: while the VAD reports speech, the audio of the current utterance
+    is decoded every `step` seconds and published as a partial; words confirmed by two
+    consecutive decodes are stable. When speech ends the last hypothesis becomes the final
+    text (the audio is only re-decoded if there is undecoded speech left).
+
+    Utterances longer than `max_window` are finalized up to their confirmed words and the
+    window restarts on the last `overlap` seconds, so a cut never loses the word it splits;
+    repeated words in the overlap are dropped by matching against the finalized text.
+    """
+
+    def __init__(self, sample_rate, vad, transcribe, on_partial, on_final,
+                 step=0.5, max_window=10.0, overlap=2.0, preroll=0.3):
+        self.sample_rate = sample_rate
+        self.vad = vad
+        self.transcribe = transcribe
+        self.on_partial = on_partial
+        self.on_final = on_final
+        self.step = int(sample_rate * step)
+        self.max_window = int(sample_rate * max_window)
+        self.overlap = int(sample_rate * overlap)
+        self.preroll = int(sample_rate * preroll)
+
+        self._ring = RingBuffer(self.max_window)
+        self._agreement = LocalAgreement()
+        self._speaking = False
+        self._undecoded = 0
+        self.decoded_samples = 0
+
+    def push(self, data):
+        data = np.asarray(data, dtype=np.float32).reshape(-1)
+        events = self.vad.process(data)
+
+        pos = 0
+        while pos < len(data):
+            take = min(len(data) - pos, self.max_window - len(self._ring))
+            self._ring.write(data[pos:pos + take])
+            pos += take
+            if self._speaking:
+                self._undecoded += take
+            if len(self._ring) >= self.max_window:
+                self._cut()
+
+        for kind, _ in events:
+            if kind == "start":
+                self._speaking = True
+                self._undecoded = len(self._ring)
+            elif kind == "end":
+                self._speaking = False
+                self._finish()
+
+        if not self._speaking and len(self._ring) > self.preroll:
+            self._ring.skip(len(self._ring) - self.preroll)
+
+    def poll(self):
+        """Decodes the current window if at least `step` of new speech arrived. Call between pushes."""
+        if self._speaking and self._undecoded >= self.step:
+            self._decode()
+            self.on_partial(self._agreement.text)
+
+    def _decode(self):
+        audio = self._ring.peek()
+        self.decoded_samples += len(audio)
+        self._undecoded = 0
+        text = self.transcribe(audio)
+        self._agreement.insert(text.split() if text else [])
+
+    def _finish(self):
+        # the hangover is silence, so the last decode usually already covered all the speech
+        if self._undecoded > int(self.vad.hangover_frames * self.vad.frame):
+            self._decode()
+        text = self._agreement.text
+        self._agreement.reset()
+        self._ring.clear()
+        self._undecoded = 0
+        if text:
+            self.on_final(text)
+        else:
+            self.on_partial("")
+
+    def _cut(self):
+        if self._undecoded:
+            self._decode()
+        final = self._agreement.confirmed
+        self._agreement.reset(context=final[-10:])
+        self._ring.skip(len(self._ring) - self.overlap)
+        self._undecoded = len(self._ring)
+        if final:
+            self.on_final(" ".join(final))
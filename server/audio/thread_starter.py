@@ -1,67 +1,73 @@
-import time
+import os
 import threading
-import queue
-import pyaudiowpatch as pyaudio 
 
-from .. import config as config 
-from .capture import capture_loop
-from .transcribe import transcribe_worker
+from .. import config as config
+from .transcribe import inference_worker
+from .pipeline import AudioPipeline, parse_streams
+from .recorder import start_session_recording, dropped_chunks
+from .archive import start_speech_archive
+from .sources import create_source
+from ..utils.state import get_session_name
+from ..utils.metrics import registry
+
+_pipelines = []
+_workers_stop = threading.Event()
+
+registry.callback("lifehelper_audio_queue_depth", "Chunks waiting in the audio queues for segmentation",
+                  lambda: sum(p.audio_q.qsize() for p in _pipelines))
+registry.callback("lifehelper_segments_in_flight", "Segments cut but not committed yet (queued, decoding or reordering)",
+                  lambda: sum(p.in_flight for p in _pipelines))
+registry.callback("lifehelper_recorder_dropped_chunks_total", "Chunks the session recorder could not keep up with",
+                  dropped_chunks, kind="counter")
 
-_stop = False
-_pyaudio_instance = pyaudio.PyAudio() 
-_CHANNELS = 2
-_LOOPBACK_DEVICE_INDEX = None
-audio_q = queue.Queue()
 
 def start_audio_streamer():
     """
-    Initializes PyAudioWPatch, registers the SIGINT handler, and starts threads.
+    Opens the configured audio sources (config.AUDIO_STREAMS, or the single AUDIO_SOURCE)
+    and starts a capture → segmentation pipeline for each, plus the transcription workers
+    they share. Nothing touches audio hardware before this.
     """
-    global _pyaudio_instance, _stop
-    
-    _stop = False
-    try:
-        _pyaudio_instance = pyaudio.PyAudio()
-    except Exception as e:
-        print(f"\nFATAL ERROR: PyAudio initialization failed. Details: {e}")
-        return False
+    global _pipelines
+
+    streams = parse_streams()
+    base = os.path.join(config.TRANSCRIPTS_DIR, get_session_name())
+    pipelines = []
+    for name, kind in streams:
+        try:
+            source = create_source(kind)
+            source.open()
+        except Exception as e:
+            print(f"\nERROR: Audio source '{name}' ({kind}) failed to open. Details: {e}")
+            continue
+        # the first stream keeps the plain session name, which batch re-transcription looks for
+        path = base + (".wav" if not pipelines else f".{name}.wav")
+        recorder = start_session_recording(path, config.SAMPLE_RATE) if config.RECORD_SESSION_WAV else None
+        pipelines.append(AudioPipeline(name, source, index=len(pipelines), recorder=recorder))
+        print(f"✅ Audio source {name}: {source.describe()}")
 
-    # 2. Find and configure the loopback device
-    if not _find_loopback_device():
-        print("Cannot proceed without a valid loopback device. Terminating audio.")
-        _pyaudio_instance.terminate() 
-        _pyaudio_instance = None 
+    if not pipelines:
+        print("\nFATAL ERROR: No audio source could be opened. Cannot proceed without audio. Terminating audio.")
         return False
-    
-    threading.Thread(target=capture_loop, daemon=True).start()
-    threading.Thread(target=transcribe_worker, daemon=True).start()
 
+    if config.SPEECH_ARCHIVE:
+        start_speech_archive(base, config.SAMPLE_RATE)
 
+    _workers_stop.clear()
+    _pipelines = pipelines
+    for pipeline in pipelines:
+        pipeline.start()
+    # low-latency mode decodes in the pipelines' own streaming workers instead
+    for slot in range(0 if config.LOW_LATENCY else config.TRANSCRIBE_WORKERS):
+        threading.Thread(target=inference_worker, args=(slot, _workers_stop), daemon=True).start()
+    return True
 
-def stop_threads():
-    global _stop
-    _stop = True
 
-# --- PyAudioWPatch Device Finding ---
-def _find_loopback_device():
-    global _LOOPBACK_DEVICE_INDEX, _CHANNELS, _pyaudio_instance
+def audio_status() -> str:
+    """Description of the open audio sources, or None before any is open (or if all failed)."""
+    return ", ".join(p.describe() for p in _pipelines) or None
 
-    try:
-        default_device_index = _pyaudio_instance.get_default_output_device_info()['index']
-    except Exception as e:
-        print(f"Error: Could not determine default output device. ({e})")
-        return False
 
-    try:
-        loopback_info = _pyaudio_instance.get_wasapi_loopback_analogue_by_index(default_device_index)
-        
-        _LOOPBACK_DEVICE_INDEX = loopback_info['index']
-        config.SAMPLE_RATE = int(loopback_info.get('defaultSampleRate', config.SAMPLE_RATE)) 
-        _CHANNELS = loopback_info.get('maxInputChannels', _CHANNELS)
-        
-        print(f"✅ Found Loopback Device (Index: {_LOOPBACK_DEVICE_INDEX}): {loopback_info['name']}, Native Rate: {config.SAMPLE_RATE} Hz, Channels: {_CHANNELS}")
-        return True
-        
-    except Exception as e:
-        print(f"Error details: {e}")
-        return False
\ No newline at end of file
+def stop_threads():
+    for pipeline in _pipelines:
+        pipeline.stop()
+    _workers_stop.set()
@@ -1,117 +1,188 @@
-import io
 import numpy as np
-import tempfile
-import soundfile as sf
 import time
 import queue
+import threading
 
-from datetime import datetime
 from .. import config as config
-from ..config import  WHISPER_CPP_PATH, WHISPER_MODEL
-from ..utils.whisper_cpp import transcribe_with_whisper_cpp
-from ..utils.state import add_to_transcript
+from ..utils.engine import get_engine
+from ..utils.whisper_cpp import valid_text
+from ..utils.state import add_to_transcript, publish_partial
+from .segmenter import Segmenter
+from .vad import create_vad
 from ..routes.static import resource_path
-from . import thread_starter
-
-def transcribe_worker():
-    buffer = np.zeros((0, 1), dtype=np.float32)
-    
-    resample_ratio = 1.0
-
-    # silence detection
-    silence_threshold = 0.005
-    silence_window = int(config.SAMPLE_RATE * 0.2)
-    silence_required = 0.8
-    silence_limit = int(silence_required / 0.2)
-    silence_counter = 0
-    speech_detected = False
-
-    max_samples = config.SAMPLE_RATE * 7
-    min_sentence_length = 1.8
+from .pool import SegmentQueue
+from .streaming import StreamingTranscriber
+from .archive import archive_segment
+from ..utils.metrics import registry
+from ..utils.governor import get_governor
+
+SEGMENTS = registry.counter("lifehelper_segments_total", "Segments cut by the segmenter", labels=("source",))
+SEGMENT_SECONDS = registry.histogram(
+    "lifehelper_segment_seconds", "Length of the segments cut", buckets=(0.5, 1, 2, 3, 4, 5, 6, 7, 8, 10)
+)
+EMPTY_DECODES = registry.counter("lifehelper_empty_decodes_total", "Decodes that produced no usable text")
+COMMITTED = registry.counter(
+    "lifehelper_transcript_segments_total", "Segments committed to the live transcript", labels=("source",)
+)
+TRANSCRIBE_SECONDS = registry.histogram(
+    "lifehelper_transcribe_seconds", "Time to decode one segment (or partial window)", labels=("engine",)
+)
+TRANSCRIBED_AUDIO = registry.counter(
+    "lifehelper_transcribed_audio_seconds_total", "Seconds of audio decoded", labels=("engine",)
+)
+
+
+_commit_lock = threading.Lock()
+
+
+def commit_text(text, audio=None, source=None):
+    # pipelines commit from different workers; the archive index must stay in transcript id order
+    with _commit_lock:
+        entry = add_to_transcript({"text": text, "source": source})
+        if audio is not None:
+            archive_segment(entry, audio)
+    COMMITTED.inc(source=source)
+    print(f"[{entry['timestamp']}] {source}: {text}")
+
+
+# shared by every pipeline's segmentation and all inference workers
+segment_q = SegmentQueue(config.SEGMENT_QUEUE_SIZE, config.SEGMENT_BACKPRESSURE)
+
+registry.callback("lifehelper_segment_queue_depth", "Segments waiting for an inference worker",
+                  lambda: segment_q.qsize())
+registry.callback("lifehelper_segments_dropped_total", "Segments dropped because the transcription backlog was full",
+                  lambda: segment_q.dropped, kind="counter")
+
+
+def transcribe_worker(pipeline):
+    """Segmentation stage: turns a pipeline's audio_q chunks into numbered segments for the worker pool."""
+    # VAD events drive segmentation: 0.8 s of silence ends a segment, segments are 1.8 s - 7 s long
+    vad = create_vad(config.VAD_ENGINE, config.SAMPLE_RATE, resource_path(config.VAD_MODEL_PATH))
+    if config.LOW_LATENCY:
+        return streaming_worker(pipeline, vad)
+
+    segmenter = Segmenter(
+        config.SAMPLE_RATE,
+        vad=vad,
+        min_length=1.8,
+        max_length=7.0,
+        preroll=None if vad.name == "rms" else config.VAD_PREROLL,
+    )
     
-    print(f"Transcription worker running. Target sample rate: {config.SAMPLE_RATE} Hz")
+    print(f"Transcription worker for {pipeline.name} running. Target sample rate: {config.SAMPLE_RATE} Hz, VAD: {vad.name}")
 
-    while not thread_starter._stop:
+    while not pipeline.stopped:
         try:
-            # Data pulled from queue is a (N, 1) float32 array at config.SAMPLE_RATE
-            data = thread_starter.audio_q.get(timeout=1)
-            
-            # ** CRITICAL: RESAMPLE THE DATA **
-            if resample_ratio != 1.0:
-                 # WARNING: This simple integer downsampling is for illustration only. 
-                 # Use proper resampling (e.g., scipy.signal.resample_poly) for quality.
-                 downsample_factor = int(resample_ratio) 
-                 if downsample_factor > 1:
-                    data = data[::downsample_factor]
-            
-            # The rest of the logic assumes 'data' is now at config.SAMPLE_RATE
-            buffer = np.concatenate((buffer, data))
-
-            if len(buffer) >= silence_window:
-                recent = buffer[-silence_window:]
-                rms = (recent**2).mean()**0.5
-
-                if rms > silence_threshold:
-                    silence_counter = 0
-                    speech_detected = True
-                else:
-                    if speech_detected:
-                        silence_counter += 1
-
-                total_duration = len(buffer) / config.SAMPLE_RATE
-
-                # finalize segment
-                if speech_detected and silence_counter >= silence_limit and total_duration >= min_sentence_length:
-                    segment = buffer.copy().flatten()
-                    buffer = np.zeros((0,1), dtype=np.float32)
-                    silence_counter = 0
-                    speech_detected = False
-                    transcribe_segment(segment) 
-                    continue
-
-                # finalize segment due to maximum length
-                if len(buffer) >= max_samples:
-                    segment = buffer[:max_samples].flatten()
-                    buffer = buffer[max_samples:]
-                    silence_counter = 0
-                    speech_detected = False
-                    transcribe_segment(segment)
-                    continue
+            # Data pulled from queue is a (N, 1) float32 array, already resampled to config.SAMPLE_RATE
+            data = pipeline.audio_q.get(timeout=1)
+
+            for segment in segmenter.push(data):
+                SEGMENTS.inc(source=pipeline.name)
+                SEGMENT_SECONDS.observe(len(segment) / config.SAMPLE_RATE)
+                segment_q.put(pipeline, pipeline.next_seq(), segment, should_stop=lambda: pipeline.stopped)
 
         except queue.Empty:
             time.sleep(0.05)
         except Exception as e:
-            if not thread_starter._stop:
-                print(f"Error in transcribe worker: {e}")
+            if not pipeline.stopped:
+                print(f"Error in transcribe worker of {pipeline.name}: {e}")
             break
             
 
 
-def transcribe_segment(segment: np.ndarray):
-    wav_buf = io.BytesIO()
-    sf.write(wav_buf, segment, config.SAMPLE_RATE, format="WAV")
-    data = wav_buf.getvalue()
+def streaming_worker(pipeline, vad):
+    """Low-latency mode: decodes a pipeline's current utterance on a sliding window and publishes partials."""
+    # decodes are frequent and short; each stream keeps an engine of its own
+    slot = pipeline.index
 
-    with tempfile.NamedTemporaryFile(delete=False) as tmp:
-        tmpname = tmp.name
-    text = transcribe_with_whisper_cpp(
-        resource_path(WHISPER_CPP_PATH), resource_path(WHISPER_MODEL), data, tmpname
+    def decode(audio):
+        try:
+            return transcribe_segment(audio, slot)
+        except Exception as e:
+            print(f"Error decoding partial: {e}")
+            return ""
+
+    try:
+        get_engine(slot)
+    except Exception as e:
+        print(f"Error starting transcription engine: {e}")
+
+    streamer = StreamingTranscriber(
+        config.SAMPLE_RATE,
+        vad,
+        transcribe=decode,
+        on_partial=lambda text: publish_partial(text, source=pipeline.name),
+        on_final=lambda text: commit_text(text, source=pipeline.name),
+        step=config.STREAM_STEP,
+        max_window=config.STREAM_MAX_WINDOW,
+        overlap=config.STREAM_OVERLAP,
+        preroll=config.VAD_PREROLL,
     )
+    print(f"Streaming transcription worker for {pipeline.name} running. Step: {config.STREAM_STEP} s, VAD: {vad.name}")
+
+    while not pipeline.stopped:
+        try:
+            streamer.push(pipeline.audio_q.get(timeout=1))
+            # catch up on everything captured while the last decode ran, then decode once
+            while True:
+                streamer.push(pipeline.audio_q.get_nowait())
+        except queue.Empty:
+            pass
+        except Exception as e:
+            if not pipeline.stopped:
+                print(f"Error in streaming worker of {pipeline.name}: {e}")
+            break
+
+        streamer.poll()
 
+
+def inference_worker(slot: int, stop: threading.Event):
+    """Transcription stage: decodes segments from segment_q, for every pipeline, and commits them in sequence order."""
+    # Load the model up front so the first utterance doesn't pay for it
+    try:
+        get_engine(slot)
+    except Exception as e:
+        print(f"Error starting transcription engine: {e}")
+
+    while not stop.is_set():
+        try:
+            pipeline, seq, segment, waited = segment_q.get(timeout=1)
+        except queue.Empty:
+            continue
+
+        text = ""
+        try:
+            text = transcribe_segment(segment, slot, queued=waited)
+        except Exception as e:
+            print(f"Error in transcription worker {slot}: {e}")
+        finally:
+            pipeline.committer.commit(seq, (text, segment) if text else None)
+
+
+def transcribe_segment(segment: np.ndarray, slot: int = 0, queued: float = 0.0) -> str:
+    """Decodes one segment; `queued` is how long it waited for a worker (for the quality governor)."""
+    engine = get_engine(slot)
+    governor = get_governor()
+    level = None
+    if governor.enabled:
+        level, settings = governor.acquire()
+    started = time.perf_counter()
+    ok = False
+    try:
+        if level is not None:
+            engine.configure(**settings)
+            # a model switch restarts the engine; that is not decode time
+            started = time.perf_counter()
+        text = engine.transcribe(segment, config.SAMPLE_RATE)
+        ok = True
+    finally:
+        elapsed = time.perf_counter() - started
+        if level is not None:
+            governor.release(level, len(segment) / config.SAMPLE_RATE, elapsed, queued, segment_q.qsize(), ok=ok)
+    TRANSCRIBE_SECONDS.observe(elapsed, engine=engine.name)
+    TRANSCRIBED_AUDIO.inc(len(segment) / config.SAMPLE_RATE, engine=engine.name)
     if not valid_text(text):
-        return
-
-    ts = datetime.now().isoformat(timespec="seconds")
-    add_to_transcript({"timestamp": ts, "text": text})
-    print(f"[{ts}] {text}")
-
-
-def valid_text(text: str) -> bool:
-    if not text:
-        return False
-    t = text.strip().lower()
-    if t in ("[blank_audio]", "[blank]", "(silence)", "[ silence ]"):
-        return False
-    if t in ("you", "uh", "ah", "a", "hmm"):
-        return False
-    return True
+        EMPTY_DECODES.inc()
+        return ""
+    return text
+
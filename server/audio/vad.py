@@ -0,0 +1,186 @@
+import numpy as np
+
+
+class VAD:
+    """
+    Voice activity detector base: buffers audio into fixed frames, classifies each frame
+    and turns the decisions into ("start", sample) / ("end", sample) events.
+
+    Speech starts after `min_speech` seconds of speech frames (the event points at the
+    first of them) and ends after `hangover` seconds of non-speech frames (the event
+    points at the end of the last one). Sample positions count from the first pushed sample.
+    """
+
+    name = "base"
+
+    def __init__(self, sample_rate, frame=0.02, min_speech=0.06, hangover=0.8):
+        self.sample_rate = sample_rate
+        self.frame = max(int(sample_rate * frame), 1)
+        self.min_speech_frames = max(int(round(min_speech * sample_rate / self.frame)), 1)
+        self.hangover_frames = max(int(round(hangover * sample_rate / self.frame)), 1)
+
+        self.speaking = False
+        self._partial = np.zeros(self.frame, dtype=np.float32)
+        self._fill = 0
+        self._frames_seen = 0
+        self._speech_run = 0
+        self._silence_run = 0
+        self.speech_frames = 0
+
+    def process(self, chunk: np.ndarray) -> list:
+        chunk = np.asarray(chunk, dtype=np.float32).reshape(-1)
+        decisions = []
+        pos = 0
+
+        # complete the frame left over from the previous chunk
+        if self._fill:
+            pos = min(self.frame - self._fill, len(chunk))
+            self._partial[self._fill:self._fill + pos] = chunk[:pos]
+            self._fill += pos
+            if self._fill == self.frame:
+                decisions.append(self.classify(self._partial[None, :]))
+                self._fill = 0
+
+        # whole frames are classified straight from the chunk, without copying
+        n_frames = (len(chunk) - pos) // self.frame
+        if n_frames:
+            frames = chunk[pos:pos + n_frames * self.frame].reshape(n_frames, self.frame)
+            decisions.append(self.classify(frames))
+            pos += n_frames * self.frame
+
+        rest = len(chunk) - pos
+        if rest:
+            self._partial[:rest] = chunk[pos:]
+            self._fill = rest
+
+        if not decisions:
+            return []
+        decisions = np.concatenate(decisions) if len(decisions) > 1 else decisions[0]
+        self.speech_frames += int(np.count_nonzero(decisions))
+
+        events = []
+        for is_speech in decisions:
+            self._frames_seen += 1
+            if is_speech:
+                self._speech_run += 1
+                self._silence_run = 0
+                if not self.speaking and self._speech_run >= self.min_speech_frames:
+                    self.speaking = True
+                    events.append(("start", (self._frames_seen - self._speech_run) * self.frame))
+            else:
+                self._speech_run = 0
+                if self.speaking:
+                    self._silence_run += 1
+                    if self._silence_run >= self.hangover_frames:
+                        self.speaking = False
+                        self._silence_run = 0
+                        events.append(("end", self._frames_seen * self.frame))
+        return events
+
+    def classify(self, frames: np.ndarray) -> np.ndarray:
+        """(n_frames, frame) float32 -> (n_frames,) bool."""
+        raise NotImplementedError
+
+
+class RmsVAD(VAD):
+    """The original detector: RMS of 0.2 s windows against a fixed threshold."""
+
+    name = "rms"
+
+    def __init__(self, sample_rate, threshold=0.005, window=0.2, hangover=0.8):
+        super().__init__(sample_rate, frame=window, min_speech=window, hangover=hangover)
+        self.threshold = threshold
+
+    def classify(self, frames):
+        rms = np.sqrt(np.einsum("ij,ij->i", frames, frames) / frames.shape[1])
+        return rms > self.threshold
+
+
+class EnergyVAD(VAD):
+    """
+    Vectorized frame-level detector: energy above an adaptive noise floor, plus
+    zero-crossing rate and spectral flatness checks that reject hiss and clicks.
+
+    The noise floor drops immediately to quieter frames and rises slowly
+    (`floor_rise` dB/s) otherwise, so sustained background like music is absorbed
+    into the floor while syllable-rate speech modulation stays above it.
+    """
+
+    name = "energy"
+
+    def __init__(self, sample_rate, frame=0.02, min_speech=0.06, hangover=0.8,
+                 margin_db=9.0, min_db=-55.0, floor_rise=3.0, max_zcr=0.35, max_flatness=0.45):
+        super().__init__(sample_rate, frame=frame, min_speech=min_speech, hangover=hangover)
+        self.margin_db = margin_db
+        self.min_db = min_db
+        self.floor_step = floor_rise * self.frame / sample_rate
+        self.max_zcr = max_zcr
+        self.max_flatness = max_flatness
+        self.noise_floor_db = None
+        self._window = np.hanning(self.frame).astype(np.float32)
+
+    def classify(self, frames):
+        energy_db = 10 * np.log10(np.einsum("ij,ij->i", frames, frames) / frames.shape[1] + 1e-10)
+
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / self.frame
+
+        power = np.abs(np.fft.rfft(frames * self._window, axis=1)) ** 2 + 1e-12
+        flatness = np.exp(np.log(power).mean(axis=1)) / power.mean(axis=1)
+
+        # noise floor is a recurrence, but only over a handful of frames per chunk
+        floor = np.empty_like(energy_db)
+        current = energy_db[0] if self.noise_floor_db is None else self.noise_floor_db
+        for i, e in enumerate(energy_db):
+            current = e if e < current else current + self.floor_step
+            floor[i] = current
+        self.noise_floor_db = current
+
+        return ((energy_db > floor + self.margin_db)
+                & (energy_db > self.min_db)
+                & (zcr < self.max_zcr)
+                & (flatness < self.max_flatness))
+
+
+class SileroVAD(VAD):
+    """Small neural VAD (Silero, ONNX) on CPU through onnxruntime. Needs 16 kHz input."""
+
+    name = "silero"
+
+    def __init__(self, sample_rate, model_path, threshold=0.5, min_speech=0.064, hangover=0.8):
+        import onnxruntime
+
+        if sample_rate != 16000:
+            raise ValueError("Silero VAD expects 16 kHz audio")
+        super().__init__(sample_rate, frame=512 / sample_rate, min_speech=min_speech, hangover=hangover)
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = 1
+        options.inter_op_num_threads = 1
+        self._session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self._state = np.zeros((2, 1, 128), dtype=np.float32)
+        self._context = np.zeros(64, dtype=np.float32)
+        self._sr = np.array(sample_rate, dtype=np.int64)
+        self.threshold = threshold
+
+    def classify(self, frames):
+        decisions = np.empty(len(frames), dtype=bool)
+        for i, frame in enumerate(frames):
+            x = np.concatenate([self._context, frame])[None, :]
+            prob, self._state = self._session.run(None, {"input": x, "state": self._state, "sr": self._sr})
+            self._context = frame[-64:].copy()
+            decisions[i] = float(prob[0][0]) > self.threshold
+        return decisions
+
+
+def create_vad(name, sample_rate, model_path=None):
+    if name == "rms":
+        return RmsVAD(sample_rate)
+    if name == "energy":
+        return EnergyVAD(sample_rate)
+    if name == "silero":
+        try:
+            return SileroVAD(sample_rate, model_path)
+        except Exception as e:
+            print(f"⚠️ Silero VAD unavailable ({e}), using the energy detector")
+            return EnergyVAD(sample_rate)
+    raise ValueError(f"Unknown VAD engine: {name}")
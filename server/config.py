@@ -1,11 +1,146 @@
-from openai import OpenAI
+import os
 
-
-SAMPLE_RATE = 16000
+SAMPLE_RATE = 16000          # pipeline rate: capture resamples to this once, whisper wants 16 kHz
 WHISPER_CPP_PATH = r"whisper/whisper-cli.exe"
+WHISPER_SERVER_PATH = r"whisper/whisper-server.exe"
 WHISPER_MODEL = r"whisper/models/ggml-base.en.bin"
-TRANSCRIPTS_DIR = r"./transcripts"
+WHISPER_THREADS = 4
+TRANSCRIPTS_DIR = os.environ.get("LIFEHELPER_TRANSCRIPTS_DIR", r"./transcripts")
 STATIC_DIR = r"./dist"
- 
 
-client = OpenAI()
+# Capture source: "wasapi" (loopback of the default output device, Windows), "sounddevice"
+# (a PortAudio input, AUDIO_DEVICE name/index or the default), "wav" (replays AUDIO_SOURCE_FILE)
+# or "synthetic" (generated speech-like bursts). File and synthetic sources run at
+# AUDIO_SOURCE_SPEED x real time (0 = as fast as possible). Overridable from the environment
+# (LIFEHELPER_AUDIO_SOURCE, ...) for headless runs.
+AUDIO_SOURCE = os.environ.get("LIFEHELPER_AUDIO_SOURCE", "wasapi")
+AUDIO_DEVICE = os.environ.get("LIFEHELPER_AUDIO_DEVICE") or None
+AUDIO_SOURCE_FILE = os.environ.get("LIFEHELPER_AUDIO_SOURCE_FILE")
+AUDIO_SOURCE_SPEED = float(os.environ.get("LIFEHELPER_AUDIO_SOURCE_SPEED", "1.0"))
+
+# Several sources captured at once, e.g. "them=wasapi,me=sounddevice" (name=source, comma
+# separated; LIFEHELPER_AUDIO_STREAMS): each gets its own capture and segmentation, transcript
+# entries carry the stream name as "source", and all streams share the transcription workers,
+# which take turns between them by seconds of audio decoded. Empty: just AUDIO_SOURCE.
+AUDIO_STREAMS = os.environ.get("LIFEHELPER_AUDIO_STREAMS", "")
+
+# Session audio on disk. RECORD_SESSION_WAV keeps the whole capture as 16-bit WAV (what batch
+# re-transcription reads, ~0.9 GB per 8 h). SPEECH_ARCHIVE also stores each transcribed segment,
+# encoded on its own as SPEECH_ARCHIVE_FORMAT ("flac", lossless, or "opus", ~5x smaller but
+# ~100x slower to encode), in
+# <session>.clips with a seek index by transcript id / timestamp in <session>.clips.idx;
+# /api/sessions/{name}/audio serves single clips from it.
+RECORD_SESSION_WAV = True
+SPEECH_ARCHIVE = True
+SPEECH_ARCHIVE_FORMAT = "flac"
+
+# Offline re-transcription of recorded sessions (python -m server.audio.batch or POST /api/batch):
+# BATCH_WORKERS processes, each with its own engine, write resumable JSONL transcripts to BATCH_DIR.
+BATCH_WORKERS = 2
+BATCH_DIR = r"./transcripts/batch"
+
+# Transcription engine: "server" keeps whisper-server processes running (model loaded once),
+# "bindings" loads the model in-process through pywhispercpp, "cli" spawns whisper-cli per segment.
+# Any engine that fails to start falls back to "cli". "server" needs whisper/whisper-server.exe,
+# which is not shipped yet, so the default stays "cli".
+TRANSCRIBE_ENGINE = "cli"
+WHISPER_SERVER_HOST = "127.0.0.1"
+WHISPER_SERVER_PORT = 8178
+WHISPER_SERVER_STARTUP_TIMEOUT = 30
+
+# Transcription workers decoding segments in parallel (each gets its own engine / whisper-server,
+# so WHISPER_THREADS applies per worker). Segments wait in a bounded queue; when it is full
+# "drop_oldest" discards the oldest waiting segment, "block" stalls segmentation instead.
+TRANSCRIBE_WORKERS = 2
+SEGMENT_QUEUE_SIZE = 8
+SEGMENT_BACKPRESSURE = "drop_oldest"
+
+# Quality governor: with GOVERNOR on, transcription settings follow the load instead of staying
+# at WHISPER_MODEL / WHISPER_THREADS. GOVERNOR_LEVELS run cheapest to most accurate (levels whose
+# model file is missing are skipped); the time from a segment being cut to its text is kept under
+# GOVERNOR_TARGET_LATENCY seconds by stepping down at once when it is over (or more than
+# GOVERNOR_MAX_BACKLOG segments wait), and up after GOVERNOR_UP_AFTER decodes in a row under
+# GOVERNOR_HEADROOM x the target, at most once per GOVERNOR_COOLDOWN seconds. Threads are the CPU
+# cores split between the decodes running at once (whisper-server only picks them up when it is
+# restarted for a model change). Decisions are logged and listed by GET /api/governor.
+GOVERNOR = False
+GOVERNOR_TARGET_LATENCY = 2.0
+GOVERNOR_HEADROOM = 0.5
+GOVERNOR_MAX_BACKLOG = 2
+GOVERNOR_UP_AFTER = 10
+GOVERNOR_COOLDOWN = 30
+GOVERNOR_LEVELS = [
+    {"model": r"whisper/models/ggml-tiny.en.bin", "beam": 1},
+    {"model": r"whisper/models/ggml-base.en.bin", "beam": 1},
+    {"model": r"whisper/models/ggml-base.en.bin", "beam": 5},
+    {"model": r"whisper/models/ggml-small.en.bin", "beam": 1},
+    {"model": r"whisper/models/ggml-small.en.bin", "beam": 5},
+]
+
+# Voice activity detection driving segmentation: "energy" (energy + ZCR + spectral flatness with an
+# adaptive noise floor), "silero" (small ONNX model, needs onnxruntime) or "rms" (the original fixed
+# RMS threshold, forwards everything). Outside speech only VAD_PREROLL seconds are kept.
+VAD_ENGINE = "energy"
+VAD_MODEL_PATH = r"whisper/models/silero_vad.onnx"
+VAD_PREROLL = 0.3
+
+# Low-latency captions: decode the current utterance every STREAM_STEP seconds and publish
+# provisional ("partial") text, confirming words two consecutive decodes agree on.
+# Utterances longer than STREAM_MAX_WINDOW restart on the last STREAM_OVERLAP seconds.
+LOW_LATENCY = False
+STREAM_STEP = 0.5
+STREAM_MAX_WINDOW = 10.0
+STREAM_OVERLAP = 2.0
+
+# LLM for /api/ask (OPENAI_API_KEY / OPENAI_BASE_URL come from the environment).
+# At most LLM_MAX_CONCURRENCY completions stream at once over a shared connection pool;
+# further asks wait up to LLM_QUEUE_TIMEOUT seconds for a slot before giving up.
+LLM_MODEL = "gpt-4o-mini"
+LLM_MAX_CONCURRENCY = 16
+LLM_QUEUE_TIMEOUT = 10
+LLM_TIMEOUT = 60
+LLM_CONNECT_TIMEOUT = 5
+
+# Conversation context per client session (the frontend sends a session_id with each question).
+# Finished turns beyond LLM_HISTORY_TOKENS are folded into a summary of at most LLM_SUMMARY_TOKENS;
+# transcript segments from the last LLM_TRANSCRIPT_SECONDS are added within LLM_TRANSCRIPT_TOKENS.
+# Past LLM_MAX_SESSIONS, or after LLM_SESSION_IDLE seconds unused, the least recently used session goes.
+LLM_HISTORY_TOKENS = 2000
+LLM_SUMMARY_TOKENS = 200
+LLM_TRANSCRIPT_TOKENS = 1500
+LLM_TRANSCRIPT_SECONDS = 600
+LLM_MAX_SESSIONS = 100
+LLM_SESSION_IDLE = 3600
+
+# Finished /api/ask answers are cached by normalized question + hash of the prompt context,
+# for ASK_CACHE_TTL seconds, ASK_CACHE_SIZE entries in memory (least recently used evicted).
+# ASK_CACHE_DISK also keeps them in a sqlite file so they survive restarts.
+ASK_CACHE_SIZE = 256
+ASK_CACHE_TTL = 3600
+ASK_CACHE_DISK = False
+ASK_CACHE_PATH = r"./transcripts/ask_cache.sqlite3"
+
+# /api/search: BM25 full-text index over the live transcript and past sessions, built in the
+# background at startup. SEARCH_EMBEDDINGS adds semantic search with a small CPU embedding
+# model (needs fastembed; ~1.5 KB of memory per segment).
+SEARCH_EMBEDDINGS = False
+SEARCH_EMBEDDING_MODEL = "BAAI/bge-small-en-v1.5"
+
+# /api/metrics serves pipeline and LLM counters in the Prometheus text format. The sampling
+# profiler behind /api/profile stays off until started there; it snapshots every thread's
+# stack each PROFILE_INTERVAL seconds and stops by itself after PROFILE_MAX_SECONDS.
+PROFILE_INTERVAL = 0.01
+PROFILE_MAX_SECONDS = 300
+
+# Speculative answers: with PREFETCH on, questions and key terms (names, acronyms) in newly
+# committed segments are answered in the background while no /api/ask is running, at most
+# PREFETCH_PER_MINUTE completions of up to PREFETCH_MAX_TOKENS (answers cut off there are
+# dropped, the ask then goes to the LLM). The newest PREFETCH_MAX_ENTRIES
+# answers are kept for PREFETCH_TTL seconds and served at once when a highlighted text matches
+# one (by PREFETCH_MATCH_RATIO of its characters).
+PREFETCH = False
+PREFETCH_PER_MINUTE = 4
+PREFETCH_MAX_TOKENS = 150
+PREFETCH_MAX_ENTRIES = 32
+PREFETCH_TTL = 600
+PREFETCH_MATCH_RATIO = 0.6
@@ -1,28 +1,56 @@
-import os
 import time
+import asyncio
+import threading
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
-
 from .audio.thread_starter import start_audio_streamer, stop_threads
 from .audio.shutdown import save_transcript_and_audio_on_shutdown
-from .routes import root, live, ask
-from .routes.static import static_root, assets_root
+from .utils.engine import close_engine
+from .utils.llm import get_client, close_client
+from .utils.conversation import load_encoding
+from .utils.answer_cache import close_answer_cache
+from .utils.search import start_search_index
+from .utils.prefetch import start_prefetch, stop_prefetch
+from .utils.profiler import profiler
+from .utils.state import get_session_name
+from .routes import root, live, ask, sessions, search, batch, metrics, static
+
+def warm_up_llm():
+    # first /api/ask would otherwise pay for importing openai and loading the tokenizer
+    try:
+        get_client()
+        load_encoding()
+    except Exception as e:
+        print(f"⚠️ LLM client warm-up failed: {e}")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("🚀 FastAPI starting...")
-    start_audio_streamer()
+    # Audio devices and transcription models start on worker threads after startup, so the
+    # HTTP server is accepting requests (and the UI can load) while they come up.
+    audio_started = asyncio.create_task(asyncio.to_thread(start_audio_streamer))
+    # read and compress the frontend build once, off the event loop
+    static_loaded = asyncio.create_task(asyncio.to_thread(static.bundle.files))
+    start_search_index(get_session_name())
+    threading.Thread(target=warm_up_llm, daemon=True).start()
+    start_prefetch()
 
     yield
 
     print("🛑 Stopping threads...")
+    await audio_started
+    await static_loaded
+    await stop_prefetch()
     stop_threads()
     time.sleep(1.5)
     save_transcript_and_audio_on_shutdown()
+    close_engine()
+    await close_client()
+    close_answer_cache()
+    profiler.stop()
     print("FastAPI shutdown complete.")
 
 app = FastAPI(lifespan=lifespan)
@@ -38,18 +66,14 @@ app.add_middleware(
 app.include_router(root.router)
 app.include_router(live.router)
 app.include_router(ask.router)
+app.include_router(sessions.router)
+app.include_router(search.router)
+app.include_router(batch.router)
+app.include_router(metrics.router)
 
-# Serve assets normally
-app.mount("/assets", StaticFiles(directory=assets_root), name="assets")
-
-# Serve index.html and all static files from root
-app.mount("/", StaticFiles(directory=static_root, html=True), name="root")
-
-# --- CATCH-ALL ROUTE FOR REACT ---
-@app.get("/{full_path:path}")
-async def serve_react(full_path: str):
-    # Always return index.html for front-end routing
-    return FileResponse(os.path.join(static_root, "index.html"))
+# The React build from memory; unknown paths get index.html for front-end routing.
+# Must come last, it matches every path.
+app.include_router(static.router)
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,35 +1,127 @@
+import time
+import asyncio
 from fastapi import APIRouter, Request
 from fastapi.responses import StreamingResponse
 
-from ..config import client
+from .. import config as config
+from ..utils.llm import get_client, acquire_slot, release_slot
+from ..utils.conversation import conversations, build_messages, summarize
+from ..utils.answer_cache import get_answer_cache, cache_key
+from ..utils.prefetch import prefetcher
+from ..utils.state import live_transcript
+from ..utils.metrics import registry
 
 router = APIRouter(prefix="/api")
 
-conversation_history = []
+ASK_REQUESTS = registry.counter(
+    "lifehelper_ask_requests_total", "Questions by outcome (answered, cached, prefetched, busy, failed, cancelled)",
+    labels=("result",)
+)
+ASK_ACTIVE = registry.gauge("lifehelper_ask_active", "Answers being streamed from the LLM right now")
+ASK_QUEUE_SECONDS = registry.histogram("lifehelper_ask_queue_seconds", "Wait for a free LLM slot")
+LLM_FIRST_TOKEN_SECONDS = registry.histogram(
+    "lifehelper_llm_first_token_seconds", "From sending the completion request to its first token"
+)
+ASK_SECONDS = registry.histogram("lifehelper_ask_seconds", "From receiving the question to the end of the answer")
+
+# summaries run after the answer is streamed; keep references so they are not collected mid-flight
+_background = set()
+
+REPLAY_CHUNK = 64
+
+
+def _prepare(conversation, question, segments):
+    messages = build_messages(conversation, question, segments)
+    key = cache_key(config.LLM_MODEL, messages)
+    return messages, key, get_answer_cache().get(key)
 
 
 @router.post("/ask")
 async def ask_ai(request: Request):
+    received = time.perf_counter()
     data = await request.json()
     question = data.get("question", "").strip()
 
     if not question:
         return {"answer": "(No question text received)"}
 
-    conversation_history.append({"role": "user", "content": question})
+    conversation = conversations.get(str(data.get("session_id") or "default"))
+    since_ms = time.time_ns() // 1_000_000 - int(config.LLM_TRANSCRIPT_SECONDS * 1000)
+    # token counting, hashing and the disk cache tier are blocking work, keep them off the loop
+    messages, key, cached = await asyncio.to_thread(
+        _prepare, conversation, question, live_transcript.since_ms(since_ms)
+    )
+    source = "cached"
+    if cached is None and config.PREFETCH:
+        cached = prefetcher.lookup(question)
+        source = "prefetched"
+
+    async def replay():
+        for i in range(0, len(cached), REPLAY_CHUNK):
+            yield cached[i:i + REPLAY_CHUNK]
+        conversation.add_turn(question, cached)
+        if source == "prefetched":
+            # a repeat of this exact ask now hits the answer cache
+            await asyncio.to_thread(get_answer_cache().put, key, cached)
+        ASK_REQUESTS.inc(result=source)
+        ASK_SECONDS.observe(time.perf_counter() - received)
+
+    async def stream():
+        # the slot is taken inside the generator so it is always released by the finally below
+        queued = time.perf_counter()
+        if not await acquire_slot():
+            ASK_REQUESTS.inc(result="busy")
+            yield "(Too many questions at once, try again)"
+            return
+        ASK_QUEUE_SECONDS.observe(time.perf_counter() - queued)
+        ASK_ACTIVE.inc()
 
-    def stream():
         partial = ""
-        for chunk in client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=conversation_history,
-            stream=True
-        ):
-            delta = chunk.choices[0].delta
-            if delta and delta.content:
-                partial += delta.content
-                yield delta.content
-
-        conversation_history.append({"role": "assistant", "content": partial})
-
-    return StreamingResponse(stream(), media_type="text/plain")
+        response = None
+        result = "failed"
+        try:
+            sent = time.perf_counter()
+            response = await get_client().chat.completions.create(
+                model=config.LLM_MODEL,
+                messages=messages,
+                stream=True,
+                timeout=config.LLM_TIMEOUT,
+            )
+            async for chunk in response:
+                delta = chunk.choices[0].delta if chunk.choices else None
+                if delta and delta.content:
+                    if not partial:
+                        LLM_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - sent)
+                    partial += delta.content
+                    yield delta.content
+
+            result = "answered"
+            conversation.add_turn(question, partial)
+            if partial:
+                await asyncio.to_thread(get_answer_cache().put, key, partial)
+        except asyncio.CancelledError:
+            # browser went away: Starlette cancels us, stop paying for tokens nobody reads
+            result = "cancelled"
+            raise
+        except Exception as e:
+            yield f"\n(AI request failed: {e})"
+        finally:
+            if response is not None:
+                await response.close()
+            release_slot()
+            ASK_ACTIVE.dec()
+            ASK_REQUESTS.inc(result=result)
+            ASK_SECONDS.observe(time.perf_counter() - received)
+
+        evicted = conversation.take_evicted()
+        if evicted:
+            task = asyncio.create_task(summarize(conversation, evicted))
+            _background.add(task)
+            task.add_done_callback(_background.discard)
+
+    return StreamingResponse(replay() if cached is not None else stream(), media_type="text/plain")
+
+
+@router.get("/ask/stats")
+def ask_stats():
+    return {"cache": get_answer_cache().stats(), "prefetch": prefetcher.stats(), "sessions": len(conversations)}
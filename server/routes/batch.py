@@ -0,0 +1,83 @@
+import os
+import threading
+from fastapi import APIRouter, HTTPException, Request
+
+from .. import config as config
+from ..audio.batch import run_batch, session_wavs, output_path, file_progress
+from ..utils.journal import SESSION_NAME_RE
+from ..utils.state import get_session_name
+from .static import resource_path
+
+router = APIRouter(prefix="/api")
+
+_job = {"thread": None, "files": [], "model": None, "results": []}
+_job_lock = threading.Lock()
+
+
+def _model_path(model):
+    """The models-folder path for `model` (a file name there, or that folder/name), or None for anything else."""
+    folder = os.path.dirname(config.WHISPER_MODEL)
+    model = model.replace("\\", "/")
+    name = model.rsplit("/", 1)[-1]
+    if model not in (name, f"{folder}/{name}"):
+        return None
+    models = resource_path(folder)
+    if not os.path.isdir(models) or name not in os.listdir(models):
+        return None
+    return f"{folder}/{name}"
+
+
+@router.get("/batch")
+def get_batch():
+    """Progress of the current (or last) batch job, read from its output files."""
+    files = [file_progress(path, output_path(path, config.BATCH_DIR, _job["model"])) for path in _job["files"]]
+    running = _job["thread"] is not None and _job["thread"].is_alive()
+    return {"running": running, "model": _job["model"], "files": files, "results": _job["results"]}
+
+
+@router.post("/batch")
+async def start_batch(request: Request):
+    """
+    Re-transcribes recorded sessions in worker processes. Body (all optional):
+    {"sessions": ["session_..."], "model": "ggml-medium.en.bin", "workers": 2, "restart": false}
+    The session being recorded is left out, and the model must be a file in whisper/models.
+    """
+    data = await request.json() if await request.body() else {}
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=400, detail="Expected a JSON object")
+    workers = data.get("workers")
+    if workers is not None and (type(workers) is not int or workers <= 0):
+        raise HTTPException(status_code=400, detail="workers must be a positive integer")
+    names = data.get("sessions")
+    if names is None:
+        paths = session_wavs(exclude=get_session_name())
+    else:
+        if not all(isinstance(n, str) and SESSION_NAME_RE.match(n) for n in names):
+            raise HTTPException(status_code=400, detail="Invalid session name")
+        paths = [os.path.join(config.TRANSCRIPTS_DIR, n + ".wav") for n in names]
+        if get_session_name() in names:
+            raise HTTPException(status_code=409, detail="The current session is still being recorded")
+        missing = [os.path.basename(p) for p in paths if not os.path.exists(p)]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"No recording for {', '.join(missing)}")
+    if not paths:
+        raise HTTPException(status_code=404, detail="No recorded sessions")
+
+    overrides = {}
+    if data.get("model"):
+        model = _model_path(data["model"]) if isinstance(data["model"], str) else None
+        if model is None:
+            raise HTTPException(status_code=400, detail="Unknown model; use a file from the whisper models folder")
+        overrides["WHISPER_MODEL"] = model
+    with _job_lock:
+        if _job["thread"] is not None and _job["thread"].is_alive():
+            raise HTTPException(status_code=409, detail="A batch job is already running")
+        _job.update(files=paths, model=overrides.get("WHISPER_MODEL", config.WHISPER_MODEL), results=[])
+        _job["thread"] = threading.Thread(
+            target=run_batch,
+            args=(paths, config.BATCH_DIR, workers, overrides, bool(data.get("restart"))),
+            kwargs={"on_result": _job["results"].append},
+            daemon=True,
+        )
+        _job["thread"].start()
+    return {"started": len(paths), "model": _job["model"]}
@@ -1,24 +1,91 @@
-from fastapi import APIRouter
+import asyncio
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
 from urllib.parse import unquote
 from datetime import datetime
 
-from ..utils.state import get_live_transcript
+from ..utils.state import live_transcript, get_entries_after, get_partial
+from ..utils.hub import hub, format_sse, BOOT_ID
 
 router = APIRouter(prefix="/api")
 
+KEEPALIVE_SECONDS = 15
+
 @router.get("/live")
-def get_live(since: str = None):
-    transcript = get_live_transcript()
+def get_live(since: str = None, since_id: int = None):
+    if since_id is not None:
+        return {"segments": live_transcript.since_id(since_id), "partial": get_partial()}
 
     if not since:
-        return {"segments": transcript[-100:]}
+        return {"segments": live_transcript.tail(100), "partial": get_partial()}
 
     try:
         since_dt = datetime.strptime(unquote(since), "%Y-%m-%dT%H:%M:%S")
-        filtered = [
-            t for t in transcript
-            if datetime.strptime(t["timestamp"], "%Y-%m-%dT%H:%M:%S") > since_dt
-        ]
-        return {"segments": filtered}
     except Exception:
         return {"error": "Invalid 'since' format. Expected YYYY-MM-DDTHH:MM:SS"}
+
+    # legacy timestamps have second resolution: "after since" means from the next second on
+    since_ms = int(since_dt.timestamp()) * 1000 + 999
+    return {"segments": live_transcript.since_ms(since_ms), "partial": get_partial()}
+
+
+def resume_after(last_event_id: str = None, since_id: int = None):
+    """
+    Segment id to resume after, or None for a fresh start. Last-Event-ID ("<boot>:<id>")
+    wins over ?since_id=; ids from another backend process, or past the newest segment,
+    mean the backend restarted and its ids began again at 1.
+    """
+    if last_event_id is not None:
+        boot, _, number = last_event_id.rpartition(":")
+        if not number.isdigit() or boot != BOOT_ID:
+            return None
+        since_id = int(number)
+    if since_id is not None and since_id > live_transcript.last_id:
+        return None
+    return since_id
+
+
+@router.get("/live/stream")
+async def stream_live(request: Request, since_id: int = None):
+    """
+    Server-Sent Events feed of committed segments ("segment" events) and, in low-latency
+    mode, provisional text of the current utterance ("partial" events). Reconnecting
+    clients resume after the Last-Event-ID header (sent automatically by EventSource)
+    or ?since_id=. Without either, or after a backend restart, the last 100 segments are
+    replayed first.
+    """
+    since_id = resume_after(request.headers.get("last-event-id"), since_id)
+
+    # subscribe before reading the backlog so nothing committed in between is missed
+    sub = hub.subscribe()
+
+    async def events():
+        sent = since_id
+        try:
+            backlog = get_entries_after(sent) if sent is not None else live_transcript.tail(100)
+            for entry in backlog:
+                yield format_sse(entry)
+                sent = entry["id"]
+            sent = sent or 0
+
+            while not sub.overflowed or not sub.queue.empty():
+                try:
+                    entry_id, event, message = await asyncio.wait_for(sub.queue.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                if event == "segment":
+                    if entry_id <= sent:
+                        continue
+                    sent = entry_id
+                yield message
+        finally:
+            hub.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+
+from ..utils.metrics import registry
+from ..utils.profiler import profiler
+from ..utils.governor import get_governor
+
+router = APIRouter(prefix="/api")
+
+
+@router.get("/metrics")
+def get_metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/governor")
+def get_governor_status():
+    """Transcription settings the quality governor uses now, what it measures, and its recent decisions."""
+    governor = get_governor()
+    return {**governor.status(), "current": governor.describe() if governor.levels else None}
+
+
+@router.get("/profile")
+def get_profile(format: str = "top", limit: int = 30):
+    """Results of the current (or last) profiling run: a JSON summary, or ?format=folded stacks."""
+    if format == "folded":
+        return PlainTextResponse(profiler.folded())
+    return {**profiler.status(), "top": profiler.top(min(max(limit, 1), 500))}
+
+
+@router.post("/profile")
+async def start_profile(request: Request):
+    """Starts sampling. Body (optional): {"interval": 0.01, "seconds": 300}."""
+    data = await request.json() if await request.body() else {}
+    if not profiler.start(data.get("interval"), data.get("seconds")):
+        raise HTTPException(status_code=409, detail="The profiler is already running")
+    return profiler.status()
+
+
+@router.delete("/profile")
+def stop_profile():
+    profiler.stop()
+    return profiler.status()
@@ -1,7 +1,16 @@
 from fastapi import APIRouter
 
+from ..audio.thread_starter import audio_status
+from ..utils.engine import ready_engines
+
 router = APIRouter(prefix="/api")
 
 @router.get("/")
 def root():
     return {"message": "FastAPI is running"}
+
+
+@router.get("/status")
+def status():
+    """What has come up so far: audio and models start in the background after the server."""
+    return {"audio": audio_status(), "engines": ready_engines()}
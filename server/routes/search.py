@@ -0,0 +1,41 @@
+import time
+from datetime import datetime
+from fastapi import APIRouter, HTTPException
+
+from ..utils.search import search_index
+
+router = APIRouter(prefix="/api")
+
+
+def _to_ms(value):
+    try:
+        return int(datetime.strptime(value, "%Y-%m-%dT%H:%M:%S").timestamp() * 1000)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid time format. Expected YYYY-MM-DDTHH:MM:SS")
+
+
+@router.get("/search")
+def search(q: str, limit: int = 20, mode: str = "text", session: str = None, since: str = None, until: str = None):
+    """
+    Ranked segments matching `q` across the live transcript and past sessions.
+    mode: "text" (BM25), "semantic" or "hybrid" (the last two need SEARCH_EMBEDDINGS).
+    """
+    if mode not in ("text", "semantic", "hybrid"):
+        raise HTTPException(status_code=400, detail="mode must be text, semantic or hybrid")
+
+    start = time.perf_counter()
+    result = search_index.search(
+        q,
+        limit=min(max(limit, 1), 200),
+        mode=mode,
+        session=session,
+        since_ms=_to_ms(since) if since else None,
+        until_ms=_to_ms(until) if until else None,
+    )
+    return {
+        "query": q,
+        **result,
+        "took_ms": round((time.perf_counter() - start) * 1000, 2),
+        "documents": len(search_index.text),
+        "indexing": search_index.indexing,
+    }
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, HTTPException, Response
+
+from ..utils.journal import list_sessions, read_session
+from ..audio.archive import read_clip
+
+router = APIRouter(prefix="/api")
+
+
+@router.get("/sessions")
+def get_sessions():
+    return {"sessions": list_sessions()}
+
+
+@router.get("/sessions/{name}")
+def get_session(name: str, offset: int = 0, limit: int = 100):
+    page = read_session(name, offset=offset, limit=min(max(limit, 1), 1000))
+    if page is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"name": name, "offset": offset, **page}
+
+
+@router.get("/sessions/{name}/audio")
+def get_session_audio(name: str, segment: int = None, ts: int = None):
+    """The audio of one transcript segment (by its id, or by a timestamp in epoch ms) from the speech archive."""
+    if segment is None and ts is None:
+        raise HTTPException(status_code=400, detail="Pass segment or ts")
+    clip = read_clip(name, segment_id=segment, ts=ts)
+    if clip is None:
+        raise HTTPException(status_code=404, detail="No archived audio for that segment")
+    block, media_type, record = clip
+    return Response(block, media_type=media_type, headers={
+        "X-Segment-Id": str(record["id"]),
+        "X-Segment-Ts": str(record["ts"]),
+        "Cache-Control": "public, max-age=31536000, immutable",
+    })
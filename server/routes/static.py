@@ -1,5 +1,13 @@
 import sys
 import os
+import re
+import gzip
+import hashlib
+import mimetypes
+import asyncio
+import threading
+from fastapi import APIRouter, Request, Response
+
 from ..config import STATIC_DIR
 
 
@@ -17,5 +25,157 @@ def resource_path(relative_path):
 
 # Absolute static folder path
 static_root = resource_path(STATIC_DIR)
-assets_root = os.path.join(static_root, "assets")
 
+# vite names build output name-<8 char hash>.ext; those never change under the same URL
+HASHED_RE = re.compile(r"-[A-Za-z0-9_-]{8}\.[a-z0-9]+$")
+COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml", "application/xml")
+MIN_COMPRESS_BYTES = 1024
+
+
+class StaticFile:
+    """One build file held in memory, with its compressed variants and ready-made headers."""
+
+    def __init__(self, path, data, media_type, immutable):
+        self.path = path
+        self.media_type = media_type
+        self.digest = hashlib.blake2b(data, digest_size=12).hexdigest()
+        self.cache_control = "public, max-age=31536000, immutable" if immutable else "no-cache"
+        # encoding -> body; "identity" is always there
+        self.variants = {"identity": data}
+
+    def etag(self, encoding):
+        # each encoding is a different representation, so it gets its own (strong) tag
+        return f'"{self.digest}"' if encoding == "identity" else f'"{self.digest}-{encoding}"'
+
+    def headers(self, encoding):
+        headers = {"ETag": self.etag(encoding), "Cache-Control": self.cache_control, "Vary": "Accept-Encoding"}
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return headers
+
+
+class StaticBundle:
+    """
+    The frontend build (dist), read into memory once. Text files get gzip (and brotli, if
+    the optional brotli package is installed) variants made once at load, unless the build
+    already ships .gz/.br files next to them. Serving is then a dict lookup: no disk reads,
+    no per-request compression.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._files = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._files is not None
+
+    def files(self) -> dict:
+        if self._files is None:
+            with self._lock:
+                if self._files is None:
+                    self._files = self._load()
+        return self._files
+
+    def _load(self):
+        files = {}
+        if not os.path.isdir(self.root):
+            print(f"⚠️ Frontend build not found at {self.root}, only the API is served")
+            return files
+        try:
+            import brotli
+        except ImportError:
+            brotli = None
+
+        for folder, _, names in os.walk(self.root):
+            for name in names:
+                if name.endswith((".gz", ".br")):
+                    continue
+                full = os.path.join(folder, name)
+                rel = os.path.relpath(full, self.root).replace(os.sep, "/")
+                with open(full, "rb") as f:
+                    data = f.read()
+                media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+                immutable = rel.startswith("assets/") and bool(HASHED_RE.search(name))
+                file = StaticFile(rel, data, media_type, immutable)
+
+                if media_type.startswith(COMPRESSIBLE) and len(data) >= MIN_COMPRESS_BYTES:
+                    for encoding, suffix, compress in (
+                        ("br", ".br", (lambda d: brotli.compress(d, quality=9)) if brotli else None),
+                        ("gzip", ".gz", lambda d: gzip.compress(d, compresslevel=9, mtime=0)),
+                    ):
+                        if os.path.exists(full + suffix):
+                            with open(full + suffix, "rb") as f:
+                                body = f.read()
+                        elif compress is not None:
+                            body = compress(data)
+                        else:
+                            continue
+                        if len(body) < len(data):
+                            file.variants[encoding] = body
+                files[rel] = file
+        return files
+
+    def lookup(self, path: str):
+        """
+        The file for a URL path. Unknown paths get index.html so client-side routes load the
+        app, except ones that look like files (a stale hashed asset must not get HTML).
+        """
+        files = self.files()
+        path = path.lstrip("/")
+        file = files.get(path)
+        if file is None and "." not in path.rsplit("/", 1)[-1]:
+            file = files.get("index.html")
+        return file
+
+
+def accepted_encodings(header: str) -> set:
+    accepted = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q=") and q[2:].strip() in ("0", "0.0", "0.00", "0.000"):
+            continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+def etag_matches(header: str, file: StaticFile) -> bool:
+    """If-None-Match against any representation of the file (weak comparison, as for GET)."""
+    if header.strip() == "*":
+        return True
+    tags = {file.etag(encoding) for encoding in file.variants}
+    return any(tag.strip().removeprefix("W/") in tags for tag in header.split(","))
+
+
+def static_response(file: StaticFile, request: Request) -> Response:
+    if_none_match = request.headers.get("if-none-match")
+    accepted = accepted_encodings(request.headers.get("accept-encoding", ""))
+    encoding = next((e for e in ("br", "gzip") if e in file.variants and e in accepted), "identity")
+    headers = file.headers(encoding)
+
+    if if_none_match and etag_matches(if_none_match, file):
+        return Response(status_code=304, headers=headers)
+    body = file.variants[encoding]
+    if request.method == "HEAD":
+        headers["Content-Length"] = str(len(body))
+        body = b""
+    return Response(body, media_type=file.media_type, headers=headers)
+
+
+bundle = StaticBundle(static_root)
+router = APIRouter()
+
+
+# registered last: everything the API routes did not match
+@router.api_route("/{full_path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def serve_static(full_path: str, request: Request):
+    if full_path == "api" or full_path.startswith("api/"):
+        return Response('{"detail":"Not Found"}', status_code=404, media_type="application/json")
+    if not bundle.loaded:
+        await asyncio.to_thread(bundle.files)
+    file = bundle.lookup(full_path)
+    if file is None:
+        return Response("Not Found", status_code=404, media_type="text/plain")
+    return static_response(file, request)
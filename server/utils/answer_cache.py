@@ -0,0 +1,154 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+from .. import config as config
+
+_SPACE_RE = re.compile(r"\s+")
+_EDGE_RE = re.compile(r"^[\W_]+|[\W_]+$")
+
+
+def normalize_question(text: str) -> str:
+    return _EDGE_RE.sub("", _SPACE_RE.sub(" ", text.lower())).strip()
+
+
+def cache_key(model: str, messages: list) -> str:
+    """
+    Normalized last question plus a hash of everything before it. Earlier turns that asked
+    the same question are left out of the hash, so asking again in the same chat still hits.
+    """
+    question = normalize_question(messages[-1]["content"])
+    context = []
+    skip_answer = False
+    for message in messages[:-1]:
+        if skip_answer and message["role"] == "assistant":
+            skip_answer = False
+            continue
+        skip_answer = message["role"] == "user" and normalize_question(message["content"]) == question
+        if not skip_answer:
+            context.append((message["role"], message["content"]))
+    digest = hashlib.sha256(json.dumps([model, context]).encode("utf-8")).hexdigest()
+    return f"{digest}:{question}"
+
+
+class AnswerCache:
+    """
+    LRU cache of finished answers with a TTL, optionally backed by a sqlite file so it
+    survives restarts. Memory misses fall through to disk and promote what they find.
+    """
+
+    def __init__(self, max_entries=256, ttl=3600, path=None, max_disk_entries=5000):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._open(path)
+
+    def _open(self, path):
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS answers (key TEXT PRIMARY KEY, answer TEXT, created REAL)")
+        self._db.execute("DELETE FROM answers WHERE created < ?", (time.time() - self.ttl,))
+        self._db.commit()
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None:
+                created, answer = item
+                if now - created <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return answer
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT answer, created FROM answers WHERE key = ? AND created >= ?", (key, now - self.ttl)
+                ).fetchone()
+                if row is not None:
+                    self._remember(key, row[1], row[0])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, answer: str):
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, answer)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO answers VALUES (?, ?, ?)", (key, answer, now))
+                self._puts += 1
+                if self._puts % 100 == 0:
+                    self._db.execute("DELETE FROM answers WHERE created < ?", (now - self.ttl,))
+                    self._db.execute(
+                        "DELETE FROM answers WHERE key NOT IN (SELECT key FROM answers ORDER BY created DESC LIMIT ?)",
+                        (self.max_disk_entries,),
+                    )
+                self._db.commit()
+
+    def _remember(self, key, created, answer):
+        self._entries[key] = (created, answer)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "disk": self._db is not None,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_cache = None
+# asks look the cache up from worker threads (asyncio.to_thread)
+_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> AnswerCache:
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            path = None
+            if config.ASK_CACHE_DISK:
+                os.makedirs(os.path.dirname(config.ASK_CACHE_PATH) or ".", exist_ok=True)
+                path = config.ASK_CACHE_PATH
+            _cache = AnswerCache(config.ASK_CACHE_SIZE, config.ASK_CACHE_TTL, path)
+        return _cache
+
+
+def close_answer_cache():
+    global _cache
+
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+            _cache = None
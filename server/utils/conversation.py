@@ -0,0 +1,213 @@
+import re
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+
+from .. import config as config
+from .llm import get_client, acquire_slot, release_slot
+
+SYSTEM_PROMPT = (
+    "You are a helpful assistant following a live conversation through its real-time transcript. "
+    "Answer briefly and directly. The transcript is speech recognition output and may contain errors."
+)
+
+_WORD_RE = re.compile(r"\w+")
+_encoding = None
+_encoding_failed = False
+
+
+def load_encoding():
+    """tiktoken encoding for LLM_MODEL, or None if it cannot be loaded (first use downloads it)."""
+    global _encoding, _encoding_failed
+
+    if _encoding is None and not _encoding_failed:
+        try:
+            import tiktoken
+            try:
+                _encoding = tiktoken.encoding_for_model(config.LLM_MODEL)
+            except KeyError:
+                _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            _encoding_failed = True
+            print(f"⚠️ tiktoken unavailable ({e}), estimating tokens from text length")
+    return _encoding
+
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    encoding = load_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def message_tokens(message: dict) -> int:
+    # role and framing cost a few tokens per message
+    return count_tokens(message["content"]) + 4
+
+
+class Conversation:
+    """
+    One client's chat: finished question/answer turns plus a running summary of the turns
+    that no longer fit LLM_HISTORY_TOKENS. Turns are appended only once the answer is
+    complete, so concurrent asks never see each other's half-finished exchange.
+    """
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.turns = []
+        self.summary = ""
+        self.evicted = []
+        self.last_used = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add_turn(self, question: str, answer: str):
+        with self._lock:
+            self.turns.append((
+                {"role": "user", "content": question},
+                {"role": "assistant", "content": answer},
+            ))
+            self._trim()
+
+    def _trim(self):
+        total = sum(message_tokens(q) + message_tokens(a) for q, a in self.turns)
+        while self.turns and total > config.LLM_HISTORY_TOKENS:
+            question, answer = self.turns.pop(0)
+            total -= message_tokens(question) + message_tokens(answer)
+            self.evicted.append((question, answer))
+
+    def take_evicted(self) -> list:
+        """Turns dropped from the history since the last call, to be folded into the summary."""
+        with self._lock:
+            evicted, self.evicted = self.evicted, []
+            return evicted
+
+    def history(self) -> list:
+        with self._lock:
+            return [message for turn in self.turns for message in turn]
+
+
+class ConversationStore:
+    """Conversations by session id; least recently used ones are evicted past LLM_MAX_SESSIONS or when idle."""
+
+    def __init__(self):
+        self._conversations = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Conversation:
+        now = time.monotonic()
+        with self._lock:
+            conversation = self._conversations.pop(session_id, None)
+            if conversation is None:
+                conversation = Conversation(session_id)
+            conversation.last_used = now
+            self._conversations[session_id] = conversation
+
+            while len(self._conversations) > config.LLM_MAX_SESSIONS:
+                self._conversations.popitem(last=False)
+            # oldest first, so stop at the first one still in use
+            while self._conversations:
+                oldest = next(iter(self._conversations.values()))
+                if now - oldest.last_used <= config.LLM_SESSION_IDLE:
+                    break
+                self._conversations.popitem(last=False)
+            return conversation
+
+    def clear(self):
+        with self._lock:
+            self._conversations.clear()
+
+    def __len__(self):
+        return len(self._conversations)
+
+
+def transcript_context(segments: list, question: str, budget: int) -> str:
+    """
+    Transcript segments for the prompt, within `budget` tokens: the newest segments take
+    the first half, the rest goes to older segments sharing the most words with the
+    question. Returned in spoken order, one "[HH:MM:SS] text" line each.
+    """
+    if not segments or budget <= 0:
+        return ""
+
+    chosen = set()
+    used = 0
+    index = len(segments) - 1
+    while index >= 0:
+        cost = count_tokens(segments[index]["text"]) + 6
+        if used + cost > budget // 2:
+            break
+        chosen.add(index)
+        used += cost
+        index -= 1
+
+    terms = set(_WORD_RE.findall(question.lower()))
+    if terms and index >= 0:
+        scored = []
+        for i in range(index + 1):
+            overlap = len(terms & set(_WORD_RE.findall(segments[i]["text"].lower())))
+            if overlap:
+                scored.append((overlap, i))
+        for _, i in sorted(scored, reverse=True):
+            cost = count_tokens(segments[i]["text"]) + 6
+            if used + cost > budget:
+                continue
+            chosen.add(i)
+            used += cost
+
+    lines = []
+    for i in sorted(chosen):
+        entry = segments[i]
+        at = datetime.fromtimestamp(entry["ts"] / 1000).strftime("%H:%M:%S") if "ts" in entry else ""
+        lines.append(f"[{at}] {entry['text']}")
+    return "\n".join(lines)
+
+
+def build_messages(conversation: Conversation, question: str, segments: list) -> list:
+    """System prompt, transcript context, summary of older turns, recent turns and the question."""
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+
+    context = transcript_context(segments, question, config.LLM_TRANSCRIPT_TOKENS)
+    if context:
+        messages.append({"role": "system", "content": "Recent transcript:\n" + context})
+    if conversation.summary:
+        messages.append({"role": "system", "content": "Earlier in this chat: " + conversation.summary})
+
+    messages += conversation.history()
+    messages.append({"role": "user", "content": question})
+    return messages
+
+
+def summary_prompt(summary: str, evicted: list) -> list:
+    lines = [f"{message['role']}: {message['content']}" for turn in evicted for message in turn]
+    previous = f"Summary so far: {summary}\n\n" if summary else ""
+    return [
+        {"role": "system", "content": (
+            f"Condense the chat below into a summary of at most {config.LLM_SUMMARY_TOKENS} tokens, "
+            "keeping facts, names and open questions. Reply with the summary only."
+        )},
+        {"role": "user", "content": previous + "\n".join(lines)},
+    ]
+
+
+async def summarize(conversation: Conversation, evicted: list):
+    """Folds turns that fell out of the history into the conversation summary (dropped on failure)."""
+    if not await acquire_slot():
+        return
+    try:
+        response = await get_client().chat.completions.create(
+            model=config.LLM_MODEL,
+            messages=summary_prompt(conversation.summary, evicted),
+            max_tokens=config.LLM_SUMMARY_TOKENS,
+            timeout=config.LLM_TIMEOUT,
+        )
+        conversation.summary = (response.choices[0].message.content or "").strip()
+    except Exception as e:
+        print(f"⚠️ Conversation summary failed, dropping {len(evicted)} old turns: {e}")
+    finally:
+        release_slot()
+
+
+conversations = ConversationStore()
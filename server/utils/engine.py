@@ -0,0 +1,365 @@
+import os
+import sys
+import time
+import atexit
+import socket
+import threading
+import subprocess
+import numpy as np
+
+from .. import config as config
+from ..routes.static import resource_path
+from .whisper_cpp import transcribe_with_whisper_cpp, pcm_to_wav_bytes
+
+WHISPER_RATE = 16000
+
+_engines = {}
+_engine_lock = threading.Lock()
+_job = None
+
+
+def _port_free(host, port) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        try:
+            s.bind((host, port))
+        except OSError:
+            return False
+    return True
+
+
+def _any_free_port(host) -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind((host, 0))
+        return s.getsockname()[1]
+
+
+def _kill_with_backend(proc):
+    """
+    On Windows, puts `proc` in a job object that is killed when this process ends, however
+    it ends: Electron stops the backend with TerminateProcess, which skips atexit and would
+    leave whisper-server running (and holding its port). Elsewhere the atexit close() and
+    uvicorn's graceful SIGTERM handling cover it.
+    """
+    global _job
+
+    if sys.platform != "win32":
+        return
+    import ctypes
+    from ctypes import wintypes
+
+    class IoCounters(ctypes.Structure):
+        _fields_ = [(name, ctypes.c_uint64) for name in (
+            "ReadOperationCount", "WriteOperationCount", "OtherOperationCount",
+            "ReadTransferCount", "WriteTransferCount", "OtherTransferCount",
+        )]
+
+    class BasicLimits(ctypes.Structure):
+        _fields_ = [
+            ("PerProcessUserTimeLimit", ctypes.c_int64),
+            ("PerJobUserTimeLimit", ctypes.c_int64),
+            ("LimitFlags", wintypes.DWORD),
+            ("MinimumWorkingSetSize", ctypes.c_size_t),
+            ("MaximumWorkingSetSize", ctypes.c_size_t),
+            ("ActiveProcessLimit", wintypes.DWORD),
+            ("Affinity", ctypes.c_size_t),
+            ("PriorityClass", wintypes.DWORD),
+            ("SchedulingClass", wintypes.DWORD),
+        ]
+
+    class ExtendedLimits(ctypes.Structure):
+        _fields_ = [
+            ("BasicLimitInformation", BasicLimits),
+            ("IoInfo", IoCounters),
+            ("ProcessMemoryLimit", ctypes.c_size_t),
+            ("JobMemoryLimit", ctypes.c_size_t),
+            ("PeakProcessMemoryUsed", ctypes.c_size_t),
+            ("PeakJobMemoryUsed", ctypes.c_size_t),
+        ]
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.CreateJobObjectW.restype = wintypes.HANDLE
+    kernel32.CreateJobObjectW.argtypes = (ctypes.c_void_p, wintypes.LPCWSTR)
+    kernel32.SetInformationJobObject.argtypes = (wintypes.HANDLE, ctypes.c_int, ctypes.c_void_p, wintypes.DWORD)
+    kernel32.AssignProcessToJobObject.argtypes = (wintypes.HANDLE, wintypes.HANDLE)
+
+    with _engine_lock:
+        if _job is None:
+            job = kernel32.CreateJobObjectW(None, None)
+            limits = ExtendedLimits()
+            limits.BasicLimitInformation.LimitFlags = 0x2000  # JOB_OBJECT_LIMIT_KILL_ON_JOB_CLOSE
+            # JobObjectExtendedLimitInformation; the handle stays open until this process exits
+            if not job or not kernel32.SetInformationJobObject(job, 9, ctypes.byref(limits), ctypes.sizeof(limits)):
+                print(f"⚠️ Could not create a job object for whisper-server (error {ctypes.get_last_error()})")
+                return
+            _job = job
+    if not kernel32.AssignProcessToJobObject(_job, int(proc._handle)):
+        print(f"⚠️ whisper-server may outlive the backend (job object error {ctypes.get_last_error()})")
+
+
+class TranscriptionEngine:
+    """Turns a mono float32 segment into text. Long-lived engines load the model once."""
+
+    name = "base"
+    # set when the engine can no longer decode; get_engine then builds a new one for its slot
+    failed = False
+
+    def start(self):
+        pass
+
+    def transcribe(self, samples: np.ndarray, sample_rate: int) -> str:
+        raise NotImplementedError
+
+    def configure(self, model, threads, beam):
+        """Settings for the next decodes, from the quality governor; each engine applies what it can."""
+
+    def close(self):
+        pass
+
+
+class CliEngine(TranscriptionEngine):
+    """Fallback: spawns whisper-cli for every segment (reloads the model each time)."""
+
+    name = "cli"
+
+    def __init__(self, binary, model, threads):
+        self.binary = binary
+        self.model = model
+        self.threads = threads
+        self.beam = 1
+
+    def start(self):
+        if not os.path.exists(self.binary):
+            raise FileNotFoundError(self.binary)
+
+    def configure(self, model, threads, beam):
+        # every run loads the model anyway, so everything applies from the next segment
+        self.model, self.threads, self.beam = model, threads, beam
+
+    def transcribe(self, samples, sample_rate):
+        data = pcm_to_wav_bytes(samples, sample_rate)
+        return transcribe_with_whisper_cpp(self.binary, self.model, data, self.threads, self.beam)
+
+
+class ServerEngine(TranscriptionEngine):
+    """Keeps one whisper-server process alive and posts segments to it over localhost HTTP."""
+
+    name = "server"
+
+    def __init__(self, binary, model, threads, host, port, startup_timeout):
+        self.binary = binary
+        self.model = model
+        self.threads = threads
+        self.url = f"http://{host}:{port}"
+        self.host = host
+        self.port = port
+        self.startup_timeout = startup_timeout
+        self.beam = None
+        self._proc = None
+        self._http = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        import httpx
+
+        if not os.path.exists(self.binary):
+            raise FileNotFoundError(self.binary)
+
+        # something else (e.g. a whisper-server left over from a killed run) would answer
+        # our readiness check while our own server fails to bind
+        if not _port_free(self.host, self.port):
+            port = _any_free_port(self.host)
+            print(f"⚠️ Port {self.port} is in use, starting whisper-server on {port}")
+            self.port = port
+            self.url = f"http://{self.host}:{port}"
+
+        self._proc = subprocess.Popen(
+            [self.binary, "-m", self.model,
+             "--host", self.host, "--port", str(self.port),
+             "-t", str(self.threads)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        _kill_with_backend(self._proc)
+        self._http = httpx.Client(base_url=self.url, timeout=60)
+
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self._proc.poll() is not None:
+                raise RuntimeError(f"whisper-server exited with code {self._proc.returncode}")
+            try:
+                self._http.get("/")
+            except httpx.TransportError:
+                time.sleep(0.2)
+                continue
+            if self._proc.poll() is not None:
+                # the answer came from another process on the port, ours could not bind
+                code = self._proc.returncode
+                self.close()
+                raise RuntimeError(f"whisper-server exited with code {code} (port {self.port} taken)")
+            return
+
+        self.close()
+        raise TimeoutError("whisper-server did not start in time")
+
+    def configure(self, model, threads, beam):
+        self.beam = beam
+        if model == self.model:
+            return
+        # a different model means a new server process; threads can only change along with it
+        with self._lock:
+            previous = self.model, self.threads
+            self.close()
+            self.model, self.threads = model, threads
+            try:
+                self.start()
+            except Exception as e:
+                print(f"⚠️ whisper-server could not start with {os.path.basename(model)} ({e}), keeping the previous model")
+                self.close()
+                self.model, self.threads = previous
+                try:
+                    self.start()
+                except Exception:
+                    self.close()
+                    self.failed = True
+                    raise
+
+    def transcribe(self, samples, sample_rate):
+        data = pcm_to_wav_bytes(samples, sample_rate)
+        form = {"response_format": "json", "temperature": "0.0"}
+        if self.beam is not None:
+            form["beam_size"] = str(self.beam)
+        with self._lock:
+            res = self._http.post(
+                "/inference",
+                files={"file": ("segment.wav", data, "audio/wav")},
+                data=form,
+            )
+        if res.status_code != 200:
+            return ""
+        return res.json().get("text", "").strip()
+
+    def close(self):
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+        if self._proc is not None and self._proc.poll() is None:
+            self._proc.terminate()
+            try:
+                self._proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+        self._proc = None
+
+
+class BindingsEngine(TranscriptionEngine):
+    """Loads the model in-process through pywhispercpp (optional dependency)."""
+
+    name = "bindings"
+
+    def __init__(self, model, threads):
+        self.model_path = model
+        self.threads = threads
+        self.beam = 1
+        self._model = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        from pywhispercpp.model import Model
+
+        # greedy or beam search is chosen when the model is loaded
+        beam = {"params_sampling_strategy": 1, "beam_search": {"beam_size": self.beam, "patience": -1.0}}
+        self._model = Model(
+            self.model_path,
+            n_threads=self.threads,
+            print_progress=False,
+            print_realtime=False,
+            **(beam if self.beam > 1 else {}),
+        )
+
+    def configure(self, model, threads, beam):
+        with self._lock:
+            self.threads = threads
+            if (model, beam) != (self.model_path, self.beam):
+                self.model_path, self.beam = model, beam
+                self.start()
+
+    def transcribe(self, samples, sample_rate):
+        samples = _to_whisper_rate(samples, sample_rate)
+        with self._lock:
+            segments = self._model.transcribe(samples, n_threads=self.threads)
+        return " ".join(s.text.strip() for s in segments).strip()
+
+    def close(self):
+        self._model = None
+
+
+def _to_whisper_rate(samples, sample_rate):
+    samples = np.ascontiguousarray(samples, dtype=np.float32).reshape(-1)
+    if sample_rate == WHISPER_RATE:
+        return samples
+    from math import gcd
+    from scipy.signal import resample_poly
+
+    g = gcd(WHISPER_RATE, sample_rate)
+    return resample_poly(samples, WHISPER_RATE // g, sample_rate // g).astype(np.float32)
+
+
+def create_engine(name, slot=0):
+    cli = resource_path(config.WHISPER_CPP_PATH)
+    model = resource_path(config.WHISPER_MODEL)
+
+    if name == "server":
+        # one server per worker slot, since whisper-server decodes one request at a time
+        return ServerEngine(
+            resource_path(config.WHISPER_SERVER_PATH), model, config.WHISPER_THREADS,
+            config.WHISPER_SERVER_HOST, config.WHISPER_SERVER_PORT + slot,
+            config.WHISPER_SERVER_STARTUP_TIMEOUT,
+        )
+    if name == "bindings":
+        return BindingsEngine(model, config.WHISPER_THREADS)
+    if name == "cli":
+        return CliEngine(cli, model, config.WHISPER_THREADS)
+    raise ValueError(f"Unknown transcription engine: {name}")
+
+
+def get_engine(slot=0) -> TranscriptionEngine:
+    """
+    Returns the engine for a transcription worker slot, starting the configured one
+    (or the CLI fallback) on first use, or again after it failed. Each slot gets its own
+    engine instance.
+    """
+    with _engine_lock:
+        engine = _engines.get(slot)
+        if engine is not None and not engine.failed:
+            return engine
+        if engine is not None:
+            print(f"⚠️ Transcription engine '{engine.name}' (slot {slot}) stopped working, starting a new one")
+
+        engine = create_engine(config.TRANSCRIBE_ENGINE, slot)
+        try:
+            engine.start()
+        except Exception as e:
+            if engine.name == "cli":
+                raise
+            print(f"⚠️ Transcription engine '{engine.name}' unavailable ({e}), falling back to whisper-cli")
+            engine.close()
+            engine = create_engine("cli", slot)
+            engine.start()
+
+        print(f"✅ Transcription engine ready: {engine.name} (slot {slot})")
+        atexit.register(engine.close)
+        _engines[slot] = engine
+        return engine
+
+
+def ready_engines() -> dict:
+    """Engine name by worker slot, for the slots whose engine has started."""
+    with _engine_lock:
+        return {slot: engine.name for slot, engine in _engines.items()}
+
+
+def close_engine():
+    with _engine_lock:
+        for engine in _engines.values():
+            engine.close()
+        _engines.clear()
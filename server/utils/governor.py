@@ -0,0 +1,177 @@
+import os
+import time
+import threading
+from collections import deque
+
+from .. import config as config
+from ..routes.static import resource_path
+from .metrics import registry
+
+DECISIONS_KEPT = 50
+# decodes at a level before it is judged (the first ones may still wait behind the old backlog)
+MIN_DECODES = 3
+# weight of the newest decode in the moving averages
+EWMA_ALPHA = 0.3
+
+GOVERNOR_LEVEL = registry.gauge("lifehelper_governor_level", "Transcription quality level in use (index into GOVERNOR_LEVELS)")
+GOVERNOR_CHANGES = registry.counter(
+    "lifehelper_governor_changes_total", "Quality level changes made by the governor", labels=("direction",)
+)
+
+
+class QualityGovernor:
+    """
+    Picks the transcription settings (model, beam size, threads) for each decode. Levels
+    are GOVERNOR_LEVELS whose model file exists, cheapest first. After every decode the
+    time from the segment being cut to its text (queue wait + decode) and the real-time
+    factor go into moving averages:
+
+    - over GOVERNOR_TARGET_LATENCY, or more than GOVERNOR_MAX_BACKLOG segments waiting:
+      one level down at once;
+    - GOVERNOR_UP_AFTER decodes in a row under GOVERNOR_HEADROOM x the target with nothing
+      waiting, and GOVERNOR_COOLDOWN seconds since the last change: one level up. A level
+      that had to be left waits twice as long as last time before it is tried again.
+
+    Threads follow the load instead: the CPU cores are split between the decodes running
+    at that moment, so a lone worker gets all of them. Only decodes made at the current
+    level count, so a switch is judged on its own results.
+    """
+
+    def __init__(self, levels=None):
+        self.levels = []
+        for level in (config.GOVERNOR_LEVELS if levels is None else levels):
+            model = resource_path(level["model"])
+            if os.path.exists(model):
+                self.levels.append({"model": model, "beam": level.get("beam", 1), "threads": level.get("threads")})
+        default = resource_path(config.WHISPER_MODEL)
+        self.level = next((i for i, l in enumerate(self.levels) if l["model"] == default and l["beam"] == 1), 0)
+        self.cores = os.cpu_count() or 1
+        self.latency = None
+        self.rtf = None
+        self.backlog = 0
+        self.decodes = 0
+        self.decisions = deque(maxlen=DECISIONS_KEPT)
+        self._calm = 0
+        self._samples = 0
+        self._changed = time.monotonic()
+        self._retry_after = {}
+        self._backoff = {}
+        self._active = 0
+        self._lock = threading.Lock()
+        GOVERNOR_LEVEL.set(self.level)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(config.GOVERNOR and self.levels)
+
+    def acquire(self):
+        """(level, settings) for a decode about to start; pair with release()."""
+        with self._lock:
+            self._active += 1
+            level = self.levels[self.level]
+            threads = level["threads"] or max(1, self.cores // self._active)
+            return self.level, {"model": level["model"], "beam": level["beam"], "threads": threads}
+
+    def release(self, level, audio_seconds, decode_seconds, queued_seconds, backlog, ok=True):
+        """Ends a decode from acquire(); a failed one (`ok` false) is not a sample of the level's speed."""
+        with self._lock:
+            self._active -= 1
+            if not ok:
+                return
+            self.decodes += 1
+            self.backlog = backlog
+            if level != self.level or audio_seconds <= 0:
+                return
+            latency = queued_seconds + decode_seconds
+            rtf = decode_seconds / audio_seconds
+            self.latency = latency if self.latency is None else EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.latency
+            self.rtf = rtf if self.rtf is None else EWMA_ALPHA * rtf + (1 - EWMA_ALPHA) * self.rtf
+            self._samples += 1
+            if self._samples >= MIN_DECODES:
+                self._decide()
+
+    def _decide(self):
+        target = config.GOVERNOR_TARGET_LATENCY
+        now = time.monotonic()
+        if self.latency > target or self.backlog > config.GOVERNOR_MAX_BACKLOG:
+            self._calm = 0
+            if self.level > 0:
+                # the level just left gets a longer wait before the next try
+                backoff = self._backoff.get(self.level, config.GOVERNOR_COOLDOWN / 2) * 2
+                self._backoff[self.level] = backoff
+                self._retry_after[self.level] = now + backoff
+                reason = "backlog" if self.backlog > config.GOVERNOR_MAX_BACKLOG else "latency"
+                self._change(self.level - 1, "down", reason)
+            return
+
+        if self.latency < target * config.GOVERNOR_HEADROOM and self.backlog == 0:
+            self._calm += 1
+        else:
+            self._calm = 0
+        up = self.level + 1
+        if (up < len(self.levels) and self._calm >= config.GOVERNOR_UP_AFTER
+                and now - self._changed >= config.GOVERNOR_COOLDOWN and now >= self._retry_after.get(up, 0)):
+            self._change(up, "up", "headroom")
+
+    def _change(self, level, direction, reason):
+        old, self.level = self.level, level
+        self._changed = time.monotonic()
+        self._calm = 0
+        self._samples = 0
+        # the averages describe the old settings
+        latency, rtf = self.latency, self.rtf
+        self.latency = self.rtf = None
+        decision = {
+            "time": time.time(),
+            "from": old,
+            "to": level,
+            "direction": direction,
+            "reason": reason,
+            "latency": round(latency, 3),
+            "rtf": round(rtf, 3),
+            "backlog": self.backlog,
+        }
+        self.decisions.append(decision)
+        GOVERNOR_LEVEL.set(level)
+        GOVERNOR_CHANGES.inc(direction=direction)
+        print(f"🎚️ Transcription quality {direction}: {self.describe(old)} → {self.describe(level)} "
+              f"({reason}: latency {latency:.2f} s / target {config.GOVERNOR_TARGET_LATENCY} s, "
+              f"rtf {rtf:.2f}, backlog {self.backlog})")
+
+    def describe(self, level=None) -> str:
+        level = self.levels[self.level if level is None else level]
+        return f"{os.path.basename(level['model'])} beam {level['beam']}"
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "level": self.level,
+                "levels": [
+                    {"model": os.path.basename(l["model"]), "beam": l["beam"], "threads": l["threads"]}
+                    for l in self.levels
+                ],
+                "target_latency": config.GOVERNOR_TARGET_LATENCY,
+                "latency": round(self.latency, 3) if self.latency is not None else None,
+                "rtf": round(self.rtf, 3) if self.rtf is not None else None,
+                "backlog": self.backlog,
+                "decodes": self.decodes,
+                "active_decodes": self._active,
+                "decisions": list(self.decisions),
+            }
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_governor() -> QualityGovernor:
+    """The process-wide governor, built on first use from the config at that time."""
+    global _governor
+
+    with _governor_lock:
+        if _governor is None:
+            _governor = QualityGovernor()
+            if config.GOVERNOR and not _governor.levels:
+                print("⚠️ GOVERNOR is on but no model in GOVERNOR_LEVELS exists, transcription settings stay fixed")
+        return _governor
@@ -0,0 +1,73 @@
+import json
+import uuid
+import asyncio
+import threading
+
+# Per-subscriber backlog; a client this far behind is disconnected and resumes with Last-Event-ID
+SUBSCRIBER_QUEUE_SIZE = 256
+# Segment ids restart at 1 with every backend process; event ids carry this so a client
+# resuming after a restart is recognized (and the client can tell its list is stale)
+BOOT_ID = uuid.uuid4().hex[:8]
+
+
+class Subscription:
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def _deliver(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # the stream ends once the backlog is drained and the client resumes from its last id
+            self.overflowed = True
+
+
+class TranscriptHub:
+    """
+    Fans committed transcript entries out to push subscribers (SSE).
+
+    Each entry is serialized once in publish() and the same message is handed to
+    every subscriber's event loop, so the cost of a segment doesn't depend on how
+    much transcript already exists.
+    """
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> Subscription:
+        sub = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def publish(self, entry: dict, event: str = "segment"):
+        """Thread-safe; called from the transcription workers."""
+        message = (entry["id"], event, format_sse(entry, event))
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub._deliver, message)
+            except RuntimeError:
+                # event loop already closed
+                self.unsubscribe(sub)
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+
+def format_sse(entry: dict, event: str = "segment") -> str:
+    data = json.dumps(entry, ensure_ascii=False)
+    return f"id: {BOOT_ID}:{entry['id']}\nevent: {event}\ndata: {data}\n\n"
+
+
+hub = TranscriptHub()
@@ -0,0 +1,208 @@
+import os
+import re
+import json
+import mmap
+import threading
+from array import array
+
+from .. import config as config
+
+FSYNC_INTERVAL = 1.0
+SESSION_NAME_RE = re.compile(r"^session_[0-9T\-]+$")
+
+_journal = None
+_journal_closed = False
+_journal_lock = threading.Lock()
+_index_cache = {}
+
+
+class TranscriptJournal:
+    """
+    Append-only JSONL file of committed segments.
+
+    Every line is flushed to the OS as soon as it is written (survives the process
+    being killed); fsync to disk is batched on a background thread.
+    """
+
+    def __init__(self, path, fsync_interval=FSYNC_INTERVAL):
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self._f = open(path, "a", encoding="utf-8")
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sync_loop, daemon=True)
+        self._thread.start()
+
+    def append(self, entry: dict) -> bool:
+        """False if the journal was closed in the meantime (the entry is not written)."""
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._f.closed:
+                return False
+            self._f.write(line)
+            self._f.flush()
+            self._dirty = True
+        return True
+
+    def _sync(self):
+        with self._lock:
+            if not self._dirty or self._f.closed:
+                return
+            self._dirty = False
+            os.fsync(self._f.fileno())
+
+    def _sync_loop(self):
+        while not self._stop.wait(self.fsync_interval):
+            self._sync()
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self._sync()
+        with self._lock:
+            self._f.close()
+
+
+def open_journal(session_name):
+    """The session's journal, opened on first use; None once close_journal() has run (shutdown)."""
+    global _journal
+
+    with _journal_lock:
+        if _journal_closed:
+            return None
+        if _journal is None:
+            os.makedirs(config.TRANSCRIPTS_DIR, exist_ok=True)
+            _journal = TranscriptJournal(os.path.join(config.TRANSCRIPTS_DIR, session_name + ".jsonl"))
+        return _journal
+
+
+def close_journal():
+    """Returns the journal path, or None if nothing was journaled."""
+    global _journal, _journal_closed
+
+    with _journal_lock:
+        # segments still being committed during shutdown must not reopen (and leak) the file
+        _journal_closed = True
+        if _journal is None:
+            return None
+        journal, _journal = _journal, None
+    journal.close()
+    return journal.path
+
+
+# --- Past sessions ---
+
+def _session_files():
+    if not os.path.isdir(config.TRANSCRIPTS_DIR):
+        return {}
+    files = {}
+    for fname in os.listdir(config.TRANSCRIPTS_DIR):
+        name, ext = os.path.splitext(fname)
+        if not SESSION_NAME_RE.match(name):
+            continue
+        # the JSONL journal wins over a legacy .json dump of the same session
+        if ext == ".jsonl" or (ext == ".json" and name not in files):
+            files[name] = os.path.join(config.TRANSCRIPTS_DIR, fname)
+    return files
+
+
+def _line_index(path):
+    """Byte offsets of every line start, built with one mmap scan and cached by (size, mtime)."""
+    st = os.stat(path)
+    key = (st.st_size, st.st_mtime_ns)
+    cached = _index_cache.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+
+    offsets = array("q")
+    if st.st_size:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = 0
+            while pos < st.st_size:
+                offsets.append(pos)
+                nl = mm.find(b"\n", pos)
+                if nl < 0:
+                    break
+                pos = nl + 1
+    _index_cache[path] = (key, offsets)
+    return offsets
+
+
+def _read_lines(path, offsets, start, stop):
+    if start >= stop:
+        return []
+    with open(path, "rb") as f:
+        f.seek(offsets[start])
+        segments = []
+        for _ in range(stop - start):
+            line = f.readline()
+            if not line.strip():
+                continue
+            try:
+                segments.append(json.loads(line))
+            except json.JSONDecodeError:
+                # torn last line after a crash
+                break
+        return segments
+
+
+def list_sessions():
+    sessions = []
+    for name, path in sorted(_session_files().items(), reverse=True):
+        st = os.stat(path)
+        if path.endswith(".jsonl"):
+            offsets = _line_index(path)
+            count = len(offsets)
+            first = _read_lines(path, offsets, 0, 1) if count else []
+            last = _read_lines(path, offsets, count - 1, count) if count else []
+        else:
+            # legacy indented .json dump written at shutdown
+            count, first, last = None, [], []
+        sessions.append({
+            "name": name,
+            "segments": count,
+            "bytes": st.st_size,
+            "started": first[0].get("timestamp") if first else None,
+            "ended": last[0].get("timestamp") if last else None,
+            "audio": os.path.exists(os.path.join(config.TRANSCRIPTS_DIR, name + ".wav")),
+            "clips": os.path.exists(os.path.join(config.TRANSCRIPTS_DIR, name + ".clips.idx")),
+        })
+    return sessions
+
+
+def read_session(name, offset=0, limit=100):
+    """A page of a past session's segments, or None if there is no such session."""
+    if not SESSION_NAME_RE.match(name):
+        return None
+    path = _session_files().get(name)
+    if path is None:
+        return None
+
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            segments = json.load(f)
+        return {"total": len(segments), "segments": segments[offset:offset + limit]}
+
+    offsets = _line_index(path)
+    total = len(offsets)
+    start = min(max(offset, 0), total)
+    return {"total": total, "segments": _read_lines(path, offsets, start, min(start + limit, total))}
+
+
+def replay_session(name):
+    """Streams every segment of a past session without loading the file."""
+    path = _session_files().get(name)
+    if path is None:
+        return
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f)
+        return
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    return
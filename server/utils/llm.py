@@ -0,0 +1,74 @@
+import asyncio
+import threading
+
+from .. import config as config
+
+_client = None
+_http = None
+# get_client is also called from the startup warm-up thread
+_client_lock = threading.Lock()
+_limiter = None
+_busy = 0
+
+
+def get_client():
+    """Shared AsyncOpenAI client on one pooled HTTP transport, created on first use."""
+    global _client, _http
+
+    with _client_lock:
+        if _client is None:
+            import httpx
+            from openai import AsyncOpenAI
+
+            _http = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=config.LLM_MAX_CONCURRENCY,
+                    max_keepalive_connections=config.LLM_MAX_CONCURRENCY,
+                ),
+                timeout=httpx.Timeout(config.LLM_TIMEOUT, connect=config.LLM_CONNECT_TIMEOUT),
+            )
+            _client = AsyncOpenAI(http_client=_http, max_retries=1)
+        return _client
+
+
+def get_limiter() -> asyncio.Semaphore:
+    global _limiter
+
+    if _limiter is None:
+        _limiter = asyncio.Semaphore(config.LLM_MAX_CONCURRENCY)
+    return _limiter
+
+
+async def acquire_slot() -> bool:
+    """Waits up to LLM_QUEUE_TIMEOUT for a free completion slot."""
+    global _busy
+
+    try:
+        await asyncio.wait_for(get_limiter().acquire(), config.LLM_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        return False
+    _busy += 1
+    return True
+
+
+def release_slot():
+    global _busy
+
+    _busy -= 1
+    get_limiter().release()
+
+
+def busy_slots() -> int:
+    """Completion slots taken right now (streaming answers, summaries, prefetches)."""
+    return _busy
+
+
+async def close_client():
+    global _client, _http
+
+    if _client is not None:
+        await _client.close()
+        _client = None
+    if _http is not None:
+        await _http.aclose()
+        _http = None
@@ -0,0 +1,227 @@
+import re
+import time
+import asyncio
+from collections import OrderedDict, deque
+
+from .. import config as config
+from .hub import hub
+from .llm import get_client, acquire_slot, release_slot, busy_slots
+from .state import live_transcript, get_entries_after
+from .conversation import Conversation, build_messages
+from .answer_cache import normalize_question
+from .metrics import registry
+
+_SENTENCE_RE = re.compile(r"[^.?!]+[.?!]?")
+_WORD_RE = re.compile(r"[\w'-]+")
+_ACRONYM_RE = re.compile(r"^[A-Z][A-Z0-9]{1,5}s?$")
+# capitalized words that say nothing about the topic
+_STOP_NAMES = {"I", "I'm", "I've", "I'll", "I'd", "OK", "Okay", "Yes", "No", "So", "And", "But", "Oh"}
+SEEN_TERMS = 1000
+QUEUE_SIZE = 16
+
+PREFETCHES = registry.counter(
+    "lifehelper_prefetch_total", "Speculative answers by outcome (stored, truncated, failed, dropped unanswered)",
+    labels=("result",)
+)
+PREFETCH_HITS = registry.counter("lifehelper_prefetch_hits_total", "Asks answered from a speculative answer")
+
+
+def extract_candidates(text: str) -> list:
+    """
+    Likely things to be asked about in a segment: whole questions (sentences ending in "?"
+    with at least four words), then runs of capitalized words inside a sentence (names,
+    products) and acronyms. Most telling first.
+    """
+    questions, terms = [], []
+    for sentence in _SENTENCE_RE.findall(text):
+        sentence = sentence.strip()
+        words = _WORD_RE.findall(sentence)
+        if sentence.endswith("?") and len(words) >= 4:
+            questions.append(sentence)
+
+        run = []
+        for i, word in enumerate(words + [""]):
+            # a sentence's first word is capitalized anyway, unless it is an acronym
+            capitalized = word[:1].isupper() and (i > 0 or _ACRONYM_RE.match(word)) and word not in _STOP_NAMES
+            if capitalized:
+                run.append(word[:-2] if word.endswith("'s") else word)
+                continue
+            if run and (len(run) > 1 or _ACRONYM_RE.match(run[0]) or len(run[0]) >= 4):
+                terms.append(" ".join(run))
+            run = []
+    return questions + terms
+
+
+class Prefetcher:
+    """
+    Speculative /api/ask answers. Watches segments as they are committed (through the same
+    hub that feeds the SSE clients), picks out questions and key terms, and answers the
+    newest of them one at a time, only while no other completion holds a slot and within
+    PREFETCH_PER_MINUTE. Answers are kept LRU for PREFETCH_TTL seconds; an ask whose
+    normalized text matches one is served from it without calling the LLM. Answers cut
+    off at PREFETCH_MAX_TOKENS are not kept, so an ask never gets (or caches) half an answer.
+    """
+
+    def __init__(self):
+        self._answers = OrderedDict()
+        self._queue = deque(maxlen=QUEUE_SIZE)
+        self._seen = OrderedDict()
+        self._started = deque()
+        self._generating = None
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.truncated = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def offer(self, text: str):
+        for candidate in extract_candidates(text):
+            key = normalize_question(candidate)
+            if not key or key in self._seen:
+                continue
+            self._seen[key] = True
+            while len(self._seen) > SEEN_TERMS:
+                self._seen.popitem(last=False)
+            # a full queue drops its oldest candidate: the newest are the likeliest to be asked
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+                PREFETCHES.inc(result="dropped")
+            self._queue.append(candidate)
+
+    def lookup(self, question: str):
+        """The speculative answer for `question`, or None."""
+        key = normalize_question(question)
+        now = time.monotonic()
+        best, best_ratio = None, 0.0
+        for term, (created, answer) in list(self._answers.items()):
+            if now - created > config.PREFETCH_TTL:
+                del self._answers[term]
+                continue
+            if term == key:
+                best, best_ratio = term, 1.0
+                break
+            if key and (key in term or term in key):
+                ratio = min(len(key), len(term)) / max(len(key), len(term))
+                if ratio >= config.PREFETCH_MATCH_RATIO and ratio > best_ratio:
+                    best, best_ratio = term, ratio
+
+        if best is None:
+            self.misses += 1
+            return None
+        self._answers.move_to_end(best)
+        self.hits += 1
+        PREFETCH_HITS.inc()
+        return self._answers[best][1]
+
+    def _within_budget(self):
+        now = time.monotonic()
+        while self._started and now - self._started[0] > 60:
+            self._started.popleft()
+        return len(self._started) < config.PREFETCH_PER_MINUTE
+
+    def _maybe_start(self):
+        if not self._queue or (self._generating is not None and not self._generating.done()):
+            return
+        # lowest priority: never while an answer, a summary or another prefetch is running
+        if busy_slots() or not self._within_budget():
+            return
+        self._started.append(time.monotonic())
+        self._generating = asyncio.create_task(self._generate(self._queue.pop()))
+
+    async def _generate(self, question):
+        since_ms = time.time_ns() // 1_000_000 - int(config.LLM_TRANSCRIPT_SECONDS * 1000)
+        # same prompt a fresh chat would send, so the answer is what the ask would have streamed
+        messages = await asyncio.to_thread(
+            build_messages, Conversation("prefetch"), question, live_transcript.since_ms(since_ms)
+        )
+        if not await acquire_slot():
+            return
+        try:
+            response = await get_client().chat.completions.create(
+                model=config.LLM_MODEL,
+                messages=messages,
+                max_tokens=config.PREFETCH_MAX_TOKENS,
+                timeout=config.LLM_TIMEOUT,
+            )
+            choice = response.choices[0]
+            answer = (choice.message.content or "").strip()
+        except Exception as e:
+            self.failed += 1
+            PREFETCHES.inc(result="failed")
+            print(f"⚠️ Prefetching an answer for '{question[:40]}' failed: {e}")
+            return
+        finally:
+            release_slot()
+
+        if answer and choice.finish_reason != "stop":
+            # hit the token limit (or was filtered): the real ask should get the whole answer
+            self.truncated += 1
+            PREFETCHES.inc(result="truncated")
+        elif answer:
+            self._answers[normalize_question(question)] = (time.monotonic(), answer)
+            while len(self._answers) > config.PREFETCH_MAX_ENTRIES:
+                self._answers.popitem(last=False)
+            self.stored += 1
+            PREFETCHES.inc(result="stored")
+
+    async def run(self):
+        """Follows the live transcript until cancelled; started by the app lifespan when PREFETCH is on."""
+        last_id = live_transcript.last_id
+        sub = hub.subscribe()
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(sub.queue.get(), 1.0)
+                except asyncio.TimeoutError:
+                    pass
+                if sub.overflowed:
+                    hub.unsubscribe(sub)
+                    sub = hub.subscribe()
+                for entry in get_entries_after(last_id):
+                    last_id = entry["id"]
+                    if entry.get("text"):
+                        self.offer(entry["text"])
+                self._maybe_start()
+        finally:
+            hub.unsubscribe(sub)
+            if self._generating is not None:
+                self._generating.cancel()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": config.PREFETCH,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stored": self.stored,
+            "truncated": self.truncated,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "entries": len(self._answers),
+            "queued": len(self._queue),
+        }
+
+
+prefetcher = Prefetcher()
+_task = None
+
+
+def start_prefetch():
+    global _task
+
+    if config.PREFETCH and _task is None:
+        _task = asyncio.create_task(prefetcher.run())
+
+
+async def stop_prefetch():
+    global _task
+
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
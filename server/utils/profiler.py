@@ -0,0 +1,112 @@
+import os
+import sys
+import time
+import threading
+from collections import Counter
+
+from .. import config as config
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for the running server: a background thread snapshots every
+    thread's stack (sys._current_frames) each `interval` seconds and counts the stacks.
+    Nothing is traced between samples, so the overhead is one stack walk per thread per
+    sample and it is safe to turn on in the live app. Off until start() is called.
+    """
+
+    def __init__(self):
+        self.interval = None
+        self.started_at = None
+        self.stopped_at = None
+        self.samples = 0
+        self._stacks = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval=None, max_seconds=None) -> bool:
+        """Starts sampling from scratch; False if it is already running."""
+        with self._lock:
+            if self.running:
+                return False
+            self.interval = max(float(interval or config.PROFILE_INTERVAL), 0.001)
+            self.started_at = time.time()
+            self.stopped_at = None
+            self.samples = 0
+            self._stacks = Counter()
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, args=(max_seconds or config.PROFILE_MAX_SECONDS,), name="profiler", daemon=True
+            )
+            self._thread.start()
+            return True
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def _run(self, max_seconds):
+        me = threading.get_ident()
+        deadline = time.monotonic() + max_seconds
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            frames = sys._current_frames()
+            stacks = [
+                _fold(names.get(ident, str(ident)), frame) for ident, frame in frames.items() if ident != me
+            ]
+            del frames
+            with self._lock:
+                self._stacks.update(stacks)
+                self.samples += 1
+        self.stopped_at = time.time()
+
+    def folded(self) -> str:
+        """Collapsed stacks ("thread;outer;...;inner count"), the input format of flamegraph.pl and speedscope."""
+        with self._lock:
+            stacks = self._stacks.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+    def top(self, limit=30) -> list:
+        """Functions by samples spent in them (self) and under them (total), busiest first."""
+        own, total = Counter(), Counter()
+        with self._lock:
+            stacks = list(self._stacks.items())
+        for stack, count in stacks:
+            frames = stack.split(";")[1:]
+            if not frames:
+                continue
+            own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+        return [
+            {"function": name, "self": own[name], "total": count}
+            for name, count in sorted(total.items(), key=lambda item: (-own[item[0]], -item[1]))[:limit]
+        ]
+
+    def status(self) -> dict:
+        end = self.stopped_at or time.time()
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "samples": self.samples,
+            "seconds": round(end - self.started_at, 1) if self.started_at else 0,
+        }
+
+
+def _fold(thread_name, frame) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+        frame = frame.f_back
+    names.append(thread_name.replace(";", ":"))
+    return ";".join(reversed(names))
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,333 @@
+import re
+import math
+import queue
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from .. import config as config
+from .journal import list_sessions, replay_session
+
+_TOKEN_RE = re.compile(r"\w+")
+# a term is "common" if it is in more than this share of the segments (and at least 50k of them)
+COMMON_TERM_SHARE = 0.05
+COMMON_TERM_MIN = 50000
+
+
+def tokenize(text: str) -> list:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class _Column:
+    """Growable numpy array (capacity doubles). Views of the filled part stay valid across growth."""
+
+    def __init__(self, dtype, capacity=4):
+        self._data = np.empty(capacity, dtype=dtype)
+        self.n = 0
+
+    def append(self, value):
+        if self.n == len(self._data):
+            grown = np.empty(len(self._data) * 2, dtype=self._data.dtype)
+            grown[:self.n] = self._data
+            self._data = grown
+        self._data[self.n] = value
+        self.n += 1
+
+    def view(self) -> np.ndarray:
+        return self._data[:self.n]
+
+
+class InvertedIndex:
+    """
+    BM25 over transcript segments. Each term keeps its postings in growable numpy arrays:
+    document numbers and impacts, the length-normalized term frequency part of BM25
+    computed when the segment is added (with the average length at that time, which
+    settles after the first few thousand segments). A query is then idf times a slice
+    of the impacts of its terms, never touching the rest of the index.
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings = {}
+        self._ts = _Column(np.int64, 1024)
+        self._session = _Column(np.int32, 1024)
+        self._entry_id = _Column(np.int32, 1024)
+        self._texts = []
+        self._sessions = []
+        self._session_index = {}
+        self._total_len = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._texts)
+
+    def add(self, session: str, entry: dict) -> int:
+        """Indexes one segment, returns its document number."""
+        text = entry.get("text", "")
+        terms = tokenize(text)
+        counts = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+
+        with self._lock:
+            doc = len(self._texts)
+            self._total_len += len(terms)
+            norm = self.k1 * (1 - self.b + self.b * len(terms) / (self._total_len / (doc + 1)))
+            s = self._session_index.get(session)
+            if s is None:
+                s = self._session_index[session] = len(self._sessions)
+                self._sessions.append(session)
+
+            for term, tf in counts.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = (_Column(np.uint32), _Column(np.float16))
+                postings[0].append(doc)
+                postings[1].append(tf * (self.k1 + 1) / (tf + norm))
+
+            self._ts.append(_entry_ms(entry))
+            self._session.append(s)
+            self._entry_id.append(entry.get("id", 0))
+            # appended last: readers only look at documents below len(self._texts)
+            self._texts.append(text)
+        return doc
+
+    def search(self, query: str, limit=20, session=None, since_ms=None, until_ms=None) -> list:
+        """[(doc, score)] best first."""
+        terms = set(tokenize(query))
+        with self._lock:
+            n_docs = len(self._texts)
+            if not terms or not n_docs:
+                return []
+            postings = [self._postings[t] for t in terms if t in self._postings]
+            postings = [(p[0].view(), p[1].view()) for p in postings]
+            session_id = self._session_index.get(session) if session is not None else None
+            if session is not None and session_id is None:
+                return []
+            ts = self._ts.view()[:n_docs]
+            sessions = self._session.view()[:n_docs]
+
+        if not postings:
+            return []
+
+        # Terms in a large share of the segments ("the", "and") would make every query touch
+        # most of the index. Candidates come from the rarer terms (or the rarest one if all are
+        # common); the other terms only add their score to those, looked up by bisecting their
+        # postings, which are sorted since documents are numbered in insertion order.
+        postings.sort(key=lambda p: len(p[0]))
+        threshold = max(n_docs * COMMON_TERM_SHARE, COMMON_TERM_MIN)
+        rare = [p for p in postings if len(p[0]) <= threshold] or postings[:1]
+        common = postings[len(rare):]
+
+        if len(rare) == 1:
+            candidates = rare[0][0]
+            scores = _idf(n_docs, len(candidates)) * rare[0][1].astype(np.float32)
+        else:
+            docs = np.concatenate([p[0] for p in rare])
+            contributions = np.concatenate([_idf(n_docs, len(p[0])) * p[1].astype(np.float32) for p in rare])
+            candidates, inverse = np.unique(docs, return_inverse=True)
+            scores = np.bincount(inverse, weights=contributions, minlength=len(candidates)).astype(np.float32)
+
+        for docs, impacts in common:
+            idf = _idf(n_docs, len(docs))
+            if len(candidates) * 16 < len(docs):
+                at = np.minimum(np.searchsorted(docs, candidates), len(docs) - 1)
+                found = docs[at] == candidates
+                scores[found] += idf * impacts[at[found]].astype(np.float32)
+            else:
+                # many candidates: one scatter into a dense array beats bisecting for each
+                dense = np.zeros(n_docs, dtype=np.float32)
+                dense[docs] = impacts
+                scores += idf * dense[candidates]
+
+        keep = np.ones(len(candidates), dtype=bool)
+        if session_id is not None:
+            keep &= sessions[candidates] == session_id
+        if since_ms is not None:
+            keep &= ts[candidates] >= since_ms
+        if until_ms is not None:
+            keep &= ts[candidates] < until_ms
+        top = _top(np.flatnonzero(keep), scores, limit)
+        return [(int(candidates[i]), score) for i, score in top]
+
+    def document(self, doc: int) -> dict:
+        ts = int(self._ts.view()[doc])
+        return {
+            "session": self._sessions[self._session.view()[doc]],
+            "id": int(self._entry_id.view()[doc]),
+            "ts": ts,
+            "timestamp": datetime.fromtimestamp(ts / 1000).isoformat(timespec="seconds") if ts else None,
+            "text": self._texts[doc],
+        }
+
+    def filter_mask(self, docs: np.ndarray, session=None, since_ms=None, until_ms=None) -> np.ndarray:
+        keep = np.ones(len(docs), dtype=bool)
+        if session is not None:
+            keep &= self._session.view()[docs] == self._session_index.get(session, -1)
+        if since_ms is not None:
+            keep &= self._ts.view()[docs] >= since_ms
+        if until_ms is not None:
+            keep &= self._ts.view()[docs] < until_ms
+        return keep
+
+
+class EmbeddingIndex:
+    """
+    Optional semantic index: normalized sentence embeddings (fastembed, ONNX on CPU) in one
+    growable matrix, searched by a single matrix-vector product. Segments are embedded in
+    batches on a background thread, so committing a segment never waits for the model.
+    """
+
+    def __init__(self, model_name, batch_size=64):
+        from fastembed import TextEmbedding
+
+        self._model = TextEmbedding(model_name=model_name)
+        self.batch_size = batch_size
+        self._matrix = None
+        self._docs = _Column(np.uint32, 1024)
+        self._lock = threading.Lock()
+        self._pending = queue.Queue()
+        self._thread = threading.Thread(target=self._embed_loop, daemon=True)
+        self._thread.start()
+
+    def add(self, doc: int, text: str):
+        self._pending.put((doc, text))
+
+    def _embed_loop(self):
+        while True:
+            batch = [self._pending.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                vectors = np.asarray(list(self._model.embed([text for _, text in batch])), dtype=np.float32)
+            except Exception as e:
+                print(f"⚠️ Embedding failed for {len(batch)} segments: {e}")
+                continue
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-9
+            self._append(vectors, [doc for doc, _ in batch])
+
+    def _append(self, vectors, docs):
+        with self._lock:
+            n = self._docs.n
+            if self._matrix is None:
+                self._matrix = np.empty((max(1024, len(docs)), vectors.shape[1]), dtype=np.float32)
+            elif n + len(docs) > len(self._matrix):
+                grown = np.empty((max(len(self._matrix) * 2, n + len(docs)), self._matrix.shape[1]), dtype=np.float32)
+                grown[:n] = self._matrix[:n]
+                self._matrix = grown
+            self._matrix[n:n + len(docs)] = vectors
+            for doc in docs:
+                self._docs.append(doc)
+
+    def search(self, query: str) -> tuple:
+        """(documents, cosine similarities) of everything embedded so far."""
+        embed = getattr(self._model, "query_embed", self._model.embed)
+        vector = np.asarray(next(iter(embed([query]))), dtype=np.float32)
+        vector /= np.linalg.norm(vector) + 1e-9
+        with self._lock:
+            n = self._docs.n
+            if not n:
+                return np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.float32)
+            matrix, docs = self._matrix[:n], self._docs.view()
+        return docs, matrix @ vector
+
+
+class TranscriptSearch:
+    """Full-text (and optionally semantic) search over the live transcript and past sessions."""
+
+    def __init__(self):
+        self.text = InvertedIndex()
+        self.semantic = None
+        self.indexing = False
+
+    def enable_embeddings(self, model_name):
+        try:
+            self.semantic = EmbeddingIndex(model_name)
+        except Exception as e:
+            print(f"⚠️ Semantic search unavailable ({e}), using full-text search only")
+
+    def add(self, session: str, entry: dict):
+        doc = self.text.add(session, entry)
+        if self.semantic is not None:
+            self.semantic.add(doc, entry.get("text", ""))
+
+    def search(self, query, limit=20, mode="text", session=None, since_ms=None, until_ms=None) -> dict:
+        if mode != "text" and self.semantic is None:
+            mode = "text"
+
+        if mode == "text":
+            ranked = self.text.search(query, limit, session, since_ms, until_ms)
+        else:
+            docs, sims = self.semantic.search(query)
+            keep = self.text.filter_mask(docs, session, since_ms, until_ms)
+            semantic = [(int(docs[i]), score) for i, score in _top(np.flatnonzero(keep), sims, limit * 3)]
+            if mode == "semantic":
+                ranked = semantic[:limit]
+            else:
+                ranked = _fuse(self.text.search(query, limit * 3, session, since_ms, until_ms), semantic)[:limit]
+
+        hits = []
+        for doc, score in ranked:
+            hit = self.text.document(doc)
+            hit["score"] = round(float(score), 4)
+            hits.append(hit)
+        return {"mode": mode, "hits": hits}
+
+
+def _idf(n_docs, df):
+    return math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+
+def _entry_ms(entry):
+    if "ts" in entry:
+        return int(entry["ts"])
+    try:
+        return int(datetime.fromisoformat(entry["timestamp"]).timestamp() * 1000)
+    except (KeyError, TypeError, ValueError):
+        return 0
+
+
+def _top(candidates, scores, limit):
+    if len(candidates) > limit:
+        candidates = candidates[np.argpartition(-scores[candidates], limit)[:limit]]
+    order = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return [(int(doc), float(scores[doc])) for doc in order]
+
+
+def _fuse(*rankings, k=60):
+    """Reciprocal rank fusion."""
+    fused = {}
+    for ranking in rankings:
+        for rank, (doc, _) in enumerate(ranking):
+            fused[doc] = fused.get(doc, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(fused.items(), key=lambda item: -item[1])
+
+
+def build_archive_index(index: TranscriptSearch, skip_session: str):
+    """Indexes every past session in TRANSCRIPTS_DIR (run on a background thread at startup)."""
+    index.indexing = True
+    try:
+        for session in reversed(list_sessions()):
+            if session["name"] == skip_session:
+                continue
+            for entry in replay_session(session["name"]):
+                if entry.get("text"):
+                    index.add(session["name"], entry)
+    except Exception as e:
+        print(f"⚠️ Indexing past sessions failed: {e}")
+    finally:
+        index.indexing = False
+
+
+search_index = TranscriptSearch()
+
+
+def start_search_index(current_session: str):
+    if config.SEARCH_EMBEDDINGS:
+        search_index.enable_embeddings(config.SEARCH_EMBEDDING_MODEL)
+    threading.Thread(target=build_archive_index, args=(search_index, current_session), daemon=True).start()
@@ -1,12 +1,62 @@
 # server/audio/state.py
 
-live_transcript = []
+import threading
+from datetime import datetime
 
+from .hub import hub
+from .transcript_store import TranscriptStore
+from .journal import open_journal
+from .search import search_index
 
-def get_live_transcript():
-    return live_transcript
+live_transcript = TranscriptStore()
+_append_lock = threading.Lock()
+_session_name = None
+_partial = None
+
+
+def get_session_name():
+    """Name shared by every file this run writes to TRANSCRIPTS_DIR, fixed on first use."""
+    global _session_name
+    if _session_name is None:
+        timestamp = datetime.now().isoformat(timespec='seconds').replace(":", "-")
+        _session_name = f"session_{timestamp}"
+    return _session_name
+
+
+def get_entries_after(last_id: int):
+    return live_transcript.since_id(last_id)
+
+
+def get_partial():
+    """Provisional text of the utterance being spoken (low-latency mode; the latest of any stream), or None."""
+    return _partial
+
+
+def publish_partial(text: str, source=None):
+    global _partial
+    with _append_lock:
+        # carries the last final id, so Last-Event-ID resumes stay on committed segments
+        entry = {"id": live_transcript.last_id, "text": text, "final": False, "source": source}
+        if text:
+            _partial = entry
+        elif _partial is not None and _partial.get("source") == source:
+            _partial = None
+        hub.publish(entry, event="partial")
 
 
 def add_to_transcript(entry):
-    live_transcript.append(entry)
+    global _partial
+    # one lock around append + publish keeps the push feed in id order
+    with _append_lock:
+        entry.setdefault("final", True)
+        if _partial is not None and _partial.get("source") == entry.get("source"):
+            _partial = None
+        live_transcript.append(entry)
+        journal = open_journal(get_session_name())
+        if journal is None or not journal.append(entry):
+            print(f"⚠️ Segment {entry['id']} committed after the transcript was closed, not saved to disk")
+        search_index.add(get_session_name(), entry)
+        hub.publish(entry)
+    return entry
+
 
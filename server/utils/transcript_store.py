@@ -0,0 +1,70 @@
+import time
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+
+class TranscriptStore:
+    """
+    Append-only transcript with sequence ids and epoch-millisecond timestamps.
+
+    Ids start at 1 and are contiguous, so id lookups are list slices. Timestamps are
+    kept non-decreasing in a compact int64 array, so time lookups are bisects.
+    """
+
+    def __init__(self):
+        self._entries = []
+        self._ts_ms = array("q")
+        self._lock = threading.Lock()
+
+    def append(self, entry: dict) -> dict:
+        """Stamps the entry with "id", "ts" (epoch ms) and, if missing, "timestamp" (ISO seconds)."""
+        now_ms = time.time_ns() // 1_000_000
+        with self._lock:
+            if self._ts_ms and now_ms < self._ts_ms[-1]:
+                # wall clock stepped back; keep the index sorted
+                now_ms = self._ts_ms[-1]
+            entry["id"] = len(self._entries) + 1
+            entry["ts"] = now_ms
+            if "timestamp" not in entry:
+                entry["timestamp"] = datetime.fromtimestamp(now_ms / 1000).isoformat(timespec="seconds")
+            self._entries.append(entry)
+            self._ts_ms.append(now_ms)
+        return entry
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def last_id(self):
+        return len(self._entries)
+
+    def entries(self) -> list:
+        with self._lock:
+            return list(self._entries)
+
+    def tail(self, n: int) -> list:
+        with self._lock:
+            return self._entries[-n:] if n > 0 else []
+
+    def since_id(self, last_id: int, limit: int = None) -> list:
+        """Entries with id > last_id."""
+        start = max(last_id, 0)
+        with self._lock:
+            end = len(self._entries) if limit is None else start + limit
+            return self._entries[start:end]
+
+    def since_ms(self, ts_ms: int, limit: int = None) -> list:
+        """Entries stamped strictly after ts_ms."""
+        with self._lock:
+            start = bisect_right(self._ts_ms, ts_ms)
+            end = len(self._entries) if limit is None else start + limit
+            return self._entries[start:end]
+
+    def range_ms(self, start_ms: int, end_ms: int) -> list:
+        """Entries stamped in [start_ms, end_ms)."""
+        with self._lock:
+            lo = bisect_left(self._ts_ms, start_ms)
+            hi = bisect_left(self._ts_ms, end_ms, lo)
+            return self._entries[lo:hi]
@@ -1,45 +1,63 @@
-import os
+import io
+import time
+import wave
 import subprocess
+import numpy as np
 
+from .metrics import registry
 
-def transcribe_with_whisper_cpp(binary, model, audio_data, tmp):
-    tmp_wav = tmp + ".wav"
-    txt_path = tmp + ".txt"
+CLI_SECONDS = registry.histogram("lifehelper_whisper_cli_seconds", "whisper-cli subprocess run time per segment")
+CLI_FAILURES = registry.counter("lifehelper_whisper_cli_failures_total", "whisper-cli runs that exited with an error",
+                                labels=("code",))
 
-    with open(tmp_wav, "wb") as f:
-        f.write(audio_data)
 
+def transcribe_with_whisper_cpp(binary, model, audio_data, threads=8, beam=1):
+    """Feeds WAV bytes to whisper-cli on stdin and reads the text back from stdout (no temp files)."""
     cmd = [
         binary, "-m", model,
-        "-f", tmp_wav, "-otxt", "-of", tmp,
-        "-t", "8"
+        "-f", "-", "-nt", "-np",
+        "-t", str(threads)
     ]
+    if beam > 1:
+        cmd += ["-bs", str(beam)]
 
-    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    started = time.perf_counter()
+    result = subprocess.run(cmd, input=audio_data, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    CLI_SECONDS.observe(time.perf_counter() - started)
+    if result.returncode != 0:
+        CLI_FAILURES.inc(code=result.returncode)
 
     # Handle cases
     if result.returncode == 3221225786:
-        cleanup_temp_files(tmp_wav, txt_path)
         return ""
 
     if result.returncode != 0:
-        cleanup_temp_files(tmp_wav, txt_path)
         return ""
 
-    text = ""
-    try:
-        with open(txt_path, "r", encoding="utf-8") as f:
-            text = f.read().strip()
-    except FileNotFoundError:
-        pass
-
-    cleanup_temp_files(tmp_wav, txt_path)
-    return text
-
-def cleanup_temp_files(*paths):
-    for path in paths:
-        try:
-            if os.path.exists(path):
-                os.remove(path)
-        except OSError:
-            pass
\ No newline at end of file
+    lines = result.stdout.decode("utf-8", errors="replace").splitlines()
+    return " ".join(line.strip() for line in lines if line.strip())
+
+
+def pcm_to_wav_bytes(samples, sample_rate):
+    """Encodes mono float32 samples as an in-memory 16-bit WAV."""
+    pcm = np.clip(np.asarray(samples, dtype=np.float32).reshape(-1), -1.0, 1.0)
+    pcm = (pcm * 32767.0).astype("<i2")
+
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(int(sample_rate))
+        wf.writeframes(pcm.tobytes())
+    return buf.getvalue()
+
+
+def valid_text(text: str) -> bool:
+    if not text:
+        return False
+    t = text.strip().lower()
+    if t in ("[blank_audio]", "[blank]", "(silence)", "[ silence ]"):
+        return False
+    if t in ("you", "uh", "ah", "a", "hmm"):
+        return False
+    return True
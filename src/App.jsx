@@ -1,36 +1,36 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef } from "react";
 import Transcript from "./components/Transcript.jsx";
-import { fetchLive } from "./api.js";
+import { subscribeLive } from "./api.js";
 
 function App() {
   const [segments, setSegments] = useState([]);
-  const [lastTimestamp, setLastTimestamp] = useState(null);
+  const [partial, setPartial] = useState("");
+  const boot = useRef(null);
 
-  // Poll live transcript periodically
+  // Live transcript is pushed by the server (SSE)
   useEffect(() => {
-    const interval = setInterval(async () => {
-      try {
-        const data = await fetchLive(lastTimestamp);
-        const newSegs = data.segments || [];
-        if (newSegs.length > 0) {
-          setSegments(prev => {
-            // 🔍 remove duplicates by timestamp
-            const existingTimestamps = new Set(prev.map(s => s.timestamp));
-            const newSegments = data.segments.filter(s => !existingTimestamps.has(s.timestamp));
-            return [...prev, ...newSegments];
-          });
-          setLastTimestamp(newSegs[newSegs.length - 1].timestamp);
-        }
-      } catch (err) {
-        console.error("Polling error:", err);
-      }
-    }, 1000);
-    return () => clearInterval(interval);
-  }, [lastTimestamp]);
+    const unsubscribe = subscribeLive(
+      (segment, bootId) => {
+        // the backend restarted: its ids begin again, so what we have is a previous run
+        const restarted = boot.current !== null && boot.current !== bootId;
+        boot.current = bootId;
+        setSegments(prev => {
+          if (restarted) return [segment];
+          // 🔍 ignore replays after a reconnect
+          if (prev.length > 0 && prev[prev.length - 1].id >= segment.id) return prev;
+          return [...prev, segment];
+        });
+        setPartial("");
+      },
+      (err) => console.error("Live stream error:", err),
+      (p) => setPartial(p.text)
+    );
+    return unsubscribe;
+  }, []);
 
   return (
     <div style={{fontFamily: "system-ui", padding: "0rem", width: '100%', height: '100%', boxSizing: "border-box", display: "flex", flexDirection: "column"}}>
-      <Transcript segments={segments} />
+      <Transcript segments={segments} partial={partial} />
     </div>
   );
 }
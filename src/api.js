@@ -1,20 +1,38 @@
 const API_BASE = window.api?.baseUrl || "http://localhost:8000/api";
 
-export async function fetchLive(since) {
+// Identifies this window's conversation with the AI; survives reloads, not new windows.
+const SESSION_ID = sessionStorage.getItem("lifehelper-session") || crypto.randomUUID();
+sessionStorage.setItem("lifehelper-session", SESSION_ID);
+
+export async function fetchLive(since, sinceId) {
   let url = `${API_BASE}/live`;
-  if (since) url += `?since=${encodeURIComponent(since)}`;
+  if (sinceId != null) url += `?since_id=${sinceId}`;
+  else if (since) url += `?since=${encodeURIComponent(since)}`;
   const res = await fetch(url);
   if (!res.ok) throw new Error("Failed to fetch live data");
   return await res.json();
 }
 
+// Push feed of committed segments. EventSource reconnects on its own and
+// resumes after the last received id (Last-Event-ID, "<boot>:<segment id>").
+// onSegment also gets the boot id: it changes when the backend restarts and
+// segment ids start again at 1.
+// "partial" events carry provisional text of the current utterance (low-latency mode).
+export function subscribeLive(onSegment, onError, onPartial) {
+  const source = new EventSource(`${API_BASE}/live/stream`);
+  source.addEventListener("segment", (e) => onSegment(JSON.parse(e.data), e.lastEventId.split(":")[0]));
+  if (onPartial) source.addEventListener("partial", (e) => onPartial(JSON.parse(e.data)));
+  if (onError) source.onerror = onError;
+  return () => source.close();
+}
+
 export async function askAI(question, onToken) {
   const res = await fetch(`${API_BASE}/ask`, {
     method: "POST",
     headers: {
       "Content-Type": "application/json",
     },
-    body: JSON.stringify({ question }),
+    body: JSON.stringify({ question, session_id: SESSION_ID }),
   });
 
   if (!res.ok) throw new Error("AI request failed");
@@ -1,7 +1,7 @@
 import React, { useEffect, useRef, useState } from "react";
 import { askAI } from "../api";
 
-export default function Transcript({ segments }) {
+export default function Transcript({ segments, partial }) {
   const containerRef = useRef(null);
 
   // State
@@ -29,7 +29,7 @@ export default function Transcript({ segments }) {
         behavior: "smooth",
       });
     }
-  }, [paragraphs.length]);
+  }, [paragraphs.length, partial]);
 
   // --- Handle text selection + stream AI response ---
   const handleSelection = async () => {
@@ -125,7 +125,7 @@ export default function Transcript({ segments }) {
           lineHeight: 1.7,
         }}
       >
-        {paragraphs.length === 0 ? (
+        {paragraphs.length === 0 && !partial ? (
           <p style={{ color: "#888" }}>Waiting for transcript...</p>
         ) : (
           paragraphs.map((p, i) => (
@@ -134,6 +134,8 @@ export default function Transcript({ segments }) {
             </p>
           ))
         )}
+        {/* provisional text of the utterance being spoken */}
+        {partial && <p style={{ color: "#888", fontStyle: "italic" }}>{partial}</p>}
       </div>
 
       {/* RIGHT SIDE — AI ANSWER PANEL */}
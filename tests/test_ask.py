@@ -0,0 +1,110 @@
+import os
+import time
+import socket
+import threading
+
+import httpx
+import pytest
+import uvicorn
+from fastapi import FastAPI
+
+from benchmarks import stub_openai
+from server import config
+from server.routes import ask
+from server.utils import llm
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app, port):
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("server did not start")
+        time.sleep(0.01)
+    return server, thread
+
+
+@pytest.fixture(scope="module")
+def backend():
+    """(base url of an app with /api/ask, stub LLM settings and stats), both on localhost."""
+    stub_port, app_port = free_port(), free_port()
+    env = {"OPENAI_BASE_URL": f"http://127.0.0.1:{stub_port}/v1", "OPENAI_API_KEY": "stub"}
+    saved = {name: os.environ.get(name) for name in env}
+    os.environ.update(env)
+    llm._client = llm._http = llm._limiter = None
+
+    app = FastAPI()
+    app.include_router(ask.router)
+    servers = [start_server(stub_openai.app, stub_port), start_server(app, app_port)]
+    try:
+        yield f"http://127.0.0.1:{app_port}"
+    finally:
+        for server, thread in servers:
+            server.should_exit = True
+            thread.join(timeout=5)
+        llm._client = llm._http = llm._limiter = None
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    monkeypatch.setitem(stub_openai.settings, "ttft", 0.05)
+    monkeypatch.setitem(stub_openai.settings, "tokens", 5)
+    monkeypatch.setitem(stub_openai.settings, "interval", 0.01)
+    monkeypatch.setattr(config, "LLM_QUEUE_TIMEOUT", 0.2)
+    return stub_openai.settings
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+def test_streams_the_answer(backend, stub):
+    res = httpx.post(f"{backend}/api/ask", json={"question": "what is streamed", "session_id": "stream"}, timeout=10)
+    assert res.status_code == 200
+    assert res.text.startswith("w0 w1")
+    assert res.text.split() == ["w0", "w1", "w2", "w3", "w4"]
+    assert llm.busy_slots() == 0
+
+
+def test_busy_when_every_slot_is_taken(backend, stub, monkeypatch):
+    stub["ttft"] = 2.0
+    # the limiter is created on first use with the concurrency of that moment
+    monkeypatch.setattr(llm, "_limiter", None)
+    monkeypatch.setattr(config, "LLM_MAX_CONCURRENCY", 1)
+    with httpx.Client(base_url=backend, timeout=10) as client:
+        with client.stream("POST", "/api/ask", json={"question": "slow one", "session_id": "busy-1"}):
+            assert wait_until(lambda: llm.busy_slots() == 1)
+            res = client.post("/api/ask", json={"question": "second one", "session_id": "busy-2"})
+            assert res.text == "(Too many questions at once, try again)"
+    assert wait_until(lambda: llm.busy_slots() == 0)
+
+
+def test_disconnect_frees_the_slot(backend, stub):
+    stub["tokens"] = 500
+    stub["interval"] = 0.02
+    cancelled = stub_openai.stats["cancelled"]
+    with httpx.Client(base_url=backend, timeout=10) as client:
+        with client.stream("POST", "/api/ask", json={"question": "long answer", "session_id": "gone"}) as res:
+            next(res.iter_bytes())
+            assert llm.busy_slots() == 1
+    # leaving the block closes the connection mid-answer
+    assert wait_until(lambda: llm.busy_slots() == 0)
+    assert wait_until(lambda: stub_openai.stats["cancelled"] > cancelled)
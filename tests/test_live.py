@@ -0,0 +1,28 @@
+from server.routes import live
+from server.utils.hub import BOOT_ID, format_sse
+
+
+class Store:
+    last_id = 5
+
+
+def test_event_ids_carry_the_boot_id():
+    assert format_sse({"id": 3, "text": "hi"}).startswith(f"id: {BOOT_ID}:3\n")
+
+
+def test_resume_after(monkeypatch):
+    monkeypatch.setattr(live, "live_transcript", Store())
+    assert live.resume_after(f"{BOOT_ID}:3") == 3
+    assert live.resume_after(f"{BOOT_ID}:3", since_id=1) == 3
+    assert live.resume_after(None, since_id=4) == 4
+    assert live.resume_after(None) is None
+
+
+def test_restart_means_a_fresh_start(monkeypatch):
+    monkeypatch.setattr(live, "live_transcript", Store())
+    # ids from an earlier process, or past anything this one has committed
+    assert live.resume_after("0123abcd:3") is None
+    assert live.resume_after("3") is None
+    assert live.resume_after(f"{BOOT_ID}:40") is None
+    assert live.resume_after(None, since_id=40) is None
+    assert live.resume_after(f"{BOOT_ID}:x") is None
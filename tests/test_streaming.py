@@ -0,0 +1,27 @@
+import numpy as np
+
+from server.audio.vad import create_vad
+from server.audio.streaming import StreamingTranscriber
+
+RATE = 16000
+
+
+def test_push_accepts_column_chunks():
+    """The capture pipeline queues (N, 1) chunks; they must reach the decoder and commit."""
+    decoded, partials, finals = [], [], []
+
+    def transcribe(audio):
+        decoded.append(audio.shape)
+        return "hello there"
+
+    streamer = StreamingTranscriber(RATE, create_vad("rms", RATE), transcribe,
+                                    partials.append, finals.append, step=0.25)
+    speech = (0.3 * np.sin(2 * np.pi * 220 * np.arange(RATE * 2) / RATE)).astype(np.float32)
+    audio = np.concatenate([np.zeros(RATE // 2, np.float32), speech, np.zeros(RATE * 2, np.float32)])
+    for i in range(0, len(audio), 342):
+        streamer.push(audio[i:i + 342, None])
+        streamer.poll()
+
+    assert decoded and all(len(shape) == 1 for shape in decoded)
+    assert partials
+    assert finals